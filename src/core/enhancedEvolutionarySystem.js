@@ -431,6 +431,7 @@ class GameTracker {
   startTournament(tournamentNumber, strategies) {
     this.currentTournament = {
       tournamentNumber,
+      startTime: new Date().toISOString(),
       strategies: JSON.parse(JSON.stringify(strategies)), // Deep copy starting state
       games: [],
       startingBalances: strategies.map(s => ({ id: s.id, name: s.name, balance: s.coinBalance })),
@@ -580,6 +581,7 @@ class GameTracker {
   finishTournament(finalStrategies, eliminatedStrategies, evolvedStrategies) {
     if (!this.currentTournament) return;
 
+    this.currentTournament.endTime = new Date().toISOString();
     this.currentTournament.endingBalances = finalStrategies.map(s => ({ 
       id: s.id, 
       name: s.name, 
@@ -720,6 +722,7 @@ class GameTracker {
     this.errorMetrics[type][strategyId].errors.push({
       error: error,
       timestamp: new Date().toISOString(),
+      tournament: this.currentTournament?.tournamentNumber ?? null,
       gameNumber: this.currentGame?.gameNumber || 'unknown'
     });
     
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Rollup cube prefix sums when tournaments are appended after a query.
+Run with: python3 -m pytest src/tests/test_rollup_cube.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'utils'))
+
+from rollup_cube import RollupCube
+
+def _tournament(number):
+    return {
+        'tournamentNumber': number,
+        'strategies': [{'id': 'a', 'archetype': 'AGGRESSIVE'}],
+        'games': [{'gameNumber': 1, 'economicImpact': [{'strategyId': 'a', 'profit': 10, 'isWinner': True}]}],
+        'evolutionDetails': {}
+    }
+
+def test_append_past_padded_end_after_query():
+    cube = RollupCube(archetypes='recorded')
+    for number in (1, 2, 3):
+        cube.add_tournament(_tournament(number))
+    assert cube.query()['games'] == 3
+
+    cube.add_tournament(_tournament(5))
+    assert cube.query()['games'] == 4
+    assert cube.query(tournaments=(1, 5))['games'] == 4
+    assert cube.query(tournaments=(4, 5))['games'] == 1
+    assert cube.query(tournaments=4)['games'] == 0
+
+if __name__ == "__main__":
+    test_append_past_padded_end_after_query()
+    print("✅ Rollup cube append test passed")
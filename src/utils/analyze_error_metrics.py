@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Negotiation Error Metrics Analyzer
+Streams errorMetrics failure records, aggregates them per strategy, per game and per time window,
+and lines failure bursts up against balance drops to show when LLM failures drive eliminations.
+"""
+
+import json
+import os
+import sys
+from collections import Counter
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+
+from memory_budget import apply_memory_flag, load_export, report_memory
+from render_quality import apply_quality_flag, save_figure
+from timeline_store import build_timeline_store, games_per_tournament, global_game_index, store_to_dataframe
+
+try:
+    import ijson
+except ImportError:  # Fall back to json.load when the streaming parser isn't installed
+    ijson = None
+
+FAILURE_KINDS = ('negotiationFailures', 'proposalFailures', 'voteFailures')
+WINDOW_SECONDS = 60
+BURST_MIN_FAILURES = 3
+
+def _as_int(value):
+    """Record field as an int, 0 when missing or not a number (e.g. gameNumber 'unknown')"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+def _iter_from_metrics(error_metrics, kinds):
+    """Yield failure events from an already-parsed errorMetrics dict"""
+    for kind in kinds:
+        for strategy_id, record in error_metrics.get(kind, {}).items():
+            for error in record.get('errors', []):
+                yield (kind, strategy_id, _as_int(error.get('tournament')), _as_int(error.get('gameNumber')),
+                       error.get('timestamp', ''), error.get('error', ''))
+
+def _iter_with_ijson(json_file, kinds):
+    """Yield failure events straight from the file without materialising the export"""
+    prefixes = {f'errorMetrics.{kind}': kind for kind in kinds}
+
+    with open(json_file, 'rb') as f:
+        current = {}
+        for prefix, event, value in ijson.parse(f):
+            if not prefix.startswith('errorMetrics.'):
+                continue
+            parts = prefix.split('.')
+            if len(parts) < 5 or parts[3] != 'errors' or parts[4] != 'item':
+                continue
+            kind = prefixes.get('.'.join(parts[:2]))
+            if kind is None:
+                continue
+
+            if event == 'start_map' and len(parts) == 5:
+                current = {}
+            elif len(parts) == 6 and event in ('string', 'number'):
+                current[parts[5]] = value
+            elif event == 'end_map' and len(parts) == 5:
+                yield (kind, parts[2], _as_int(current.get('tournament')), _as_int(current.get('gameNumber')),
+                       current.get('timestamp', ''), current.get('error', ''))
+
+def iter_failure_events(json_file, data=None, kinds=FAILURE_KINDS):
+    """Yield (kind, strategy_id, tournament, game_number, timestamp, error) for every recorded failure.
+
+    tournament is 0 for exports written before failure records carried one.
+    """
+    if data is not None:
+        return _iter_from_metrics(data.get('errorMetrics', {}), kinds)
+    if ijson is not None:
+        return _iter_with_ijson(json_file, kinds)
+
+    with open(json_file, 'r') as f:
+        data = json.load(f)
+    return _iter_from_metrics(data.get('errorMetrics', {}), kinds)
+
+def load_balance_timeline(json_file, data=None):
+    """Load only the balanceTimeline section, streaming it when possible"""
+    if data is not None:
+        return data.get('balanceTimeline', {})
+    if ijson is None:
+        with open(json_file, 'r') as f:
+            return json.load(f).get('balanceTimeline', {})
+
+    with open(json_file, 'rb') as f:
+        return {strategy_id: timeline for strategy_id, timeline in ijson.kvitems(f, 'balanceTimeline', use_float=True)}
+
+def load_tournament_windows(json_file, data=None):
+    """(tournament numbers, start ms) for tournaments that recorded a startTime, ordered by start.
+
+    Only the tournament-level fields are read; games are skipped while streaming.
+    """
+    bounds = []
+    if data is not None or ijson is None:
+        if data is None:
+            with open(json_file, 'r') as f:
+                data = json.load(f)
+        for tournament in data.get('tournamentData', data.get('tournaments', [])):
+            bounds.append((tournament.get('tournamentNumber'), tournament.get('startTime')))
+    else:
+        with open(json_file, 'rb') as f:
+            current = {}
+            for prefix, event, value in ijson.parse(f):
+                if prefix in ('tournamentData.item', 'tournaments.item'):
+                    if event == 'start_map':
+                        current = {}
+                    elif event == 'end_map':
+                        bounds.append((current.get('tournamentNumber'), current.get('startTime')))
+                elif prefix.endswith(('.item.tournamentNumber', '.item.startTime')) and prefix.count('.') == 2:
+                    current[prefix.rpartition('.')[2]] = value
+
+    bounds = sorted((pd.Timestamp(start).value // 1_000_000, _as_int(number))
+                    for number, start in bounds if start and _as_int(number))
+    return (np.asarray([number for _, number in bounds], dtype=np.int32),
+            np.asarray([start for start, _ in bounds], dtype=np.int64))
+
+def aggregate_failures(events, window_seconds=WINDOW_SECONDS):
+    """Aggregate a failure event stream.
+
+    Counters are updated as events arrive; only compact (time, strategy, tournament, game)
+    columns are kept so failures can be assigned to tournaments afterwards.
+    """
+    per_strategy = Counter()
+    per_kind = Counter()
+    per_message = Counter()
+    per_window = Counter()
+    strategy_codes = {}
+    times, codes, tournaments, games = [], [], [], []
+
+    for kind, strategy_id, tournament, game_number, timestamp, error in events:
+        per_strategy[strategy_id] += 1
+        per_kind[kind] += 1
+        per_message[error] += 1
+
+        ts = pd.Timestamp(timestamp).value // 1_000_000 if timestamp else 0
+        per_window[ts // (window_seconds * 1000) * window_seconds] += 1
+
+        times.append(ts)
+        codes.append(strategy_codes.setdefault(strategy_id, len(strategy_codes)))
+        tournaments.append(tournament)
+        games.append(game_number)
+
+    return {
+        'per_strategy': per_strategy,
+        'per_kind': per_kind,
+        'per_message': per_message,
+        'per_window': per_window,
+        'strategy_ids': list(strategy_codes),
+        'time': np.asarray(times, dtype=np.int64),
+        'strategy': np.asarray(codes, dtype=np.int32),
+        'tournament': np.asarray(tournaments, dtype=np.int32),
+        'game': np.asarray(games, dtype=np.int32)
+    }
+
+def assign_tournaments(aggregate, windows=None, first_tournament=1):
+    """Tournament of every failure; returns (tournaments, inferred) with inferred = count guessed.
+
+    Failures keep the tournament recorded with them. Older records are placed by
+    timestamp in the tournament whose startTime precedes them. Exports with neither
+    fall back to the pooled, time-ordered stream, where a drop in game number marks
+    a new tournament; that misses tournaments whose failures all land in later games
+    than the previous tournament's last failure, so those counts are reported as inferred.
+    """
+    tournaments = aggregate['tournament'].copy()
+    missing = tournaments <= 0
+
+    if missing.any() and windows is not None and len(windows[0]):
+        numbers, starts = windows
+        slot = np.searchsorted(starts, aggregate['time'], side='right') - 1
+        placed = missing & (slot >= 0) & (aggregate['time'] > 0)
+        tournaments[placed] = numbers[slot[placed]]
+        missing &= ~placed
+
+    inferred = int(missing.sum())
+    if inferred:
+        idx = np.flatnonzero(missing)
+        idx = idx[np.argsort(aggregate['time'][idx], kind='stable')]
+        games = aggregate['game'][idx]
+        tournaments[idx] = first_tournament + np.concatenate(([0], np.cumsum(games[1:] < games[:-1])))
+
+    return tournaments, inferred
+
+def failures_per_game(aggregate, first_tournament=1, windows=None):
+    """Count failures per (strategy, tournament, game), tournaments from assign_tournaments"""
+    if len(aggregate['time']) == 0:
+        return pd.DataFrame(columns=['StrategyID', 'Tournament', 'Game', 'Failures'])
+
+    tournaments, _ = assign_tournaments(aggregate, windows, first_tournament)
+    df = pd.DataFrame({
+        'StrategyID': np.asarray(aggregate['strategy_ids'], dtype=object)[aggregate['strategy']],
+        'Tournament': tournaments,
+        'Game': aggregate['game']
+    })
+    return df.groupby(['StrategyID', 'Tournament', 'Game']).size().reset_index(name='Failures')
+
+def correlate_with_balance(per_game, timeline_df):
+    """Join per-game failures onto played games and flag failure bursts.
+
+    A burst is a game where a strategy's failures reach BURST_MIN_FAILURES and exceed
+    the mean of its other games by two of their standard deviations. Leaving the game
+    out of its own baseline keeps strategies with only a few games able to burst.
+    """
+    games = timeline_df[timeline_df['Game'] > 0]
+    merged = games.merge(per_game, on=['StrategyID', 'Tournament', 'Game'], how='left')
+    merged['Failures'] = merged['Failures'].fillna(0).astype(int)
+
+    # Leave-one-out mean and sample std from per-strategy sums
+    failures = merged['Failures'].astype(float)
+    grouped = failures.groupby(merged['StrategyID'])
+    n = grouped.transform('size') - 1
+    total = grouped.transform('sum') - failures
+    squares = (failures ** 2).groupby(merged['StrategyID']).transform('sum') - failures ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(n > 0, total / n, 0.0)
+        var = np.where(n > 1, (squares - n * mean ** 2) / (n - 1), 0.0)
+    threshold = np.maximum(BURST_MIN_FAILURES, mean + 2 * np.sqrt(np.maximum(var, 0)))
+    merged['IsBurst'] = merged['Failures'] >= threshold
+    merged['IsLoss'] = merged['Profit'] < 0
+
+    return merged
+
+def summarize_correlation(merged):
+    """Per-strategy failure rates and how losses line up with bursts"""
+    rows = []
+    for strategy_id, group in merged.groupby('StrategyID', sort=False):
+        bursts = group[group['IsBurst']]
+        corr = group['Failures'].corr(group['Profit']) if group['Failures'].std() > 0 else np.nan
+        rows.append({
+            'StrategyID': strategy_id,
+            'Strategy': group['Strategy'].iloc[0],
+            'Games': len(group),
+            'Failures': int(group['Failures'].sum()),
+            'FailuresPerGame': group['Failures'].mean(),
+            'FailureProfitCorr': corr,
+            'BurstGames': len(bursts),
+            'LossRateInBursts': bursts['IsLoss'].mean() if len(bursts) else np.nan,
+            'LossRateOtherwise': group.loc[~group['IsBurst'], 'IsLoss'].mean(),
+            'Eliminated': bool(group['IsEliminated'].any())
+        })
+    return pd.DataFrame(rows).sort_values('FailuresPerGame', ascending=False)
+
+def create_failure_overlay_chart(merged, source_name):
+    """Balance lines with per-game failure counts overlaid and burst games marked"""
+    merged = merged.assign(GameNumber=global_game_index(merged['Tournament'], merged['Game'],
+                                                        games_per_tournament(games=merged['Game'])))
+
+    fig, ax = plt.subplots(figsize=(16, 10))
+    strategies = merged['Strategy'].unique()
+    colors = plt.cm.Set3(np.linspace(0, 1, len(strategies)))
+
+    for color, strategy in zip(colors, strategies):
+        strategy_data = merged[merged['Strategy'] == strategy].sort_values('GameNumber')
+        ax.plot(strategy_data['GameNumber'], strategy_data['Balance'], label=strategy,
+                linewidth=2.5, marker='o', markersize=4, color=color)
+        bursts = strategy_data[strategy_data['IsBurst']]
+        if len(bursts) > 0:
+            ax.scatter(bursts['GameNumber'], bursts['Balance'], color='darkorange', s=140,
+                       marker='^', edgecolors='black', zorder=5)
+
+    ax.axhline(y=100, color='red', linestyle='--', alpha=0.5)
+    ax.set_xlabel('Game Progress (Tournament.Game)', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Coin Balance', fontsize=12, fontweight='bold')
+    ax.grid(True, alpha=0.3)
+
+    # Total failures per game on a secondary axis
+    failures = merged.groupby('GameNumber')['Failures'].sum()
+    ax_failures = ax.twinx()
+    ax_failures.bar(failures.index, failures.values, width=0.8, color='gray', alpha=0.25)
+    ax_failures.set_ylabel('LLM Failures per Game (all strategies)', fontsize=12, fontweight='bold')
+
+    ax.set_title(f'⚠️ LLM Failures vs Strategy Wealth\n'
+                 f'Bars = failures per game, ▲ = failure burst for that strategy\n'
+                 f'📁 Source: {source_name}', fontsize=14, fontweight='bold', pad=20)
+    ax.legend(bbox_to_anchor=(1.08, 1), loc='upper left', fontsize=10)
+    plt.tight_layout()
+
+    return fig
+
+def analyze_error_metrics(json_file, window_seconds=WINDOW_SECONDS):
+    """Stream failure records from an export, correlate them with balances and chart the overlay"""
+    print(f"📊 Streaming error metrics from {json_file}{'' if ijson else ' (ijson not installed, loading whole file)'}...")
+
+    # Without ijson every section comes from one full parse (per-game rounds and negotiations
+    # dropped under a memory budget), shared by all three readers
+    data = load_export(json_file) if ijson is None else None
+
+    aggregate = aggregate_failures(iter_failure_events(json_file, data), window_seconds)
+    total = sum(aggregate['per_strategy'].values())
+    if total == 0:
+        print("✅ No LLM failures recorded")
+        return None
+
+    print(f"⚠️ {total} failures recorded:")
+    for kind, count in aggregate['per_kind'].most_common():
+        print(f"   • {kind}: {count}")
+    for message, count in aggregate['per_message'].most_common(5):
+        print(f"   💬 {message}: {count}")
+
+    windows = sorted(aggregate['per_window'].items())
+    busiest = max(windows, key=lambda w: w[1])
+    print(f"⏱️ {len(windows)} active {window_seconds}s windows, busiest at "
+          f"{datetime.fromtimestamp(busiest[0], timezone.utc).strftime('%H:%M:%S')} UTC with {busiest[1]} failures")
+
+    store = build_timeline_store(load_balance_timeline(json_file, data))
+    timeline_df = store_to_dataframe(store)
+    if timeline_df.empty:
+        print("❌ No balance timeline to correlate failures with")
+        return None
+
+    first_tournament = int(timeline_df['Tournament'].min())
+    windows = load_tournament_windows(json_file, data)
+    _, inferred = assign_tournaments(aggregate, windows, first_tournament)
+    if inferred:
+        print(f"⚠️ {inferred} failures carry no tournament or tournament start time; "
+              f"tournaments inferred from game-number drops and may be misattributed")
+
+    per_game = failures_per_game(aggregate, first_tournament, windows)
+    merged = correlate_with_balance(per_game, timeline_df)
+    summary = summarize_correlation(merged)
+
+    print(f"\n📉 FAILURES vs BALANCE")
+    print("=" * 60)
+    for row in summary.itertuples(index=False):
+        corr = f"{row.FailureProfitCorr:+.2f}" if not np.isnan(row.FailureProfitCorr) else 'n/a'
+        burst_loss = f"{row.LossRateInBursts * 100:.0f}%" if not np.isnan(row.LossRateInBursts) else 'n/a'
+        flag = ' 💀' if row.Eliminated else ''
+        print(f"{row.Strategy}{flag}: {row.Failures} failures over {row.Games} games "
+              f"({row.FailuresPerGame:.1f}/game), corr(failures, profit) {corr}")
+        print(f"   🔥 {row.BurstGames} burst games, loss rate {burst_loss} in bursts vs "
+              f"{row.LossRateOtherwise * 100:.0f}% otherwise")
+
+    create_failure_overlay_chart(merged, os.path.basename(json_file))
+    timestamp_str = datetime.now().strftime('%Y%m%d_%H%M%S')
+    output_file = f'error_metrics_overlay_{timestamp_str}.png'
+    save_figure(output_file)
+    print(f"\n✅ Failure overlay chart saved: {output_file}")
+
+    return output_file
+
+if __name__ == "__main__":
+    apply_quality_flag()
+    apply_memory_flag()
+    if len(sys.argv) < 2:
+        print("Usage: python3 analyze_error_metrics.py <evolution_data.json> [window_seconds] [--memory-budget MB]")
+        sys.exit(1)
+
+    window = int(sys.argv[2]) if len(sys.argv) > 2 else WINDOW_SECONDS
+    result = analyze_error_metrics(sys.argv[1], window)
+    report_memory()
+    if result is None:
+        sys.exit(1)
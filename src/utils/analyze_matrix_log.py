@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Matrix Log Analyzer
+Summarises improved_matrix_log_*.json LLM call logs. Prompts are near-identical ~4 KB documents,
+so each one is split into blank-line separated sections interned in a content-hash table: repeated
+boilerplate is stored once, and prompts, responses and errors group by ID instead of by text.
+"""
+
+import glob
+import os
+import sys
+from collections import Counter, defaultdict
+
+from string_table import StringTable, load_interned_json
+
+def latest_matrix_log():
+    files = glob.glob('improved_matrix_log_*.json')
+    return max(files, key=os.path.getctime) if files else None
+
+def intern_prompt(prompt, sections, cache):
+    """Tuple of section IDs for a prompt; identical prompts are split only once"""
+    prompt_key = sections.id_of(prompt)
+    if prompt_key not in cache:
+        cache[prompt_key] = tuple(sections.intern(part) for part in prompt.split('\n\n') if part.strip())
+    else:
+        for section_key in cache[prompt_key]:
+            sections.counts[section_key] += 1
+    return prompt_key
+
+def analyze_entries(entries, table=None):
+    """Group calls by prompt, prompt template, response and error using interned IDs"""
+    table = table or StringTable()
+    sections = StringTable()
+    prompt_sections = {}
+
+    calls = []
+    for entry in entries:
+        prompt = entry.get('prompt') or ''
+        calls.append({
+            'player': entry.get('playerName', 'Unknown'),
+            'round': entry.get('round', 0),
+            'success': entry.get('success', True),
+            'corrected': bool(entry.get('corrected')),
+            'prompt': intern_prompt(prompt, sections, prompt_sections),
+            'response': table.intern(entry.get('response') or ''),
+            'error': table.intern(entry['error']) if entry.get('error') else None
+        })
+
+    # A template is the sequence of sections a prompt shares with at least one other prompt
+    shared = {key for key, count in sections.counts.items() if count > 1}
+    templates = Counter(tuple(key for key in prompt_sections[call['prompt']] if key in shared) for call in calls)
+
+    players = defaultdict(lambda: {'calls': 0, 'failures': 0, 'corrected': 0})
+    for call in calls:
+        player = players[call['player']]
+        player['calls'] += 1
+        player['failures'] += not call['success']
+        player['corrected'] += call['corrected']
+
+    return {
+        'calls': len(calls),
+        'players': dict(players),
+        'prompts': Counter(call['prompt'] for call in calls),
+        'responses': Counter(call['response'] for call in calls),
+        'errors': Counter(call['error'] for call in calls if call['error']),
+        'templates': templates,
+        'sections': sections,
+        'table': table
+    }
+
+def print_report(log_file, analysis):
+    sections = analysis['sections']
+    section_stats = sections.stats()
+    table = analysis['table']
+
+    print(f"\n📜 MATRIX LOG: {log_file}")
+    print("=" * 60)
+    print(f"📞 {analysis['calls']} LLM calls from {len(analysis['players'])} players")
+    print(f"🧩 {len(analysis['prompts'])} distinct prompts, {len(analysis['templates'])} prompt templates, "
+          f"{section_stats['unique']} distinct sections")
+    print(f"💾 Prompt text {section_stats['total_chars'] / 1024:.0f} KB → {section_stats['unique_chars'] / 1024:.0f} KB interned "
+          f"({section_stats['total_chars'] / max(section_stats['unique_chars'], 1):.1f}x)")
+
+    print("\n👥 Per player:")
+    for name, player in sorted(analysis['players'].items(), key=lambda item: -item[1]['failures']):
+        success = 1 - player['failures'] / player['calls']
+        print(f"   {name:<30} {player['calls']:4} calls | {success:6.1%} success | {player['corrected']} corrected")
+
+    print("\n📋 Most repeated prompt sections:")
+    for section_key, count in sections.counts.most_common(5):
+        heading = sections.text(section_key).split('\n', 1)[0][:50]
+        print(f"   • {section_key} ×{count}: {heading} ({len(sections.text(section_key))} chars)")
+
+    if analysis['errors']:
+        print("\n❌ Errors:")
+        for error_key, count in analysis['errors'].most_common(10):
+            print(f"   • ×{count}: {table.text(error_key)[:100]}")
+
+    repeated = [(key, count) for key, count in analysis['responses'].most_common(3) if count > 1]
+    if repeated:
+        print("\n🔁 Repeated responses:")
+        for response_key, count in repeated:
+            print(f"   • ×{count}: {table.text(response_key).replace(chr(10), ' ')[:80]}")
+
+if __name__ == "__main__":
+    log_files = sys.argv[1:] or [latest_matrix_log()]
+    if log_files == [None]:
+        print("❌ No improved_matrix_log_*.json files found!")
+        sys.exit(1)
+
+    for log_file in log_files:
+        entries = load_interned_json(log_file)
+        if not isinstance(entries, list):
+            entries = entries.get('entries', [])
+        print_report(log_file, analyze_entries(entries))
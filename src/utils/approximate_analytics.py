@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Approximate Analytics
+Instant "who's winning and how volatile" estimates from a stratified sample of games: timeline rows
+are sampled per (strategy, tournament) and matchup games per tournament, and every estimate comes
+with a 95% error bound. Samples at larger fractions are supersets of smaller ones (one random key
+per row), so the same pipeline refines a preview step by step until fraction 1.0 gives the exact
+answer with zero-width bounds.
+
+Exports and CSVs are converted once into a cached .abtm timeline map and matchup event table next
+to the file; later previews page in the sampled rows from the map instead of parsing the export again.
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from memory_budget import load_export, report_memory, set_budget
+from timeline_memmap import cached_map_path, cached_timeline_map
+from timeline_store import cache_path, final_balances, load_timeline_store
+
+Z = 1.96  # 95% normal interval
+DEFAULT_FRACTION = 0.05
+MIN_PER_STRATUM = 2  # two rows per stratum are needed for a variance estimate
+REFINE_FRACTIONS = (0.01, 0.05, 0.25, 1.0)
+MIN_RELIABLE = 30  # below this many sampled games, skewed profits make the normal bounds optimistic
+EVENTS_CACHE_VERSION = 1
+
+def sample_keys(n, seed=None):
+    """One uniform key per row; a sample keeps the lowest keys of each stratum"""
+    return np.random.default_rng(seed).random(n)
+
+def stratified_sample(strata, keys, fraction, min_per_stratum=MIN_PER_STRATUM):
+    """Row mask keeping ceil(fraction * N_h) rows (at least min_per_stratum) of every stratum.
+
+    strata must be dense stratum codes. Returns (mask, N_h, n_h) with per-stratum population and
+    sample sizes; with the same keys a larger fraction always keeps a superset of rows.
+    """
+    population = np.bincount(strata)
+    quota = np.minimum(population, np.maximum(np.ceil(fraction * population), min_per_stratum)).astype(np.int64)
+    order = np.lexsort((keys, strata))
+    starts = np.concatenate(([0], np.cumsum(population)[:-1]))
+    rank = np.empty(len(strata), dtype=np.int64)
+    rank[order] = np.arange(len(strata)) - np.repeat(starts, population)
+    return rank < quota[strata], population, quota
+
+def stratified_mean(values, sampled, population, quota, groups, n_groups, binary=False):
+    """Per-group stratified mean and standard error (with finite population correction).
+
+    values are the sampled rows only and sampled their stratum codes. groups maps each stratum to
+    the group it belongs to (e.g. its strategy). Strata hold only a handful of games, so the
+    within-stratum variance is pooled per group; for 0/1 values it uses the add-two proportion so
+    an all-loss sample still gets a non-zero bound.
+    """
+    y = np.asarray(values, dtype=np.float64)
+    sums = np.bincount(sampled, weights=y, minlength=len(population))
+    squares = np.bincount(sampled, weights=y * y, minlength=len(population))
+    n = np.maximum(quota, 1)
+    mean_h = sums / n
+
+    if binary:
+        hits = np.bincount(groups, weights=sums, minlength=n_groups)
+        tries = np.bincount(groups, weights=quota, minlength=n_groups)
+        p = (hits + 1) / (tries + 2)
+        pooled = p * (1 - p)
+    else:
+        within = np.bincount(groups, weights=squares - n * mean_h ** 2, minlength=n_groups)
+        dof = np.bincount(groups, weights=quota - 1, minlength=n_groups)
+        pooled = np.maximum(within, 0) / np.maximum(dof, 1)
+
+    group_size = np.bincount(groups, weights=population, minlength=n_groups)
+    weight = population / np.maximum(group_size[groups], 1)
+    mean = np.bincount(groups, weights=weight * mean_h, minlength=n_groups)
+    fpc = 1 - quota / np.maximum(population, 1)
+    variance = np.bincount(groups, weights=weight ** 2 * fpc * pooled[groups] / n, minlength=n_groups)
+    return mean, np.sqrt(variance)
+
+def played_strata(store):
+    """Played rows (game > 0) split into (strategy, tournament) strata.
+
+    Returns (rows, strata, groups): row indices, their dense stratum codes and each stratum's
+    strategy. A timeline map is split by binary search on each strategy's step column, so no
+    data column is read; an in-memory store is split from its strategy/tournament/game columns.
+    """
+    if store.get('slots') is None:
+        rows = np.flatnonzero(store['game'] > 0)
+        strategy = store['strategy'][rows].astype(np.int64)
+        tournament = store['tournament'][rows].astype(np.int64)
+        width = int(tournament.max(initial=0)) + 1
+        codes, strata = np.unique(strategy * width + tournament, return_inverse=True)
+        return rows, strata, codes // width
+
+    # Tournament t spans steps [t * stride, (t + 1) * stride) and its game-0 row sits on the first
+    stride = store['slots'] + 1
+    offsets = store['offsets']
+    starts, sizes, groups = [], [], []
+    for i in range(len(store['strategy_ids'])):
+        start, stop = int(offsets[i]), int(offsets[i + 1])
+        if stop == start:
+            continue
+        steps = store['step'][start:stop]
+        tournaments = np.arange(int(steps[0]) // stride, int(steps[-1]) // stride + 1)
+        low = start + np.searchsorted(steps, (tournaments * stride + 1).astype(steps.dtype))
+        high = start + np.searchsorted(steps, ((tournaments + 1) * stride).astype(steps.dtype))
+        keep = high > low
+        starts.append(low[keep])
+        sizes.append((high - low)[keep])
+        groups.append(np.full(int(keep.sum()), i, dtype=np.int64))
+
+    if not sizes:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    starts, sizes = np.concatenate(starts), np.concatenate(sizes)
+    strata = np.repeat(np.arange(len(sizes)), sizes)
+    rows = np.arange(len(strata)) + np.repeat(starts - (np.cumsum(sizes) - sizes), sizes)
+    return rows, strata, np.concatenate(groups)
+
+def timeline_estimates(store, fraction=DEFAULT_FRACTION, keys=None, seed=None):
+    """Per-strategy mean profit per game, win rate and profit volatility with 95% bounds.
+
+    Tournament start rows (game 0) carry no result and are left out. Only the sampled rows of
+    the profit and winner columns are read, which on a timeline map pages in just those rows.
+    Final balances are read exactly from the last row of each strategy.
+    """
+    rows, strata, groups = played_strata(store)
+    keys = sample_keys(len(rows), seed) if keys is None else keys
+    mask, population, quota = stratified_sample(strata, keys, fraction)
+    sampled_rows = rows[mask]
+
+    n_strategies = len(store['strategy_ids'])
+    profit = np.asarray(store['profit'][sampled_rows], dtype=np.float64)
+    sample = (strata[mask], population, quota, groups, n_strategies)
+    mean, mean_se = stratified_mean(profit, *sample)
+    m2, m3, m4 = (stratified_mean(profit ** k, *sample)[0] for k in (2, 3, 4))
+    win_rate, win_se = stratified_mean(store['is_winner'][sampled_rows], *sample, binary=True)
+
+    games = np.bincount(groups, weights=population, minlength=n_strategies)
+    sampled = np.bincount(groups, weights=quota, minlength=n_strategies)
+    variance = np.maximum(m2 - mean ** 2, 0)
+    volatility = np.sqrt(variance)
+    # Delta method: SE(s) = SE(s²) / 2s with Var(s²) ≈ (μ4 - σ⁴) / n; profits are far from
+    # normal (one big winner per game), so the fourth central moment is estimated, not assumed
+    central4 = m4 - 4 * mean * m3 + 6 * mean ** 2 * m2 - 3 * mean ** 4
+    with np.errstate(invalid='ignore', divide='ignore'):
+        volatility_se = np.sqrt(np.maximum(central4 - variance ** 2, 0) / np.maximum(sampled, 1)
+                                * (1 - sampled / np.maximum(games, 1))) / (2 * volatility)
+    volatility_se = np.nan_to_num(volatility_se)
+
+    return {
+        'fraction': fraction,
+        'rows_read': len(sampled_rows),
+        'rows_total': len(rows),
+        'games': games,
+        'sampled': sampled,
+        'reliable': (sampled >= MIN_RELIABLE) | (sampled == games),
+        'mean_profit': mean, 'mean_profit_bound': Z * mean_se,
+        'win_rate': win_rate, 'win_rate_bound': Z * win_se,
+        'volatility': volatility, 'volatility_bound': Z * volatility_se,
+        'final_balance': final_balances(store)
+    }
+
+def matchup_events(tournament_data):
+    """Dense (tournament, game, winner, loser) arrays: a game's winner beats every other player in it.
+
+    This is the rule strategyMatchups is accumulated with, so the exact pass reproduces it.
+    """
+    codes = {}
+    tournaments, games, winners, losers = [], [], [], []
+    game_row = 0
+    for tournament in tournament_data:
+        number = tournament.get('tournamentNumber', 0)
+        for game in tournament.get('games', []):
+            winner = ((game.get('finalResult') or {}).get('winner') or {}).get('strategyId')
+            if winner:
+                winner_code = codes.setdefault(winner, len(codes))
+                for player in game.get('players', []):
+                    strategy_id = (player.get('agent') or {}).get('strategyId')
+                    if strategy_id and strategy_id != winner:
+                        tournaments.append(number)
+                        games.append(game_row)
+                        winners.append(winner_code)
+                        losers.append(codes.setdefault(strategy_id, len(codes)))
+            game_row += 1
+    return {
+        'strategy_ids': list(codes),
+        'tournament': np.array(tournaments, dtype=np.int64),
+        'game': np.array(games, dtype=np.int64),
+        'winner': np.array(winners, dtype=np.int64),
+        'loser': np.array(losers, dtype=np.int64),
+        'n_games': game_row
+    }
+
+def cached_matchup_events(source, data=None):
+    """Matchup events of an export, kept next to it in the timeline cache after the first parse"""
+    path = cache_path(source, 'matchup_events', EVENTS_CACHE_VERSION)
+    if os.path.exists(path):
+        with np.load(path, allow_pickle=False) as npz:
+            events = {key: npz[key] for key in ('tournament', 'game', 'winner', 'loser')}
+            events['strategy_ids'] = npz['strategy_ids'].tolist()
+            events['n_games'] = int(npz['n_games'])
+        return events
+
+    data = data if data is not None else load_export(source)
+    events = matchup_events(data.get('tournamentData', data.get('tournaments', [])))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp.npz'
+    np.savez(tmp_path, strategy_ids=np.asarray(events['strategy_ids'], dtype=str), n_games=events['n_games'],
+             **{key: events[key] for key in ('tournament', 'game', 'winner', 'loser')})
+    os.replace(tmp_path, path)
+    return events
+
+def load_sample_sources(source):
+    """(timeline store, matchup events or None) to sample from.
+
+    .abtm files and tables directories are read as they are. Exports and CSVs go through the
+    timeline cache: the first run parses the file once to build both caches, later runs don't parse it.
+    """
+    if source.endswith('.abtm') or os.path.isdir(source):
+        return load_timeline_store(source), None
+
+    is_export = source.endswith('.json')
+    events_cached = not is_export or os.path.exists(cache_path(source, 'matchup_events', EVENTS_CACHE_VERSION))
+    data = None
+    if not (events_cached and os.path.exists(cached_map_path(source))):
+        print(f"🗂️ Converting {source} into the timeline cache (first run only)...")
+        if is_export:
+            data = load_export(source)
+    store = cached_timeline_map(source, data)
+    return store, cached_matchup_events(source, data) if is_export else None
+
+def matchup_estimates(events, fraction=DEFAULT_FRACTION, keys=None, seed=None):
+    """Pairwise win-rate matrix from games sampled per tournament, with 95% bounds per cell.
+
+    Whole games are sampled, so all pairs of a sampled game are kept together; cell bounds are
+    binomial on the sampled encounters (add-two proportion, finite population correction) and ignore the
+    correlation between pairs of one game.
+    """
+    n = len(events['strategy_ids'])
+    game_tournament = np.zeros(events['n_games'], dtype=np.int64)
+    game_tournament[events['game']] = events['tournament']
+    _, strata = np.unique(game_tournament, return_inverse=True)
+    keys = sample_keys(events['n_games'], seed) if keys is None else keys
+    game_mask, _, _ = stratified_sample(strata, keys, fraction)
+    mask = game_mask[events['game']]
+
+    cell_all = events['winner'] * n + events['loser']
+    wins_all = np.bincount(cell_all, minlength=n * n).reshape(n, n)
+    encounters_all = wins_all + wins_all.T
+    cell = cell_all[mask]
+    wins = np.bincount(cell, minlength=n * n).reshape(n, n)
+    encounters = wins + wins.T
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rate = wins / encounters
+        smoothed = (wins + 1) / (encounters + 2)  # add-two, so 5/5 wins still gets a bound
+        fpc = 1 - encounters / encounters_all
+        bound = Z * np.sqrt(smoothed * (1 - smoothed) / encounters * np.maximum(fpc, 0))
+    return {
+        'fraction': fraction,
+        'games_sampled': int(game_mask.sum()),
+        'games_total': events['n_games'],
+        'strategy_ids': events['strategy_ids'],
+        'win_rate': rate,
+        'bound': bound,
+        'encounters': encounters
+    }
+
+def refine(estimator, source, fractions=REFINE_FRACTIONS, seed=None, n_rows=None):
+    """Yield estimates at increasing fractions from one set of sample keys (the last may be 1.0)"""
+    keys = sample_keys(n_rows, seed)
+    for fraction in fractions:
+        yield estimator(source, fraction, keys=keys)
+
+def print_timeline_estimates(estimates, names, top=10):
+    print(f"\n⚡ TIMELINE ESTIMATES ({estimates['fraction']:.0%} sample: "
+          f"{estimates['rows_read']}/{estimates['rows_total']} rows read)")
+    print("=" * 78)
+    order = np.argsort(-np.nan_to_num(estimates['mean_profit'], nan=-np.inf))[:top]
+    print(f"   {'Strategy':<28} {'profit/game':>16} {'win rate':>16} {'volatility':>14} {'final':>6}")
+    for i in order:
+        final = estimates['final_balance'][i]
+        print(f"   {names[i][:28]:<28} {estimates['mean_profit'][i]:7.1f} ±{estimates['mean_profit_bound'][i]:6.1f} "
+              f"{estimates['win_rate'][i]:7.1%} ±{estimates['win_rate_bound'][i]:6.1%} "
+              f"{estimates['volatility'][i]:6.1f} ±{estimates['volatility_bound'][i]:5.1f} "
+              f"{'-' if np.isnan(final) else f'{final:.0f}':>6}{'' if estimates['reliable'][i] else ' *'}")
+    if not estimates['reliable'][order].all():
+        print(f"   * fewer than {MIN_RELIABLE} sampled games: bounds are optimistic, refine before trusting")
+
+def print_matchup_estimates(estimates, top=10, min_encounters=5):
+    print(f"\n⚔️ MATCHUP ESTIMATES ({estimates['fraction']:.0%} sample: "
+          f"{estimates['games_sampled']}/{estimates['games_total']} games sampled)")
+    print("=" * 78)
+    ids = estimates['strategy_ids']
+    rate = np.where(estimates['encounters'] >= min_encounters, estimates['win_rate'], np.nan)
+    np.fill_diagonal(rate, np.nan)
+    flat = np.argsort(-np.nan_to_num(rate, nan=-np.inf), axis=None)[:top]
+    for i, j in zip(*np.unravel_index(flat, rate.shape)):
+        if np.isnan(rate[i, j]):
+            break
+        print(f"   {ids[i][:30]:<30} beats {ids[j][:30]:<30} {rate[i, j]:6.1%} ±{estimates['bound'][i, j]:6.1%} "
+              f"({estimates['encounters'][i, j]} encounters)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Approximate timeline and matchup statistics with error bounds')
+    parser.add_argument('source', help='evolution export JSON, balance CSV, tables dir or .abtm file')
+    parser.add_argument('--fraction', type=float, default=DEFAULT_FRACTION, help='fraction of games to sample')
+    parser.add_argument('--refine', action='store_true', help=f"refine through {', '.join(map(str, REFINE_FRACTIONS))}")
+    parser.add_argument('--seed', type=int, help='sampling seed')
+    parser.add_argument('--top', type=int, default=10, help='rows to print')
+    parser.add_argument('--memory-budget', type=float, help='memory budget in MB (overrides AGENT_BATTLE_MEMORY_MB)')
+    args = parser.parse_args()
+    if args.memory_budget:
+        set_budget(args.memory_budget)
+
+    fractions = REFINE_FRACTIONS if args.refine else (args.fraction,)
+    store, events = load_sample_sources(args.source)
+    if len(store['balance']) == 0:
+        print("❌ No timeline datapoints found")
+        sys.exit(1)
+    for estimates in refine(timeline_estimates, store, fractions, args.seed, len(played_strata(store)[0])):
+        print_timeline_estimates(estimates, store['names'], args.top)
+
+    if events is not None and events['n_games']:
+        for estimates in refine(matchup_estimates, events, fractions, args.seed, events['n_games']):
+            print_matchup_estimates(estimates, args.top)
+    report_memory()
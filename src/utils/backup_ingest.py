@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Backup Snapshot Ingester
+Reads the backups/<timestamp>/ directories written by backupGameData.js (completed_games.json,
+evolution_tree.json, game_summary.json) into the run catalog's SQLite database. Every backup holds
+the full history of the evolution state it was extracted from, so consecutive snapshots overlap
+almost entirely: games and evolution events are keyed by a content hash and only records not seen
+before are appended. Snapshot directories already ingested are skipped without being opened, and a
+snapshot extracted from an already-ingested evolution_state_N is recognised from the file header,
+so a rescan of hundreds of backups only parses the new ones.
+"""
+
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+from run_catalog import CATALOG_FILE, open_catalog
+from string_table import text_id
+
+GAMES_FILE = 'completed_games.json'
+TREE_FILE = 'evolution_tree.json'
+SUMMARY_FILE = 'game_summary.json'
+HEADER_BYTES = 4096
+
+BACKUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS backup_snapshots (
+    directory TEXT PRIMARY KEY,
+    timestamp TEXT,
+    state_id INTEGER,
+    games INTEGER,
+    new_games INTEGER,
+    evolutions INTEGER,
+    new_evolutions INTEGER,
+    duplicate_of TEXT,
+    summary_json TEXT,
+    ingested_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS backup_games (
+    hash TEXT PRIMARY KEY,
+    snapshot TEXT NOT NULL,
+    state_id INTEGER,
+    game_number INTEGER,
+    start_time INTEGER,
+    end_time INTEGER,
+    winner_id TEXT,
+    players INTEGER,
+    prize_pool INTEGER,
+    record_json TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS backup_game_players (
+    game_hash TEXT NOT NULL REFERENCES backup_games(hash) ON DELETE CASCADE,
+    strategy_id TEXT,
+    name TEXT,
+    archetype TEXT,
+    generation INTEGER,
+    pre_game_balance INTEGER,
+    balance INTEGER,
+    balance_change INTEGER,
+    is_winner INTEGER
+);
+CREATE TABLE IF NOT EXISTS backup_evolutions (
+    hash TEXT PRIMARY KEY,
+    snapshot TEXT NOT NULL,
+    state_id INTEGER,
+    game_number INTEGER,
+    timestamp INTEGER,
+    eliminated_id TEXT,
+    eliminated_name TEXT,
+    new_id TEXT,
+    new_name TEXT,
+    generation INTEGER,
+    parent_ids TEXT,
+    reason TEXT,
+    record_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS backup_snapshots_state ON backup_snapshots(state_id);
+CREATE INDEX IF NOT EXISTS backup_games_order ON backup_games(end_time, game_number);
+CREATE INDEX IF NOT EXISTS backup_game_players_strategy ON backup_game_players(strategy_id);
+CREATE INDEX IF NOT EXISTS backup_evolutions_game ON backup_evolutions(game_number);
+"""
+
+_EXTRACTED_FROM = re.compile(r'"extractedFrom"\s*:\s*"evolution_state_(\d+)"')
+
+def open_backup_store(catalog_file=CATALOG_FILE):
+    """The run catalog with the backup tables added"""
+    conn = open_catalog(catalog_file)
+    conn.executescript(BACKUP_SCHEMA)
+    return conn
+
+def content_hash(record):
+    """(hash, canonical JSON) of a record; key order and whitespace don't change the hash"""
+    canonical = json.dumps(record, sort_keys=True, separators=(',', ':'))
+    return text_id(canonical), canonical
+
+def peek_state_id(path):
+    """evolution_state_N id from the head of a backup file without parsing the rest"""
+    try:
+        with open(path, 'r') as f:
+            match = _EXTRACTED_FROM.search(f.read(HEADER_BYTES))
+    except OSError:
+        return None
+    return int(match.group(1)) if match else None
+
+def discover_snapshots(roots):
+    """Backup directories under each root (a project directory or a backups/ directory), oldest first"""
+    found = set()
+    for root in roots:
+        backups = os.path.join(root, 'backups')
+        base = backups if os.path.isdir(backups) else root
+        if not os.path.isdir(base):
+            continue
+        with os.scandir(base) as entries:
+            for entry in entries:
+                if entry.is_dir() and (os.path.exists(os.path.join(entry.path, GAMES_FILE))
+                                       or os.path.exists(os.path.join(entry.path, TREE_FILE))):
+                    found.add(os.path.abspath(entry.path))
+    # Directory names are ISO timestamps with ':' and '.' replaced, so they sort chronologically
+    return sorted(found, key=os.path.basename)
+
+def _load_json(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _game_row(game):
+    winner = game.get('winner') or {}
+    summary = game.get('summary') or {}
+    return (_int_or_none(game.get('number', game.get('gameNumber'))), _int_or_none(game.get('startTime')),
+            _int_or_none(game.get('endTime')), winner.get('id', winner.get('strategyId')),
+            len(game.get('players', [])), _int_or_none(game.get('prizePool', summary.get('totalEntryFees'))))
+
+def _player_rows(game_hash, game):
+    return [(game_hash, p.get('id'), p.get('name'), p.get('archetype'), _int_or_none(p.get('generation')),
+             _int_or_none(p.get('preGameBalance')), _int_or_none(p.get('currentBalance')),
+             _int_or_none(p.get('balanceChange')), int(bool(p.get('isWinner'))))
+            for p in game.get('players', [])]
+
+def _evolution_row(event):
+    eliminated = event.get('eliminatedStrategy') or {}
+    created = event.get('newStrategy') or {}
+    parents = event.get('parentStrategies') or created.get('parentIds') or []
+    return (_int_or_none(event.get('gameNumber')), _int_or_none(event.get('timestamp')),
+            eliminated.get('id'), eliminated.get('name'), created.get('id'), created.get('name'),
+            _int_or_none(created.get('generationNumber')), json.dumps(parents), event.get('reason'))
+
+def ingest_snapshot(conn, directory, state_id=None):
+    """Append the new games and evolution events of one backup directory; returns the snapshot row"""
+    games_backup = _load_json(os.path.join(directory, GAMES_FILE)) or {}
+    tree_backup = _load_json(os.path.join(directory, TREE_FILE)) or {}
+    summary = _load_json(os.path.join(directory, SUMMARY_FILE))
+    extracted = games_backup.get('extractedFrom') or tree_backup.get('extractedFrom') or ''
+    if state_id is None and extracted.startswith('evolution_state_'):
+        state_id = _int_or_none(extracted[len('evolution_state_'):])
+
+    games = games_backup.get('games', [])
+    events = tree_backup.get('evolutionTree', [])
+    new_games = new_events = 0
+    with conn:
+        for game in games:
+            game_hash, canonical = content_hash(game)
+            inserted = conn.execute('INSERT OR IGNORE INTO backup_games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                    (game_hash, directory, state_id) + _game_row(game) + (canonical,)).rowcount
+            if inserted:
+                new_games += 1
+                conn.executemany('INSERT INTO backup_game_players VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                 _player_rows(game_hash, game))
+        for event in events:
+            event_hash, canonical = content_hash(event)
+            new_events += conn.execute('INSERT OR IGNORE INTO backup_evolutions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                       (event_hash, directory, state_id) + _evolution_row(event) + (canonical,)).rowcount
+        row = (directory, games_backup.get('timestamp', tree_backup.get('timestamp')), state_id, len(games), new_games,
+               len(events), new_events, None, json.dumps(summary) if summary is not None else None,
+               datetime.now().isoformat())
+        conn.execute('INSERT OR REPLACE INTO backup_snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', row)
+    return row
+
+def _record_duplicate(conn, directory, state_id, original):
+    with conn:
+        conn.execute('INSERT OR REPLACE INTO backup_snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                     (directory, None, state_id, None, 0, None, 0, original, None, datetime.now().isoformat()))
+
+def ingest_backups(conn, roots=('.',), rescan=False):
+    """Ingest every backup directory not seen before; returns (snapshots, duplicates, new games, new events)"""
+    known = {} if rescan else {directory: state_id for directory, state_id in
+                               conn.execute('SELECT directory, state_id FROM backup_snapshots')}
+    states = {state_id: directory for directory, state_id in
+              conn.execute('SELECT directory, state_id FROM backup_snapshots WHERE duplicate_of IS NULL '
+                           'AND state_id IS NOT NULL')}
+
+    snapshots = duplicates = new_games = new_events = 0
+    for directory in discover_snapshots(roots):
+        if directory in known:
+            continue
+        state_id = peek_state_id(os.path.join(directory, GAMES_FILE))
+        if state_id is not None and states.get(state_id, directory) != directory:
+            # Same evolution state as an earlier backup: identical records, nothing to parse
+            _record_duplicate(conn, directory, state_id, states[state_id])
+            duplicates += 1
+            continue
+        try:
+            row = ingest_snapshot(conn, directory, state_id)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"⚠️ Skipping {os.path.basename(directory)}: {e}")
+            continue
+        if row[2] is not None:
+            states[row[2]] = directory
+        snapshots += 1
+        new_games += row[4]
+        new_events += row[6]
+    return snapshots, duplicates, new_games, new_events
+
+def restored_games(conn):
+    """Every distinct backed-up game, oldest first, as the original records"""
+    return [json.loads(record) for (record,) in
+            conn.execute('SELECT record_json FROM backup_games ORDER BY end_time, game_number')]
+
+def restored_evolutions(conn):
+    """Every distinct evolution event, oldest first, as the original records"""
+    return [json.loads(record) for (record,) in
+            conn.execute('SELECT record_json FROM backup_evolutions ORDER BY timestamp, game_number')]
+
+def backup_stats(conn):
+    """Snapshot and duplicate-state counts, distinct games and evolution events, and games listed across snapshots"""
+    snapshots, duplicates = conn.execute('SELECT COUNT(*), COUNT(duplicate_of) FROM backup_snapshots').fetchone()
+    games = conn.execute('SELECT COUNT(*) FROM backup_games').fetchone()[0]
+    events = conn.execute('SELECT COUNT(*) FROM backup_evolutions').fetchone()[0]
+    listed_games = conn.execute('SELECT COALESCE(SUM(games), 0) FROM backup_snapshots').fetchone()[0]
+    return {'snapshots': snapshots, 'duplicates': duplicates, 'games': games, 'evolutions': events,
+            'listed_games': listed_games}
+
+if __name__ == "__main__":
+    usage = ("Usage: python3 backup_ingest.py ingest [directories ...] [--rescan]\n"
+             "       python3 backup_ingest.py stats\n"
+             "       Directories may be project roots (containing backups/) or backups/ itself.")
+    if len(sys.argv) < 2:
+        print(usage)
+        sys.exit(1)
+
+    command, args = sys.argv[1], sys.argv[2:]
+    conn = open_backup_store()
+
+    if command == 'ingest':
+        rescan = '--rescan' in args
+        roots = [a for a in args if a != '--rescan'] or ['.']
+        start = datetime.now()
+        snapshots, duplicates, new_games, new_events = ingest_backups(conn, roots, rescan)
+        print(f"✅ Backups ingested in {(datetime.now() - start).total_seconds():.1f}s: {snapshots} snapshots "
+              f"parsed, {duplicates} duplicate states skipped, {new_games} new games, {new_events} new evolution events")
+    elif command == 'stats':
+        stats = backup_stats(conn)
+        print(f"💾 {stats['snapshots']} snapshots ({stats['duplicates']} duplicate states)")
+        print(f"🎮 {stats['games']} distinct games ({stats['listed_games']} listed across parsed snapshots)")
+        print(f"🌳 {stats['evolutions']} distinct evolution events")
+    else:
+        print(usage)
+        sys.exit(1)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo Bankruptcy Projection
+Fits each strategy's empirical per-game profit distribution and simulates thousands of future
+balance paths at once to estimate elimination risk without running more LLM games.
+"""
+
+import sys
+import matplotlib.pyplot as plt
+import numpy as np
+from datetime import datetime
+
+from memory_budget import apply_memory_flag, load_export, report_memory
+from render_quality import apply_quality_flag, save_figure
+from timeline_store import build_timeline_store, export_to_store, final_balances, ELIMINATION_THRESHOLD
+
+def extract_profit_samples(data):
+    """Collect every recorded per-game profit for each strategy.
+
+    Uses economicImpact records when the export has them and falls back to
+    the balance timeline for files that only carry dataPoints.
+    """
+    samples = {}
+    tournament_data = data.get('tournamentData', data.get('tournaments', []))
+
+    for tournament in tournament_data:
+        for game in tournament.get('games', []):
+            for impact in game.get('economicImpact', []):
+                strategy_id = impact.get('strategyId', '')
+                if strategy_id:
+                    samples.setdefault(strategy_id, []).append(impact.get('profit', 0))
+
+    if not samples:
+        store = build_timeline_store(data.get('balanceTimeline', {}))
+        played = store['game'] > 0
+        for i, strategy_id in enumerate(store['strategy_ids']):
+            mask = played & (store['strategy'] == i)
+            if mask.any():
+                samples[strategy_id] = store['profit'][mask].tolist()
+
+    return {sid: np.asarray(profits, dtype=np.int64) for sid, profits in samples.items()}
+
+def fit_profit_distributions(samples, prior_strength=5.0):
+    """Fit a discrete profit distribution per strategy.
+
+    Each strategy's empirical distribution is shrunk towards the pooled
+    distribution of all strategies with weight prior_strength / (n + prior_strength),
+    so strategies with only a handful of games don't get degenerate projections.
+    Returns (support, {strategy_id: probabilities}) on a shared support.
+    """
+    if not samples:
+        return np.zeros(0, dtype=np.int64), {}
+
+    pooled = np.concatenate(list(samples.values()))
+    support, pooled_counts = np.unique(pooled, return_counts=True)
+    pooled_probs = pooled_counts / pooled_counts.sum()
+
+    distributions = {}
+    for strategy_id, profits in samples.items():
+        counts = np.bincount(np.searchsorted(support, profits), minlength=len(support))
+        n = counts.sum()
+        shrink = prior_strength / (n + prior_strength)
+        distributions[strategy_id] = (1 - shrink) * (counts / max(n, 1)) + shrink * pooled_probs
+
+    return support, distributions
+
+def simulate_balance_paths(start_balance, support, probs, n_paths=20000, n_games=50,
+                           threshold=ELIMINATION_THRESHOLD, rng=None, chunk_size=50000):
+    """Simulate future balance paths for one strategy.
+
+    Returns (balances, alive) arrays of shape (n_paths, n_games). A path is
+    eliminated the first time its balance drops below threshold and stays
+    eliminated; its balance is frozen from that game on.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    balances = np.empty((n_paths, n_games), dtype=np.int64)
+    alive = np.empty((n_paths, n_games), dtype=bool)
+
+    # Chunk over paths so the draws and cumulative sums (several times the output size) stay bounded
+    for start in range(0, n_paths, chunk_size):
+        stop = min(start + chunk_size, n_paths)
+        draws = support[rng.choice(len(support), size=(stop - start, n_games), p=probs)]
+        paths = start_balance + np.cumsum(draws, axis=1)
+        chunk_alive = np.logical_and.accumulate(paths >= threshold, axis=1)
+
+        # Freeze balance at the elimination point
+        first_dead = np.where(chunk_alive[:, -1], n_games, np.argmin(chunk_alive, axis=1))
+        frozen_idx = np.minimum(np.arange(n_games), first_dead[:, None])
+        balances[start:stop] = np.take_along_axis(paths, frozen_idx, axis=1)
+        alive[start:stop] = chunk_alive
+
+    return balances, alive
+
+def survival_curve(alive):
+    """Fraction of paths still alive after each simulated game"""
+    return alive.mean(axis=0)
+
+def project_bankruptcy(data, n_games=50, n_paths=20000, seed=None, horizons=(10, 25, 50), source_path=None):
+    """Run the projection for every strategy that is still solvent and wasn't removed by evolution"""
+    rng = np.random.default_rng(seed)
+    samples = extract_profit_samples(data)
+    support, distributions = fit_profit_distributions(samples)
+
+    # Legacy exports without a balanceTimeline get one reconstructed from their games
+    store = export_to_store(data, source_path=source_path)
+    balances = final_balances(store)
+    current = {sid: balances[i] for i, sid in enumerate(store['strategy_ids']) if not np.isnan(balances[i])}
+    names = dict(zip(store['strategy_ids'], store['names']))
+
+    # Strategies the last evolution step eliminated won't play the coming games
+    tournament_data = data.get('tournamentData', data.get('tournaments', []))
+    last_details = tournament_data[-1].get('evolutionDetails', {}) if tournament_data else {}
+    removed = {e['id'] for e in last_details.get('eliminated', [])}
+
+    projections = {}
+    for strategy_id, probs in distributions.items():
+        start_balance = current.get(strategy_id)
+        if start_balance is None or start_balance < ELIMINATION_THRESHOLD or strategy_id in removed:
+            continue
+
+        paths, alive = simulate_balance_paths(int(start_balance), support, probs,
+                                              n_paths=n_paths, n_games=n_games, rng=rng)
+        survival = survival_curve(alive)
+        projections[strategy_id] = {
+            'name': names.get(strategy_id, strategy_id),
+            'startBalance': int(start_balance),
+            'samples': int(len(samples[strategy_id])),
+            'meanProfit': float(samples[strategy_id].mean()),
+            'survival': survival,
+            'eliminationProbability': {
+                h: float(1 - survival[h - 1]) for h in horizons if h <= n_games
+            },
+            'medianFinalBalance': float(np.median(paths[:, -1])),
+            'p10FinalBalance': float(np.percentile(paths[:, -1], 10)),
+            'p90FinalBalance': float(np.percentile(paths[:, -1], 90))
+        }
+
+    return projections
+
+def create_survival_chart(projections, n_paths, timestamp):
+    """Plot projected survival curves for each strategy"""
+    plt.figure(figsize=(14, 8))
+
+    strategies = list(projections.keys())
+    colors = plt.cm.Set3(np.linspace(0, 1, max(len(strategies), 1)))
+
+    for color, strategy_id in zip(colors, strategies):
+        projection = projections[strategy_id]
+        games = np.arange(1, len(projection['survival']) + 1)
+        plt.plot(games, projection['survival'] * 100, linewidth=2.5,
+                 label=f"{projection['name']} (start {projection['startBalance']})", color=color)
+
+    plt.xlabel('Future Games Played', fontsize=12, fontweight='bold')
+    plt.ylabel('Probability Still Solvent (%)', fontsize=12, fontweight='bold')
+    plt.title(f'🎲 Projected Survival Curves ({n_paths:,} simulated paths per strategy)\n'
+              f'📅 Simulation: {timestamp}',
+              fontsize=14, fontweight='bold', pad=20)
+    plt.ylim(0, 105)
+    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=10)
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+
+def visualize_bankruptcy_projection(json_file, n_games=50, n_paths=20000, seed=None):
+    """Load an export, project elimination risk and save the survival chart"""
+    print(f"📊 Loading evolution data from {json_file}...")
+
+    data = load_export(json_file)
+
+    projections = project_bankruptcy(data, n_games=n_games, n_paths=n_paths, seed=seed, source_path=json_file)
+    if not projections:
+        print("❌ No solvent strategies with profit history to project")
+        return None
+
+    print(f"🎲 Simulated {n_paths:,} paths × {n_games} games for {len(projections)} strategies")
+
+    create_survival_chart(projections, n_paths, data.get('timestamp', 'Unknown'))
+    timestamp_str = datetime.now().strftime('%Y%m%d_%H%M%S')
+    output_file = f'bankruptcy_projection_{timestamp_str}.png'
+    save_figure(output_file)
+    print(f"✅ Survival chart saved: {output_file}")
+
+    print(f"\n💀 ELIMINATION RISK:")
+    print("=" * 60)
+    ranked = sorted(projections.values(), key=lambda p: p['survival'][-1], reverse=True)
+    for projection in ranked:
+        risks = ', '.join(f"{h} games: {p * 100:.1f}%"
+                          for h, p in projection['eliminationProbability'].items())
+        print(f"{projection['name']} (start {projection['startBalance']}, "
+              f"{projection['meanProfit']:+.1f}/game over {projection['samples']} games)")
+        print(f"   💸 P(eliminated) → {risks}")
+        print(f"   📈 Final balance p10/median/p90: {projection['p10FinalBalance']:.0f} / "
+              f"{projection['medianFinalBalance']:.0f} / {projection['p90FinalBalance']:.0f}")
+
+    return output_file
+
+if __name__ == "__main__":
+    apply_quality_flag()
+    apply_memory_flag()
+    if len(sys.argv) < 2:
+        print("Usage: python3 bankruptcy_projection.py <evolution_data.json> [games] [paths] [seed] [--memory-budget MB]")
+        print("Example: python3 bankruptcy_projection.py enhanced_evolution_2025-01-01T12-00-00-000Z.json 50 20000")
+        sys.exit(1)
+
+    json_file = sys.argv[1]
+    n_games = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    n_paths = int(sys.argv[3]) if len(sys.argv) > 3 else 20000
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else None
+
+    result = visualize_bankruptcy_projection(json_file, n_games=n_games, n_paths=n_paths, seed=seed)
+    report_memory()
+    if not result:
+        sys.exit(1)
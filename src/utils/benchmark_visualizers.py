@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Visualizer Scaling Benchmarks
+Generates synthetic exports at several scales and times parsing, stats and rendering for every
+Python visualizer, each in its own subprocess so peak RSS is measured per case.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from generate_synthetic_exports import write_synthetic_files
+
+# name: (strategies per tournament, tournaments, games per tournament, rounds per game)
+SCALES = {
+    'small': (6, 3, 5, 1),
+    'medium': (12, 20, 10, 2),
+    'large': (24, 60, 20, 3)
+}
+
+REGRESSION_FACTOR = 1.25
+
+def _time_stage(stages, name, fn, *args, **kwargs):
+    """Run fn and record its wall and CPU time under stages[name]"""
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    result = fn(*args, **kwargs)
+    stages[name] = {'wall': time.perf_counter() - wall_start, 'cpu': time.process_time() - cpu_start}
+    return result
+
+def _load_json(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def case_evolution_tree(paths, stages):
+    import matplotlib.pyplot as plt
+    import visualize_evolution_tree as vet
+    from strategy_details import write_strategy_details
+    from timeline_store import build_timeline_store
+    from validate_economics import validate_export
+
+    data, balance_timeline, tournament_data, completed = _time_stage(
+        stages, 'parse', vet.load_evolution_data, paths['enhanced_evolution'])
+
+    def stats():
+        validate_export(data)
+        build_timeline_store(balance_timeline)
+    _time_stage(stages, 'stats', stats)
+
+    def render():
+        _, color_map = vet.create_balance_evolution_chart(balance_timeline, completed, 'benchmark')
+        plt.savefig('balance.png', dpi=300, bbox_inches='tight')
+        _, all_strategies = vet.create_evolution_tree(tournament_data, color_map)
+        plt.savefig('tree.png', dpi=300, bbox_inches='tight')
+        write_strategy_details(all_strategies, tournament_data, 'details', 'png')
+    _time_stage(stages, 'render', render)
+
+def case_progress(paths, stages):
+    from timeline_store import build_timeline_store, final_balances
+    from visualize_from_progress import visualize_progress_data
+
+    data = _time_stage(stages, 'parse', _load_json, paths['incremental_progress'])
+    _time_stage(stages, 'stats', lambda: final_balances(build_timeline_store(data['balanceTimeline'])))
+    _time_stage(stages, 'full', visualize_progress_data, paths['incremental_progress'])
+
+def case_balance_csv(paths, stages):
+    import pandas as pd
+    from timeline_store import dataframe_to_store, final_balances
+    from visualize_balance_timeline import visualize_balance_timeline
+
+    df = _time_stage(stages, 'parse', pd.read_csv, paths['balance_timeline_csv'])
+    _time_stage(stages, 'stats', lambda: final_balances(dataframe_to_store(df)))
+    _time_stage(stages, 'full', visualize_balance_timeline, paths['balance_timeline_csv'])
+
+def case_simple_analyzer(paths, stages):
+    from simple_balance_visualizer import analyze_balance_timeline
+
+    _time_stage(stages, 'full', analyze_balance_timeline, paths['balance_timeline_csv'])
+
+def case_strategy_matrix(paths, stages):
+    import visualize_strategy_matrix as vsm
+
+    matchups = _time_stage(stages, 'parse', vsm.load_strategy_matchups, paths['enhanced_evolution'])
+    win_rate_matrix, win_matrix, loss_matrix, labels, strategies = _time_stage(
+        stages, 'stats', vsm.create_win_rate_matrix, matchups)
+
+    def render():
+        vsm.plot_win_rate_heatmap(win_rate_matrix, labels)
+        vsm.plot_win_loss_matrix(win_matrix, loss_matrix, labels)
+        vsm.plot_dominance_scores(matchups)
+        vsm.plot_network_graph(win_rate_matrix, labels, strategies)
+    _time_stage(stages, 'render', render)
+
+def case_bankruptcy_projection(paths, stages):
+    import matplotlib.pyplot as plt
+    from bankruptcy_projection import create_survival_chart, project_bankruptcy
+
+    data = _time_stage(stages, 'parse', _load_json, paths['enhanced_evolution'])
+    projections = _time_stage(stages, 'stats', project_bankruptcy, data, seed=0)
+
+    def render():
+        create_survival_chart(projections, 20000, 'benchmark')
+        plt.savefig('projection.png', dpi=300, bbox_inches='tight')
+    _time_stage(stages, 'render', render)
+
+def case_survival(paths, stages):
+    import matplotlib.pyplot as plt
+    from survival_analysis import build_event_table, create_survival_chart
+
+    data = _time_stage(stages, 'parse', _load_json, paths['enhanced_evolution'])
+    table = _time_stage(stages, 'stats', build_event_table, data)
+
+    def render():
+        create_survival_chart(table)
+        plt.savefig('survival.png', dpi=300, bbox_inches='tight')
+    _time_stage(stages, 'render', render)
+
+def case_error_metrics(paths, stages):
+    from analyze_error_metrics import analyze_error_metrics
+
+    _time_stage(stages, 'full', analyze_error_metrics, paths['enhanced_evolution'])
+
+def case_matrix_log(paths, stages):
+    from analyze_matrix_log import analyze_entries
+    from string_table import load_interned_json
+
+    _time_stage(stages, 'parse', _load_json, paths['matrix_log'])
+    entries = _time_stage(stages, 'parse_interned', load_interned_json, paths['matrix_log'])
+    _time_stage(stages, 'analyze', analyze_entries, entries)
+
+CASES = {
+    'evolution_tree': case_evolution_tree,
+    'progress': case_progress,
+    'balance_csv': case_balance_csv,
+    'simple_analyzer': case_simple_analyzer,
+    'strategy_matrix': case_strategy_matrix,
+    'bankruptcy_projection': case_bankruptcy_projection,
+    'survival': case_survival,
+    'error_metrics': case_error_metrics,
+    'matrix_log': case_matrix_log
+}
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run_case_in_process(case, paths_file, work_dir):
+    """Child-process entry point: run one case and print its timings as JSON"""
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    paths = _load_json(paths_file)
+    os.chdir(work_dir)
+
+    stages = {}
+    baseline_rss = peak_rss_mb()
+    wall_start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        CASES[case](paths, stages)
+
+    print(json.dumps({
+        'case': case,
+        'wall': time.perf_counter() - wall_start,
+        'stages': stages,
+        'peak_rss_mb': peak_rss_mb(),
+        'startup_rss_mb': baseline_rss
+    }))
+
+def run_case(case, paths_file, work_dir):
+    """Run one case in a fresh interpreter and collect its result"""
+    env = dict(os.environ, MPLBACKEND='Agg', PYTHONWARNINGS='ignore')
+    completed = subprocess.run([sys.executable, os.path.abspath(__file__), '--run-case', case,
+                                paths_file, work_dir], capture_output=True, text=True, env=env)
+    if completed.returncode != 0:
+        return {'case': case, 'error': completed.stderr.strip().splitlines()[-1:] or ['failed']}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def run_benchmarks(scales, cases, keep_dir=None, seed=42):
+    """Generate each scale's files once and benchmark every case against them"""
+    results = []
+    root = keep_dir or tempfile.mkdtemp(prefix='agent_battle_bench_')
+
+    try:
+        for scale in scales:
+            n_strategies, n_tournaments, n_games, n_rounds = SCALES[scale]
+            scale_dir = os.path.join(root, scale)
+            print(f"\n🧪 Scale '{scale}': {n_strategies} strategies, {n_tournaments} tournaments × "
+                  f"{n_games} games, {n_rounds} round(s)")
+
+            gen_start = time.perf_counter()
+            paths = write_synthetic_files(scale_dir, seed, n_strategies, n_tournaments, n_games, n_rounds)
+            size_mb = os.path.getsize(paths['enhanced_evolution']) / (1024 * 1024)
+            print(f"   📦 Generated in {time.perf_counter() - gen_start:.1f}s, export {size_mb:.1f} MB")
+
+            paths_file = os.path.join(scale_dir, 'paths.json')
+            with open(paths_file, 'w') as f:
+                json.dump({k: os.path.abspath(v) for k, v in paths.items()}, f)
+
+            for case in cases:
+                result = run_case(case, paths_file, scale_dir)
+                result.update({'scale': scale, 'export_mb': size_mb})
+                results.append(result)
+                if 'error' in result:
+                    print(f"   ❌ {case}: {result['error'][0]}")
+                else:
+                    stage_text = ', '.join(f"{name} {t['wall']:.2f}s" for name, t in result['stages'].items())
+                    print(f"   ⏱️ {case:<22} {result['wall']:7.2f}s  peak {result['peak_rss_mb']:7.0f} MB  ({stage_text})")
+    finally:
+        if keep_dir is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+    return results
+
+def compare_with_baseline(results, baseline_file, factor=REGRESSION_FACTOR):
+    """Flag cases whose wall time or peak RSS grew by more than factor"""
+    baseline = {(r['scale'], r['case']): r for r in _load_json(baseline_file)['results'] if 'error' not in r}
+    regressions = []
+
+    for result in results:
+        previous = baseline.get((result['scale'], result['case']))
+        if previous is None or 'error' in result:
+            continue
+        for metric in ('wall', 'peak_rss_mb'):
+            if result[metric] > previous[metric] * factor:
+                regressions.append((result['scale'], result['case'], metric, previous[metric], result[metric]))
+
+    if regressions:
+        print(f"\n🚨 {len(regressions)} regressions vs {baseline_file}:")
+        for scale, case, metric, before, after in regressions:
+            print(f"   • {scale}/{case} {metric}: {before:.2f} → {after:.2f}")
+    else:
+        print(f"\n✅ No regressions vs {baseline_file}")
+
+    return regressions
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--run-case':
+        run_case_in_process(*sys.argv[2:5])
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description='Benchmark the Python visualizers on synthetic exports')
+    parser.add_argument('--scales', default='small,medium', help=f"comma-separated from {', '.join(SCALES)}")
+    parser.add_argument('--cases', default=','.join(CASES), help='comma-separated benchmark cases')
+    parser.add_argument('--baseline', help='previous benchmark results JSON to compare against')
+    parser.add_argument('--keep', help='directory to keep generated files in')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.scales.split(','), args.cases.split(','), args.keep, args.seed)
+
+    output_file = f"benchmark_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_file, 'w') as f:
+        json.dump({'timestamp': datetime.now().isoformat(), 'scales': {s: SCALES[s] for s in args.scales.split(',')},
+                   'results': results}, f, indent=2)
+    print(f"\n✅ Results saved: {output_file}")
+
+    if args.baseline:
+        sys.exit(1 if compare_with_baseline(results, args.baseline) else 0)
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Chart Job Scheduler
+An asyncio service that watches export directories for new enhanced_evolution, bankruptcy_progress
+and balance timeline files and queues the chart and stats jobs for each one. Jobs carry priorities
+(cheap validation and stats before publication charts), requests for the same job and input are
+coalesced while queued or running, and everything runs on a bounded process pool behind a bounded
+queue, so a burst of exports backs up in the queue instead of spawning one Python per chart.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import os
+import runpy
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fnmatch import fnmatch
+
+from render_quality import RENDER_ENV, TIERS, tier_name
+
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Watched filename patterns by export kind (progress_timeline_*.csv is evolutionReporter's CSV)
+WATCH_PATTERNS = [
+    ('enhanced_evolution', 'enhanced_evolution_*.json'),
+    ('bankruptcy_progress', 'bankruptcy_progress_*.json'),
+    ('balance_csv', 'balance_timeline_*.csv'),
+    ('balance_csv', 'progress_timeline_*.csv')
+]
+
+# (job name, script, priority, per_directory) per kind; lower priorities run first.
+# per_directory jobs take the export's directory, so one run covers every file that arrived.
+JOBS = {
+    'enhanced_evolution': [
+        ('validate', 'validate_economics.py', 0, False),
+        ('catalog', 'run_catalog.py', 1, True),
+        ('evolution_tree', 'visualize_evolution_tree.py', 2, False),
+        ('survival', 'survival_analysis.py', 3, False),
+        ('projection', 'bankruptcy_projection.py', 3, False)
+    ],
+    'bankruptcy_progress': [
+        ('catalog', 'run_catalog.py', 1, True)
+    ],
+    'balance_csv': [
+        ('balance_stats', 'simple_balance_visualizer.py', 1, False),
+        ('catalog', 'run_catalog.py', 1, True),
+        ('balance_chart', 'visualize_balance_timeline.py', 2, False)
+    ]
+}
+
+WORKERS = 2
+QUEUE_SIZE = 64
+POLL_SECONDS = 2.0
+TASKS_PER_WORKER = 20  # recycle workers so interned tables and matplotlib state don't grow forever
+
+def export_kind(filename):
+    for kind, pattern in WATCH_PATTERNS:
+        if fnmatch(filename, pattern):
+            return kind
+    return None
+
+def job_argv(script, path):
+    """Command line for a job's script; the catalog indexes a directory, everything else one file"""
+    if script == 'run_catalog.py':
+        return [script, 'index', path]
+    return [script, path]
+
+def _worker_init():
+    sys.path.insert(0, UTILS_DIR)
+    import matplotlib
+    matplotlib.use('Agg')
+
+def run_job(argv, output_dir, render_tier):
+    """Worker entry point: run a visualizer's __main__ in this process, returning (exit code, output)"""
+    import matplotlib.pyplot as plt
+    os.environ[RENDER_ENV] = render_tier
+    output = io.StringIO()
+    code = 0
+    previous_dir, previous_argv = os.getcwd(), sys.argv
+    try:
+        os.chdir(output_dir)
+        sys.argv = list(argv)
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            runpy.run_path(os.path.join(UTILS_DIR, argv[0]), run_name='__main__')
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception as e:
+        output.write(f"{type(e).__name__}: {e}\n")
+        code = 1
+    finally:
+        sys.argv = previous_argv
+        os.chdir(previous_dir)
+        plt.close('all')
+    return code, output.getvalue()
+
+class ChartScheduler:
+    """Priority queue of (job, input) keys with coalescing, drained by a bounded process pool.
+
+    A key is in at most one of three states: queued (in `pending`), running (in `running`), or
+    done for a given file version (in `done`). Requests for a queued key only refresh its version;
+    requests for a running key mark it for exactly one rerun once the current run finishes.
+    """
+
+    def __init__(self, workers=WORKERS, queue_size=QUEUE_SIZE, output_dir=None, render_tier=None,
+                 jobs=None, verbose=False):
+        self.workers = workers
+        self.queue = asyncio.PriorityQueue(maxsize=queue_size)
+        self.output_dir = output_dir
+        self.render_tier = render_tier or tier_name()
+        self.jobs = jobs or JOBS
+        self.verbose = verbose
+        self.pending = {}   # key -> version waiting in the queue
+        self.running = {}   # key -> version being run
+        self.rerun = {}     # key -> newest version requested while running
+        self.done = {}      # key -> last version completed
+        self.priority = {}
+        self.stats = {'submitted': 0, 'coalesced': 0, 'skipped': 0, 'completed': 0, 'failed': 0}
+        self._sequence = itertools.count()
+        self._requeues = set()
+        self._executor = None
+
+    async def submit(self, path, version=None):
+        """Queue every job for an export; waits while the queue is full (backpressure)"""
+        kind = export_kind(os.path.basename(path))
+        if kind is None:
+            return 0
+        path = os.path.abspath(path)
+        version = version or _version(path)
+        queued = 0
+        for job, script, priority, per_directory in self.jobs[kind]:
+            if per_directory:
+                # File versions aren't comparable across files; any new arrival makes the directory stale
+                queued += await self.request((job, script, os.path.dirname(path)), priority, (time.time_ns(),))
+            else:
+                queued += await self.request((job, script, path), priority, version)
+        return queued
+
+    async def request(self, key, priority, version):
+        self.stats['submitted'] += 1
+        if key in self.pending:
+            self.pending[key] = max(self.pending[key], version)
+            self.stats['coalesced'] += 1
+            return 0
+        if key in self.running:
+            if version > self.running[key]:
+                self.rerun[key] = max(self.rerun.get(key, version), version)
+            self.stats['coalesced'] += 1
+            return 0
+        if self.done.get(key, ()) >= version:
+            self.stats['skipped'] += 1
+            return 0
+        self.pending[key] = version
+        self.priority[key] = priority
+        await self.queue.put((priority, next(self._sequence), key))
+        return 1
+
+    def _new_executor(self):
+        options = {'max_workers': self.workers, 'initializer': _worker_init}
+        if sys.version_info >= (3, 11):
+            options['max_tasks_per_child'] = TASKS_PER_WORKER
+        return ProcessPoolExecutor(**options)
+
+    def _replace_broken(self, executor):
+        """Swap in a fresh pool once per breakage; workers that saw the same broken pool share it"""
+        if self._executor is executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+            print("♻️ Worker process died, process pool restarted", flush=True)
+
+    async def _run(self, argv, output_dir):
+        """(exit code, output) for one job; a crashed or unpicklable job counts as failed"""
+        executor = self._executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, run_job, argv, output_dir,
+                                                                    self.render_tier)
+        except BrokenProcessPool:
+            self._replace_broken(executor)
+            return 1, "Worker process died (killed or crashed) while running this job"
+        except Exception as e:
+            return 1, f"{type(e).__name__}: {e}"
+
+    async def _worker(self):
+        while True:
+            _, _, key = await self.queue.get()
+            try:
+                version = self.pending.pop(key)
+                self.running[key] = version
+                job, script, target = key
+                output_dir = self.output_dir or (target if os.path.isdir(target) else os.path.dirname(target))
+                start = time.perf_counter()
+                code, output = await self._run(job_argv(script, target), output_dir)
+                elapsed = time.perf_counter() - start
+                self.done[key] = version
+                self.stats['completed' if code == 0 else 'failed'] += 1
+                status = '✅' if code == 0 else '❌'
+                print(f"{status} {job:<15} {os.path.basename(target)} ({elapsed:.1f}s, {self.queue.qsize()} queued)", flush=True)
+                if self.verbose or code != 0:
+                    lines = output.strip().splitlines()
+                    for line in lines if self.verbose else lines[-5:]:
+                        print(f"   {line}")
+            finally:
+                del self.running[key]
+                newer = self.rerun.pop(key, None)
+                if newer is not None:
+                    # Requeue from a separate task: a worker blocking on a full queue would deadlock
+                    task = asyncio.create_task(self.request(key, self.priority[key], newer))
+                    self._requeues.add(task)
+                    task.add_done_callback(self._requeues.discard)
+                self.queue.task_done()
+
+    @contextlib.asynccontextmanager
+    async def pool(self):
+        """Start the process pool and worker tasks; cancels the workers on exit"""
+        self._executor = self._new_executor()
+        tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        try:
+            yield self
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._executor.shutdown()
+            self._executor = None
+
+    async def drain(self):
+        """Wait until nothing is queued, running or due for a rerun"""
+        while True:
+            await self.queue.join()
+            if not self.running and not self._requeues and not self.pending:
+                return
+            await asyncio.sleep(0.05)
+
+def _version(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def scan_exports(directories):
+    """(path, version) for every watched export currently in the directories"""
+    found = {}
+    for directory in directories:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file() and export_kind(entry.name):
+                    stat = entry.stat()
+                    found[os.path.abspath(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+    return found
+
+async def watch(scheduler, directories, poll=POLL_SECONDS, existing=False, once=False):
+    """Poll the directories and submit exports once they stop changing between two scans.
+
+    Files present at startup are only processed with existing=True; with once=True the
+    watcher submits what it finds, waits for the queue to drain and returns.
+    """
+    seen = {} if existing else scan_exports(directories)
+    candidates = {}
+    while True:
+        current = scan_exports(directories)
+        for path, version in sorted(current.items(), key=lambda item: item[1]):
+            if seen.get(path) == version:
+                continue
+            # Exports are written while the run is going; wait for a scan with no change
+            if candidates.get(path) == version or once:
+                seen[path] = version
+                candidates.pop(path, None)
+                await scheduler.submit(path, version)
+            else:
+                candidates[path] = version
+        if once:
+            await scheduler.drain()
+            return
+        await asyncio.sleep(poll)
+
+async def run_files(scheduler, files):
+    for path in files:
+        if not await scheduler.submit(path) and export_kind(os.path.basename(path)) is None:
+            print(f"⚠️ Not a watched export: {path}")
+    await scheduler.drain()
+
+async def main(args):
+    scheduler = ChartScheduler(args.workers, args.queue_size, args.output_dir, args.quality, verbose=args.verbose)
+    print(f"🗂️ Chart scheduler: {args.workers} worker(s), queue {args.queue_size}, {scheduler.render_tier} renders")
+    async with scheduler.pool():
+        if args.files:
+            await run_files(scheduler, args.files)
+        else:
+            print(f"👀 Watching {', '.join(args.directories)} every {args.poll:g}s (Ctrl+C to stop)")
+            await watch(scheduler, args.directories, args.poll, args.existing or args.once, args.once)
+    stats = scheduler.stats
+    print(f"\n📊 {stats['completed']} jobs done, {stats['failed']} failed, {stats['coalesced']} coalesced, "
+          f"{stats['skipped']} already up to date ({stats['submitted']} requests)")
+    return stats['failed'] == 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Watch export directories and schedule chart/stats jobs')
+    parser.add_argument('directories', nargs='*', default=['.'], help='directories to watch (default: .)')
+    parser.add_argument('--files', nargs='+', help='run the jobs for these exports once instead of watching')
+    parser.add_argument('--workers', type=int, default=WORKERS, help='process pool size')
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE, help='queued jobs before the watcher blocks')
+    parser.add_argument('--poll', type=float, default=POLL_SECONDS, help='seconds between directory scans')
+    parser.add_argument('--existing', action='store_true', help='also process exports present at startup')
+    parser.add_argument('--once', action='store_true', help='process the current exports, then exit')
+    parser.add_argument('--output-dir', help="where charts are written (default: each export's directory)")
+    parser.add_argument('--quality', choices=list(TIERS), help='render tier (default: AGENT_BATTLE_RENDER or publication)')
+    parser.add_argument('--verbose', action='store_true', help="print each job's full output")
+    args = parser.parse_args()
+
+    if args.output_dir:
+        args.output_dir = os.path.abspath(args.output_dir)
+    try:
+        ok = asyncio.run(main(args))
+    except KeyboardInterrupt:
+        print("\n👋 Scheduler stopped")
+        ok = True
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Multi-Run Comparison
+Aligns several simulation runs on a run-wide game index built from simulationParams and charts
+per-strategy mean balance with quantile bands across runs, optionally split into labelled
+configuration groups (e.g. one group per evolution setting, hundreds of seeds each).
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import warnings
+from datetime import datetime
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from render_quality import TIERS, decimate, legend, save_figure, set_tier
+from timeline_store import (ELIMINATION_THRESHOLD, STARTING_BALANCE, export_to_store, games_per_tournament,
+                            global_game_index, load_timeline_store)
+
+KEY_FIELDS = {'name': 'names', 'id': 'strategy_ids', 'archetype': 'archetypes'}
+
+def load_run(path):
+    """Timeline store plus the export's planned games per tournament (0 when unknown)"""
+    if path.endswith('.json'):
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return export_to_store(data, source_path=path), games_per_tournament(data)
+    return load_timeline_store(path), 0
+
+def expand_groups(specs):
+    """Turn 'label=glob' / plain path arguments into {label: [files]} in argument order"""
+    groups = {}
+    for spec in specs:
+        label, pattern = ('runs', spec)
+        if '=' in spec and not os.path.exists(spec):
+            label, pattern = spec.split('=', 1)
+        files = sorted(glob.glob(pattern)) or ([pattern] if os.path.exists(pattern) else [])
+        groups.setdefault(label, []).extend(files)
+    return {label: files for label, files in groups.items() if files}
+
+def align_runs(stores, slots, key_by='name', keys=None):
+    """Stack runs into per-key [run, step] balance rows on the shared game index.
+
+    Only runs where a key appears get a row for it, so memory follows the datapoints
+    rather than keys × runs (evolved names are new in nearly every run). Strategies that
+    share a key within one run (e.g. grouping by archetype) are averaged; steps where
+    a key has no datapoint in a run stay NaN. Returns (keys, {key index: rows}).
+    """
+    field = KEY_FIELDS[key_by]
+    keys = list(keys or [])
+    key_codes = {key: i for i, key in enumerate(keys)}
+    for store in stores:
+        for key in store[field]:
+            if key not in key_codes:
+                key_codes[key] = len(keys)
+                keys.append(key)
+
+    steps_per_run = [global_game_index(store['tournament'], store['game'], slots) for store in stores]
+    n_steps = max((int(steps.max()) + 1 for steps in steps_per_run if len(steps)), default=0)
+    rows = {}
+
+    for store, steps in zip(stores, steps_per_run):
+        codes = np.array([key_codes[key] for key in store[field]], dtype=np.int64)[store['strategy']]
+        present, local = np.unique(codes, return_inverse=True)
+        sums = np.zeros((len(present), n_steps))
+        counts = np.zeros_like(sums)
+        np.add.at(sums, (local, steps), store['balance'])
+        np.add.at(counts, (local, steps), 1)
+        with np.errstate(invalid='ignore'):
+            balances = sums / counts
+        for i, k in enumerate(present):
+            rows.setdefault(int(k), []).append(balances[i])
+
+    return keys, {k: np.vstack(runs) for k, runs in rows.items()}
+
+def pad_steps(rows, n_steps):
+    """Extend every key's rows with NaN steps up to n_steps"""
+    return {k: np.pad(runs, [(0, 0), (0, n_steps - runs.shape[1])], constant_values=np.nan)
+            for k, runs in rows.items()}
+
+def band_statistics(rows, n_keys, n_steps, quantiles=(0.1, 0.9)):
+    """Mean, lower/upper quantiles and number of contributing runs per [key, step]"""
+    mean, low, high = (np.full((n_keys, n_steps), np.nan) for _ in range(3))
+    present = np.zeros((n_keys, n_steps), dtype=np.int64)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN steps stay NaN
+        for k, runs in rows.items():
+            present[k] = np.sum(~np.isnan(runs), axis=0)
+            mean[k] = np.nanmean(runs, axis=0)
+            low[k], high[k] = np.nanquantile(runs, quantiles, axis=0)
+    return {'mean': mean, 'low': low, 'high': high, 'present': present}
+
+def final_values(runs):
+    """Last recorded balance of each of a key's runs (NaN for runs with no datapoint)"""
+    valid = ~np.isnan(runs)
+    last = runs.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+    return np.where(valid.any(axis=1), runs[np.arange(len(runs)), last], np.nan)
+
+def compare_groups(groups, key_by='name', quantiles=(0.1, 0.9)):
+    """Load every run, align all groups on one game index and compute their bands"""
+    loaded = {label: [load_run(path) for path in files] for label, files in groups.items()}
+    slots = max(max(planned, games_per_tournament(games=store['game']))
+                for runs in loaded.values() for store, planned in runs)
+
+    keys = None
+    aligned = {}
+    for label, runs in loaded.items():
+        keys, rows = align_runs([store for store, _ in runs], slots, key_by, keys)
+        aligned[label] = (rows, len(runs))
+
+    # Groups can reach different lengths; bands are computed on the longest game index
+    n_steps = max((runs.shape[1] for rows, _ in aligned.values() for runs in rows.values()), default=0)
+    results = {}
+    for label, (rows, n_runs) in aligned.items():
+        rows = pad_steps(rows, n_steps)
+        results[label] = {'rows': rows, 'runs': n_runs, **band_statistics(rows, len(keys), n_steps, quantiles)}
+
+    n_tournaments = int(np.ceil(n_steps / (slots + 1)))
+    return keys, results, slots, n_tournaments
+
+def _draw_band(ax, steps, stats, k, color, label):
+    shown = stats['present'][k] > 0
+    if not shown.any():
+        return
+    x, mean, low, high = decimate(steps[shown], stats['mean'][k][shown], stats['low'][k][shown], stats['high'][k][shown])
+    ax.plot(x, mean, color=color, linewidth=2, label=label)
+    ax.fill_between(x, low, high, color=color, alpha=0.2)
+
+def _decorate(ax, slots, n_tournaments):
+    for t in range(2, n_tournaments + 1):
+        ax.axvline(x=global_game_index(t, 0, slots), color='gray', linestyle=':', alpha=0.4)
+    ax.axhline(y=STARTING_BALANCE, color='gray', linestyle='--', alpha=0.5)
+    ax.axhline(y=ELIMINATION_THRESHOLD, color='red', linestyle='--', alpha=0.5)
+    ax.grid(True, alpha=0.3)
+
+def create_comparison_chart(keys, results, slots, n_tournaments, top=9, quantiles=(0.1, 0.9)):
+    """One group: every key on shared axes. Several groups: one panel per key, one colour per group."""
+    band = f"q{int(quantiles[0] * 100)}–q{int(quantiles[1] * 100)}"
+    first = next(iter(results.values()))
+    steps = np.arange(first['mean'].shape[1])
+
+    # Keys seen in the most runs for the longest time come first
+    coverage = sum(result['present'].sum(axis=1) for result in results.values())
+    shown_keys = [int(k) for k in np.argsort(-coverage, kind='stable')[:top]]
+
+    if len(results) == 1:
+        label, stats = next(iter(results.items()))
+        fig, ax = plt.subplots(figsize=(14, 8))
+        palette = plt.cm.tab10(np.linspace(0, 1, 10))
+        for i, k in enumerate(shown_keys):
+            _draw_band(ax, steps, stats, k, palette[i % len(palette)], keys[k])
+        _decorate(ax, slots, n_tournaments)
+        ax.set_title(f'Mean Balance Across {stats["runs"]} Runs ({band} band)', fontsize=16, fontweight='bold')
+        ax.set_xlabel('Game (run-wide index)', fontsize=12)
+        ax.set_ylabel('Coin Balance', fontsize=12)
+        legend(ax, bbox_to_anchor=(1.02, 1), loc='upper left')
+    else:
+        cols = min(3, len(shown_keys))
+        rows = int(np.ceil(len(shown_keys) / cols))
+        fig, axes = plt.subplots(rows, cols, figsize=(6 * cols, 4 * rows), sharex=True, sharey=True, squeeze=False)
+        palette = plt.cm.Set1(np.linspace(0, 1, 9))
+        for ax, k in zip(axes.flat, shown_keys):
+            for i, (label, stats) in enumerate(results.items()):
+                _draw_band(ax, steps, stats, k, palette[i % len(palette)], f'{label} (n={stats["runs"]})')
+            _decorate(ax, slots, n_tournaments)
+            ax.set_title(keys[k], fontsize=11, fontweight='bold')
+        for ax in list(axes.flat)[len(shown_keys):]:
+            ax.set_visible(False)
+        axes.flat[0].legend(loc='upper left', fontsize=8)
+        fig.suptitle(f'Configuration Comparison ({band} band)', fontsize=16, fontweight='bold')
+        fig.supxlabel('Game (run-wide index)')
+        fig.supylabel('Coin Balance')
+
+    plt.tight_layout()
+    return fig
+
+def print_summary(keys, results, top=9):
+    print("\n📊 FINAL BALANCE ACROSS RUNS")
+    print("=" * 60)
+    for label, stats in results.items():
+        seen = np.zeros(len(keys), dtype=np.int64)
+        survived = np.zeros(len(keys), dtype=np.int64)
+        mean_final = np.full(len(keys), np.nan)
+        for k, runs in stats['rows'].items():
+            finals = final_values(runs)
+            finals = finals[~np.isnan(finals)]
+            seen[k] = len(finals)
+            survived[k] = (finals > ELIMINATION_THRESHOLD).sum()
+            if len(finals):
+                mean_final[k] = finals.mean()
+
+        print(f"\n{label} ({stats['runs']} runs):")
+        order = [k for k in np.argsort(-np.nan_to_num(mean_final, nan=-np.inf)) if seen[k] > 0][:top]
+        for k in order:
+            print(f"  {keys[k]:<30} mean final {mean_final[k]:7.1f} | "
+                  f"survived {survived[k]}/{seen[k]} runs ({survived[k] / seen[k]:.0%})")
+
+def compare_runs(specs, key_by='name', quantiles=(0.1, 0.9), top=9):
+    groups = expand_groups(specs)
+    if not groups:
+        print("❌ No run files matched")
+        return None
+
+    total = sum(len(files) for files in groups.values())
+    print(f"📁 Comparing {total} runs in {len(groups)} group(s): "
+          + ", ".join(f"{label}={len(files)}" for label, files in groups.items()))
+
+    keys, results, slots, n_tournaments = compare_groups(groups, key_by, quantiles)
+    print(f"🎯 Aligned on {slots} games per tournament, {n_tournaments} tournaments, {len(keys)} {key_by} keys")
+
+    create_comparison_chart(keys, results, slots, n_tournaments, top, quantiles)
+    output_file = f"run_comparison_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+    save_figure(output_file)
+    print(f"✅ Comparison chart saved as: {output_file}")
+
+    print_summary(keys, results, top)
+    return output_file
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare balance trajectories across many runs')
+    parser.add_argument('runs', nargs='+',
+                        help="run files (exports, CSVs, tables dirs, .abtm) or label=glob configuration groups")
+    parser.add_argument('--by', choices=sorted(KEY_FIELDS), default='name', help='match strategies across runs by')
+    parser.add_argument('--quantiles', default='0.1,0.9', help='lower,upper band quantiles')
+    parser.add_argument('--top', type=int, default=9, help='number of strategies to chart')
+    parser.add_argument('--quality', choices=list(TIERS), help='render tier (default: AGENT_BATTLE_RENDER or publication)')
+    args = parser.parse_args()
+
+    if args.quality:
+        set_tier(args.quality)
+
+    quantiles = tuple(float(q) for q in args.quantiles.split(','))
+    if compare_runs(args.runs, args.by, quantiles, args.top) is None:
+        sys.exit(1)
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Static HTML Dashboard
+Writes one self-contained HTML file per run with balance timelines, the matchup heatmap, the family
+tree and the strategy details table, drawn on canvases in the browser instead of as 300-dpi PNGs.
+Data ships inside the page as zlib-compressed binary chunks (typed arrays, base64 in inert script
+tags): one chunk per strategy and tournament range, one for the matchup matrix, one for the details
+rows. A chunk is only decoded when a view first needs it, so runs with millions of datapoints open
+instantly, and the file works from disk with no server.
+"""
+
+import base64
+import json
+import os
+import sys
+import zlib
+
+import numpy as np
+
+from lineage_index import LineageIndex
+from memory_budget import apply_memory_flag, load_export, report_memory
+from strategy_details import COLUMNS, details_rows
+from timeline_store import (ELIMINATION_THRESHOLD, STARTING_BALANCE, export_to_store, final_balances,
+                            games_per_tournament, global_game_index)
+from visualize_evolution_tree import collect_all_strategies
+from visualize_strategy_matrix import matchup_arrays, matchup_strategies
+
+TOURNAMENTS_PER_CHUNK = 50
+DEFAULT_SELECTED = 8
+PALETTE = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f',
+           '#bcbd22', '#17becf', '#393b79', '#637939', '#8c6d31', '#843c39', '#7b4173', '#3182bd']
+
+def encode_chunk(*arrays):
+    """Little-endian arrays concatenated, zlib-compressed and base64-encoded"""
+    payload = b''.join(np.ascontiguousarray(a).astype(a.dtype.newbyteorder('<'), copy=False).tobytes() for a in arrays)
+    return base64.b64encode(zlib.compress(payload, 6)).decode('ascii')
+
+def timeline_chunks(store, slots):
+    """Per-strategy metadata and {key: chunk} of (int32 steps, float32 balances) per tournament range"""
+    steps = global_game_index(store['tournament'], store['game'], slots).astype(np.int32)
+    finals = final_balances(store)
+    offsets = store['offsets']
+    strategies, chunks = [], {}
+    for i, strategy_id in enumerate(store['strategy_ids']):
+        start, end = offsets[i], offsets[i + 1]
+        tournaments = store['tournament'][start:end]
+        ranges = []
+        if end > start:
+            block = (tournaments - 1) // TOURNAMENTS_PER_CHUNK
+            bounds = np.flatnonzero(np.diff(block)) + 1
+            for lo, hi in zip(np.concatenate(([0], bounds)), np.concatenate((bounds, [end - start]))):
+                key = f's{i}_{int(block[lo])}'
+                chunks[key] = encode_chunk(steps[start + lo:start + hi],
+                                           store['balance'][start + lo:start + hi].astype(np.float32))
+                ranges.append([key, int(tournaments[lo]), int(tournaments[hi - 1]), int(hi - lo)])
+        strategies.append({
+            'id': strategy_id, 'name': store['names'][i], 'archetype': store['archetypes'][i],
+            'color': PALETTE[i % len(PALETTE)], 'points': int(end - start),
+            'final': None if np.isnan(finals[i]) else float(finals[i]), 'chunks': ranges
+        })
+    return strategies, chunks
+
+def matchup_chunk(matchups):
+    strategies = matchup_strategies(matchups)
+    wins, losses = matchup_arrays(matchups, strategies)
+    return {'ids': strategies, 'chunk': 'matchups'}, encode_chunk(wins.astype(np.float32), losses.astype(np.float32))
+
+def tree_layout(tournament_data):
+    """Nodes placed by generation (row) and order within it (column), edges weighted by inheritance"""
+    index = LineageIndex()
+    index.update_from_tournaments(tournament_data)
+    ids = list(index.info)
+    position = {strategy_id: i for i, strategy_id in enumerate(ids)}
+    per_generation = {}
+    nodes = []
+    for strategy_id in ids:
+        info = index.info[strategy_id]
+        column = per_generation.setdefault(info['generation'], 0)
+        per_generation[info['generation']] += 1
+        nodes.append({'id': strategy_id, 'name': info['name'], 'gen': info['generation'], 'col': column,
+                      'core': not index.parents[strategy_id],
+                      'parents': [[position[p], round(w, 3)] for p, w in index.parents[strategy_id]],
+                      'shares': [[name, round(share, 3)] for name, share in index.shares(strategy_id, 'name')[:3]]})
+    return {'nodes': nodes, 'widths': {str(g): n for g, n in per_generation.items()}}
+
+def details_chunk(tournament_data):
+    rows = details_rows(collect_all_strategies(tournament_data), tournament_data)
+    table = [[row['name'], row['generation'], row['archetype'],
+              f"(same description as {row['same_as']})" if row['same_as'] else row['description'],
+              row['parents'], row['avoiding'], row['final_balance'], row['win_rate']] for row in rows]
+    payload = np.frombuffer(json.dumps(table).encode('utf-8'), dtype=np.uint8)
+    return {'columns': COLUMNS, 'rows': len(rows), 'chunk': 'details'}, encode_chunk(payload)
+
+def build_dashboard(data, source_path=None):
+    """(meta, chunks) for an enhanced or incremental export"""
+    store = export_to_store(data, source_path=source_path)
+    slots = max(games_per_tournament(data), games_per_tournament(games=store['game']))
+    tournament_data = data.get('tournamentData', data.get('tournaments', []))
+
+    strategies, chunks = timeline_chunks(store, slots)
+    meta = {
+        'title': os.path.basename(source_path) if source_path else 'Agent Battle run',
+        'slots': int(slots),
+        'tournaments': int(store['tournament'].max()) if len(store['tournament']) else 0,
+        'datapoints': int(len(store['balance'])),
+        'starting_balance': STARTING_BALANCE,
+        'elimination_threshold': ELIMINATION_THRESHOLD,
+        'strategies': strategies,
+        'matchups': None, 'tree': None, 'details': None
+    }
+    if data.get('strategyMatchups'):
+        meta['matchups'], chunks['matchups'] = matchup_chunk(data['strategyMatchups'])
+    if tournament_data:
+        meta['tree'] = tree_layout(tournament_data)
+        meta['details'], chunks['details'] = details_chunk(tournament_data)
+    return meta, chunks
+
+def write_dashboard(meta, chunks, output_file):
+    scripts = '\n'.join(f'<script type="application/octet-stream" id="c-{key}">{chunk}</script>'
+                        for key, chunk in chunks.items())
+    meta_json = json.dumps(meta, separators=(',', ':')).replace('</', '<\\/')
+    with open(output_file, 'w') as f:
+        f.write(PAGE.replace('{{TITLE}}', meta['title'])
+                .replace('{{META}}', meta_json)
+                .replace('{{CHUNKS}}', scripts))
+    return output_file
+
+PAGE = r'''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{{TITLE}} · Agent Battle dashboard</title>
+<style>
+body{font-family:sans-serif;margin:0;display:flex;height:100vh;color:#222}
+#side{width:260px;overflow:auto;border-right:1px solid #ccc;padding:8px;font-size:13px}
+#main{flex:1;display:flex;flex-direction:column;min-width:0}
+nav button{padding:6px 12px;border:0;background:#eee;cursor:pointer}nav button.on{background:#bbb;font-weight:bold}
+.view{flex:1;overflow:auto;position:relative;display:none}.view.on{display:block}
+canvas{display:block}#tip{position:fixed;pointer-events:none;background:#fff;border:1px solid #999;padding:3px 6px;font-size:12px;display:none}
+table{border-collapse:collapse;font-size:12px}th,td{border:1px solid #ccc;padding:3px 5px;vertical-align:top;text-align:left}
+th{background:#ddd;position:sticky;top:0}label{display:block;white-space:nowrap;overflow:hidden;text-overflow:ellipsis}
+</style></head><body>
+<div id="side"><h3 id="title"></h3><div id="stats"></div>
+<p>Tournaments <input id="t0" type="number" min="1" style="width:55px"> – <input id="t1" type="number" min="1" style="width:55px"></p>
+<input id="filter" placeholder="filter strategies" style="width:95%"><div id="list"></div></div>
+<div id="main"><nav><button data-v="timeline" class="on">Balances</button><button data-v="matchups">Matchups</button><button data-v="tree">Family tree</button><button data-v="details">Details</button></nav>
+<div id="timeline" class="view on"><canvas id="tc"></canvas></div><div id="matchups" class="view"><canvas id="mc"></canvas></div>
+<div id="tree" class="view"><canvas id="fc"></canvas></div><div id="details" class="view"></div></div>
+<div id="tip"></div>
+<script type="application/json" id="meta">{{META}}</script>
+{{CHUNKS}}
+<script>
+const META = JSON.parse(document.getElementById('meta').textContent);
+const decoded = new Map();
+// Chunks are decoded (base64 -> inflate -> ArrayBuffer) the first time a view asks for them
+function chunk(key) {
+  if (!decoded.has(key)) decoded.set(key, (async () => {
+    const text = document.getElementById('c-' + key).textContent;
+    const bytes = Uint8Array.from(atob(text), c => c.charCodeAt(0));
+    const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('deflate'));
+    return new Response(stream).arrayBuffer();
+  })());
+  return decoded.get(key);
+}
+const tip = document.getElementById('tip');
+function showTip(e, html) { if (!html) { tip.style.display = 'none'; return; } tip.innerHTML = html; tip.style.display = 'block'; tip.style.left = (e.clientX + 12) + 'px'; tip.style.top = (e.clientY + 12) + 'px'; }
+function sizeCanvas(canvas, w, h) { const r = devicePixelRatio || 1; canvas.width = w * r; canvas.height = h * r; canvas.style.width = w + 'px'; canvas.style.height = h + 'px'; const ctx = canvas.getContext('2d'); ctx.setTransform(r, 0, 0, r, 0, 0); return ctx; }
+const esc = s => String(s).replace(/[&<>"]/g, c => ({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c]));
+
+document.getElementById('title').textContent = META.title;
+document.getElementById('stats').textContent = `${META.strategies.length} strategies · ${META.tournaments} tournaments · ${META.datapoints.toLocaleString()} datapoints`;
+const t0 = document.getElementById('t0'), t1 = document.getElementById('t1');
+t0.value = 1; t1.value = Math.max(1, META.tournaments);
+const selected = new Set(META.strategies.map((s, i) => i).filter(i => META.strategies[i].final !== null)
+  .sort((a, b) => META.strategies[b].final - META.strategies[a].final).slice(0, {{DEFAULT_SELECTED}}));
+function renderList() {
+  const f = document.getElementById('filter').value.toLowerCase();
+  document.getElementById('list').innerHTML = META.strategies.map((s, i) => s.name.toLowerCase().includes(f) || s.id.includes(f) ?
+    `<label title="${esc(s.id)}"><input type="checkbox" data-i="${i}" ${selected.has(i) ? 'checked' : ''}> <span style="color:${s.color}">■</span> ${esc(s.name)} <small>(${s.final === null ? '-' : Math.round(s.final)})</small></label>` : '').join('');
+}
+document.getElementById('filter').oninput = renderList;
+document.getElementById('list').onchange = e => { const i = +e.target.dataset.i; e.target.checked ? selected.add(i) : selected.delete(i); drawTimeline(); };
+[t0, t1].forEach(el => el.onchange = drawTimeline);
+
+// Balances: only chunks overlapping the tournament range of selected strategies are decoded,
+// and each series is reduced to min/max per pixel column before drawing
+let timelineSeries = [];
+async function drawTimeline() {
+  const view = document.getElementById('timeline');
+  const W = Math.max(400, view.clientWidth - 10), H = Math.max(300, view.clientHeight - 10);
+  const lo = Math.max(1, +t0.value), hi = Math.max(lo, +t1.value);
+  const x0 = (lo - 1) * (META.slots + 1), x1 = hi * (META.slots + 1);
+  const series = [];
+  for (const i of selected) {
+    const s = META.strategies[i];
+    for (const [key, from, to, n] of s.chunks) {
+      if (to < lo || from > hi) continue;
+      const buffer = await chunk(key);
+      series.push({i, steps: new Int32Array(buffer, 0, n), balances: new Float32Array(buffer, 4 * n, n)});
+    }
+  }
+  timelineSeries = series;
+  let yMax = META.starting_balance * 1.2;
+  for (const s of series) for (let k = 0; k < s.balances.length; k++) if (s.steps[k] >= x0 && s.steps[k] <= x1 && s.balances[k] > yMax) yMax = s.balances[k];
+  const ctx = sizeCanvas(document.getElementById('tc'), W, H), L = 60, B = 30, T = 10, R = 10;
+  const px = x => L + (x - x0) / Math.max(1, x1 - x0) * (W - L - R), py = y => H - B - y / yMax * (H - B - T);
+  ctx.clearRect(0, 0, W, H); ctx.font = '11px sans-serif'; ctx.fillStyle = '#444';
+  for (let k = 0; k <= 5; k++) { const y = yMax * k / 5; ctx.fillText(Math.round(y), 5, py(y) + 4); ctx.strokeStyle = '#eee'; ctx.beginPath(); ctx.moveTo(L, py(y)); ctx.lineTo(W - R, py(y)); ctx.stroke(); }
+  const every = Math.max(1, Math.ceil((hi - lo + 1) / 20));
+  for (let t = lo; t <= hi; t += every) { const x = px((t - 1) * (META.slots + 1)); ctx.strokeStyle = '#ddd'; ctx.beginPath(); ctx.moveTo(x, T); ctx.lineTo(x, H - B); ctx.stroke(); ctx.fillText('T' + t, x + 2, H - B + 14); }
+  for (const [y, color] of [[META.starting_balance, '#999'], [META.elimination_threshold, '#d33']]) { ctx.setLineDash([5, 4]); ctx.strokeStyle = color; ctx.beginPath(); ctx.moveTo(L, py(y)); ctx.lineTo(W - R, py(y)); ctx.stroke(); ctx.setLineDash([]); }
+  for (const s of series) {
+    ctx.strokeStyle = META.strategies[s.i].color; ctx.lineWidth = 1.5; ctx.beginPath();
+    let column = -1, cMin = 0, cMax = 0, started = false;
+    const flush = () => { if (column < 0) return; if (!started) { ctx.moveTo(column, py(cMin)); started = true; } ctx.lineTo(column, py(cMin)); ctx.lineTo(column, py(cMax)); };
+    for (let k = 0; k < s.steps.length; k++) {
+      const step = s.steps[k]; if (step < x0 || step > x1) continue;
+      const c = Math.round(px(step)), b = s.balances[k];
+      if (c !== column) { flush(); column = c; cMin = cMax = b; } else { if (b < cMin) cMin = b; if (b > cMax) cMax = b; }
+    }
+    flush(); ctx.stroke();
+  }
+  const tc = document.getElementById('tc');
+  tc.onmousemove = e => {
+    const rect = tc.getBoundingClientRect(), step = x0 + (e.clientX - rect.left - L) / (W - L - R) * (x1 - x0);
+    const rows = timelineSeries.map(s => { let best = -1; for (let k = 0; k < s.steps.length; k++) if (s.steps[k] <= step) best = k; return best < 0 ? null : [s.i, s.balances[best]]; })
+      .filter(r => r).reduce((m, [i, b]) => m.set(i, b), new Map());
+    const t = Math.floor(step / (META.slots + 1)) + 1, g = Math.round(step % (META.slots + 1));
+    showTip(e, `T${t} G${g}<br>` + [...rows].sort((a, b) => b[1] - a[1]).slice(0, 12).map(([i, b]) => `<span style="color:${META.strategies[i].color}">■</span> ${esc(META.strategies[i].name)}: ${Math.round(b)}`).join('<br>'));
+  };
+  tc.onmouseleave = e => showTip(e, null);
+}
+
+async function drawMatchups() {
+  const view = document.getElementById('matchups');
+  if (!META.matchups) { view.textContent = 'No strategyMatchups in this export.'; return; }
+  const ids = META.matchups.ids, n = ids.length, buffer = await chunk(META.matchups.chunk);
+  const wins = new Float32Array(buffer, 0, n * n), losses = new Float32Array(buffer, 4 * n * n, n * n);
+  const cell = Math.max(4, Math.min(24, Math.floor((Math.min(view.clientWidth, view.clientHeight) - 40) / n)));
+  const ctx = sizeCanvas(document.getElementById('mc'), n * cell + 20, n * cell + 20);
+  for (let r = 0; r < n; r++) for (let c = 0; c < n; c++) {
+    const w = wins[r * n + c], l = losses[r * n + c], rate = w + l > 0 ? w / (w + l) : null;
+    ctx.fillStyle = rate === null ? '#eee' : `hsl(${Math.round(rate * 120)},65%,55%)`;
+    ctx.fillRect(10 + c * cell, 10 + r * cell, cell - (cell > 6), cell - (cell > 6));
+  }
+  const mc = document.getElementById('mc');
+  mc.onmousemove = e => {
+    const rect = mc.getBoundingClientRect(), c = Math.floor((e.clientX - rect.left - 10) / cell), r = Math.floor((e.clientY - rect.top - 10) / cell);
+    if (r < 0 || c < 0 || r >= n || c >= n) return showTip(e, null);
+    const w = wins[r * n + c], l = losses[r * n + c];
+    showTip(e, `${esc(ids[r])} vs ${esc(ids[c])}<br>${w}W / ${l}L` + (w + l ? ` (${(100 * w / (w + l)).toFixed(0)}%)` : ''));
+  };
+  mc.onmouseleave = e => showTip(e, null);
+}
+
+function drawTree() {
+  const view = document.getElementById('tree');
+  if (!META.tree) { view.textContent = 'No tournament data in this export.'; return; }
+  const nodes = META.tree.nodes, widest = Math.max(...Object.values(META.tree.widths)), gens = Math.max(...nodes.map(d => d.gen)) + 1;
+  const dx = 110, dy = 70, W = widest * dx + 80, H = gens * dy + 40;
+  const ctx = sizeCanvas(document.getElementById('fc'), W, H);
+  const pos = nodes.map(d => [40 + (d.col + (widest - META.tree.widths[d.gen]) / 2) * dx + dx / 2, 30 + d.gen * dy]);
+  nodes.forEach((d, i) => d.parents.forEach(([p, w]) => { ctx.strokeStyle = `rgba(60,120,60,${0.2 + 0.6 * w})`; ctx.lineWidth = 1 + 4 * w; ctx.beginPath(); ctx.moveTo(...pos[p]); ctx.lineTo(...pos[i]); ctx.stroke(); }));
+  ctx.font = '10px sans-serif'; ctx.textAlign = 'center';
+  nodes.forEach((d, i) => { ctx.fillStyle = d.core ? '#9cc9e8' : '#a6e3a6'; ctx.beginPath(); ctx.arc(...pos[i], 8, 0, 7); ctx.fill(); ctx.fillStyle = '#222'; ctx.fillText(d.name.slice(0, 18), pos[i][0], pos[i][1] + 20); });
+  const fc = document.getElementById('fc');
+  fc.onmousemove = e => {
+    const rect = fc.getBoundingClientRect(), x = e.clientX - rect.left, y = e.clientY - rect.top;
+    const i = pos.findIndex(([px, py]) => (px - x) ** 2 + (py - y) ** 2 < 100);
+    showTip(e, i < 0 ? null : `<b>${esc(nodes[i].name)}</b> (gen ${nodes[i].gen})<br>` + nodes[i].shares.map(([name, s]) => `${(100 * s).toFixed(0)}% ${esc(name)}`).join('<br>'));
+  };
+  fc.onmouseleave = e => showTip(e, null);
+}
+
+async function drawDetails() {
+  const view = document.getElementById('details');
+  if (!META.details) { view.textContent = 'No tournament data in this export.'; return; }
+  if (view.dataset.done) return;
+  const rows = JSON.parse(new TextDecoder().decode(await chunk(META.details.chunk)));
+  view.innerHTML = '<table><thead><tr>' + META.details.columns.map(c => `<th>${esc(c)}</th>`).join('') + '</tr></thead><tbody>' +
+    rows.map(r => '<tr>' + r.map(v => `<td>${esc(v)}</td>`).join('') + '</tr>').join('') + '</tbody></table>';
+  view.dataset.done = 1;
+}
+
+const draw = {timeline: drawTimeline, matchups: drawMatchups, tree: drawTree, details: drawDetails};
+document.querySelector('nav').onclick = e => {
+  const v = e.target.dataset.v; if (!v) return;
+  document.querySelectorAll('nav button').forEach(b => b.classList.toggle('on', b === e.target));
+  document.querySelectorAll('.view').forEach(el => el.classList.toggle('on', el.id === v));
+  draw[v]();
+};
+window.onresize = () => draw[document.querySelector('nav button.on').dataset.v]();
+renderList(); drawTimeline();
+</script></body></html>
+'''.replace('{{DEFAULT_SELECTED}}', str(DEFAULT_SELECTED))
+
+if __name__ == "__main__":
+    apply_memory_flag()
+    if len(sys.argv) < 2:
+        print("Usage: python3 dashboard_export.py <evolution_data.json | progress.json> [output.html] [--memory-budget MB]")
+        sys.exit(1)
+
+    json_file = sys.argv[1]
+    output_file = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(os.path.basename(json_file))[0] + '_dashboard.html'
+    meta, chunks = build_dashboard(load_export(json_file), source_path=json_file)
+    write_dashboard(meta, chunks, output_file)
+    print(f"✅ Dashboard saved as: {output_file} ({os.path.getsize(output_file) / 1024:.0f} KB, "
+          f"{len(chunks)} data chunks, {meta['datapoints']} datapoints)")
+    report_memory()
@@ -1048,6 +1048,12 @@ function generateProgressReport(progressFile) {
       const csvFile = `progress_timeline_${timestamp}.csv`;
       reporter.exportBalanceTimelineCSV(csvFile);
       
+      // chart_scheduler.py, if running, picks the CSV up itself and renders it on its bounded pool
+      if (process.env.AGENT_BATTLE_SCHEDULER) {
+        console.log('📊 AGENT_BATTLE_SCHEDULER set: chart left to chart_scheduler.py (start it if it is not running)');
+        return reportFile;
+      }
+
       // Generate chart
       try {
         const { exec } = require('child_process');
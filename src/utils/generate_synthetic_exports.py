@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Synthetic Export Generator
+Writes seeded, economically consistent enhanced_evolution, progress, balance timeline CSV and
+matrix log files at any scale so the Python tools can be exercised beyond the sample runs.
+"""
+
+import argparse
+import json
+import os
+import random
+from datetime import datetime, timedelta, timezone
+
+ENTRY_FEE = 100
+STARTING_BALANCE = 500
+ELIMINATION_THRESHOLD = 100
+
+ARCHETYPES = [
+    ('aggressive_maximizer', 'Aggressive Maximizer', 'AGGRESSIVE',
+     'Demand the largest possible share. Use threats and aggressive tactics.'),
+    ('diplomatic_builder', 'Diplomatic Builder', 'DIPLOMATIC',
+     'Build long-term trust through consistently fair offers. Prioritize mutual benefit.'),
+    ('strategic_opportunist', 'Strategic Opportunist', 'OPPORTUNISTIC',
+     'Adapt rapidly to changing situations. Form and break alliances based on immediate advantage.'),
+    ('mathematical_analyzer', 'Mathematical Analyzer', 'ANALYTICAL',
+     'Make decisions based on expected value and probability of proposals passing.'),
+    ('social_manipulator', 'Social Manipulator', 'MANIPULATIVE',
+     'Use psychological tactics, flattery and misdirection to sway votes.'),
+    ('strategy_identifier', 'Strategy Identifier', 'STRATEGY_IDENTIFIER',
+     'Analyze opponent negotiation patterns, proposal behaviors and voting tendencies.')
+]
+
+EVOLVED_WORDS = ['Adaptive', 'Analytical', 'Alliance', 'Versatile', 'Tactician', 'Architect',
+                 'Intuition', 'Strategist', 'Balanced', 'Resilient', 'Calculated', 'Opportunist']
+
+NEGOTIATION_MESSAGES = [
+    'Matrix update completed: strategic positioning optimized',
+    'Matrix update completed: coalition offers adjusted',
+    'Matrix update completed: vote requests recalibrated'
+]
+
+PROMPT_TEMPLATE = ("IDENTITY:\nYou are a player who has been brought to this world to be successful at this game "
+                   "by making money over the long run. For this game you paid {fee} coins to enter, and {others} "
+                   "other players entered, meaning the total pool available to be disbursed is {pool} coins.\n\n"
+                   "GAME MECHANICS:\n" + "Negotiate, propose and vote on how to split the prize pool. " * 40 +
+                   "\n\nCURRENT ROUND: {round}\nYOUR NAME: {name}\n")
+
+def _shares(rng, n, total=100):
+    """Random non-negative integer shares of n players summing to total"""
+    cuts = sorted(rng.randint(0, total) for _ in range(n - 1))
+    return [b - a for a, b in zip([0] + cuts, cuts + [total])]
+
+def _win_rate(strategy):
+    """Win rate as the percentage string the exports use"""
+    wins = sum(h['isWinner'] for h in strategy['winHistory'])
+    return f"{wins / max(len(strategy['winHistory']), 1) * 100:.1f}"
+
+def _new_strategy(strategy_id, name, archetype, text, balance, generation=0, parents=None):
+    """Fresh strategy record in the exports' strategy layout"""
+    return {
+        'id': strategy_id,
+        'name': name,
+        'strategy': text,
+        'archetype': archetype,
+        'coinBalance': balance,
+        'gamesPlayed': 0,
+        'totalInvested': 0,
+        'totalReturned': 0,
+        'winHistory': [],
+        'eliminationCount': 0,
+        'generation': generation,
+        'parents': parents or []
+    }
+
+def _core_population(n_strategies):
+    """Core archetypes, repeated with numbered variants when more seats are requested"""
+    population = []
+    for i in range(n_strategies):
+        base_id, name, archetype, text = ARCHETYPES[i % len(ARCHETYPES)]
+        suffix = i // len(ARCHETYPES)
+        strategy_id = base_id if suffix == 0 else f'{base_id}_{suffix}'
+        display = name if suffix == 0 else f'{name} {suffix + 1}'
+        population.append(_new_strategy(strategy_id, display, archetype, text, STARTING_BALANCE))
+    return population
+
+def _play_game(rng, game_number, population, n_rounds, clock, error_metrics, matrix_log):
+    """Simulate one game and return its export record"""
+    players = [{'id': f'player{i + 1}', 'name': s['name'],
+                'agent': {'strategy': s['strategy'], 'type': 'llm', 'strategyId': s['id']}}
+               for i, s in enumerate(population)]
+    player_ids = [p['id'] for p in players]
+    pool = ENTRY_FEE * len(population)
+
+    rounds = []
+    for round_number in range(1, n_rounds + 1):
+        negotiations = []
+        for speaker, strategy in zip(player_ids, population):
+            for _ in range(max(1, len(population) // 2)):
+                negotiations.append({
+                    'playerId': speaker, 'playerName': strategy['name'], 'strategyId': strategy['id'],
+                    'message': rng.choice(NEGOTIATION_MESSAGES), 'round': round_number,
+                    'negotiationRound': 1, 'isMatrixBased': True, 'isEliminated': False
+                })
+            clock[0] += timedelta(seconds=rng.uniform(0.5, 3))
+            matrix_log.append({
+                'timestamp': clock[0].isoformat(timespec='milliseconds').replace('+00:00', 'Z'),
+                'playerName': strategy['name'], 'playerIndex': player_ids.index(speaker), 'round': round_number,
+                'prompt': PROMPT_TEMPLATE.format(fee=ENTRY_FEE, others=len(population) - 1, pool=pool,
+                                                 round=round_number, name=strategy['name']),
+                'response': json.dumps({'matrixRow': _shares(rng, len(population) * 3, 300)}),
+                'success': True, 'error': None, 'corrected': False
+            })
+            if rng.random() < 0.3:
+                record = error_metrics['negotiationFailures'].setdefault(
+                    strategy['id'], {'count': 0, 'errors': [], 'playerId': speaker})
+                for _ in range(rng.randint(1, 4)):
+                    record['errors'].append({
+                        'error': 'Matrix update failed',
+                        'timestamp': clock[0].isoformat(timespec='milliseconds').replace('+00:00', 'Z'),
+                        'gameNumber': game_number
+                    })
+                    record['count'] += 1
+
+        proposals = [{'playerId': pid, 'playerName': s['name'], 'strategyId': s['id'],
+                      'proposal': dict(zip(player_ids, _shares(rng, len(population))))}
+                     for pid, s in zip(player_ids, population)]
+        votes = {pid: {'playerId': pid, 'votes': dict(zip(player_ids, _shares(rng, len(population)))),
+                       'playerName': s['name'], 'strategyId': s['id']}
+                 for pid, s in zip(player_ids, population)}
+        totals = {pid: sum(v['votes'][pid] for v in votes.values()) for pid in player_ids}
+        results = [{'playerId': pid, 'name': s['name'], 'strategyId': s['id'], 'votes': totals[pid],
+                    'percentage': round(totals[pid] / len(population))}
+                   for pid, s in zip(player_ids, population)]
+        rounds.append({'roundNumber': round_number, 'negotiations': negotiations, 'proposals': proposals,
+                       'votes': votes, 'results': results, 'coalitionsFormed': [], 'strategicMoves': []})
+
+    last_round = rounds[-1]
+    winner_idx = max(range(len(population)), key=lambda i: last_round['results'][i]['votes'])
+    winning = last_round['proposals'][winner_idx]
+    distribution = {pid: pool * share // 100 for pid, share in winning['proposal'].items()}
+
+    economic_impact = []
+    for i, (pid, strategy) in enumerate(zip(player_ids, population)):
+        payout = distribution[pid]
+        profit = payout - ENTRY_FEE
+        strategy['coinBalance'] += profit
+        strategy['gamesPlayed'] += 1
+        strategy['totalInvested'] += ENTRY_FEE
+        strategy['totalReturned'] += payout
+        strategy['winHistory'].append({'game': game_number, 'isWinner': i == winner_idx,
+                                       'profit': profit, 'newBalance': strategy['coinBalance']})
+        economic_impact.append({'strategyId': strategy['id'], 'playerName': strategy['name'],
+                                'entryFee': ENTRY_FEE, 'payout': payout, 'profit': profit,
+                                'isWinner': i == winner_idx})
+
+    winner_result = last_round['results'][winner_idx]
+    return {
+        'gameNumber': game_number,
+        'players': players,
+        'rounds': rounds,
+        'finalResult': {
+            'winner': winner_result,
+            'winningProposal': winning,
+            'economicDistribution': distribution
+        },
+        'economicImpact': economic_impact
+    }
+
+def _evolve(rng, tournament_num, population, eliminate_count):
+    """Eliminate the weakest strategies and breed replacements from the strongest"""
+    ranked = sorted(population, key=lambda s: s['coinBalance'])
+    bankrupt = [s for s in ranked if s['coinBalance'] < ELIMINATION_THRESHOLD]
+    eliminated = bankrupt + [s for s in ranked if s not in bankrupt][:max(0, eliminate_count - len(bankrupt))]
+    survivors = [s for s in population if s not in eliminated]
+    top = sorted(survivors, key=lambda s: s['coinBalance'], reverse=True)[:2] or ranked[-2:]
+
+    created = []
+    start_balance = round(sum(s['coinBalance'] for s in survivors) / max(len(survivors), 1))
+    for i in range(len(eliminated)):
+        weight = rng.randint(50, 80)
+        parents = [{'name': top[0]['name'], 'weight': weight}]
+        if len(top) > 1:
+            parents.append({'name': top[1]['name'], 'weight': 100 - weight})
+        name = ' '.join(rng.sample(EVOLVED_WORDS, 2)) + f' G{tournament_num}.{i}'
+        text = f"{rng.choice(EVOLVED_WORDS)} blend of {parents[0]['name']} tactics, avoiding {eliminated[i]['name']}."
+        child = _new_strategy(f'evolved_competitive_gen{tournament_num}_{i}', name, 'EVOLVED_COMPETITIVE',
+                              text, start_balance, generation=tournament_num, parents=parents)
+        child['avoiding'] = eliminated[i]['name']
+        created.append(child)
+
+    return eliminated, survivors, created
+
+def generate_run(seed=42, n_strategies=6, n_tournaments=3, n_games=5, n_rounds=1, eliminate_count=2):
+    """Generate one complete synthetic run.
+
+    Returns (export, progress, csv_rows, matrix_log), where export has the
+    enhanced_evolution layout and progress the incremental_progress layout.
+    """
+    rng = random.Random(seed)
+    clock = [datetime(2025, 6, 1, tzinfo=timezone.utc) + timedelta(seconds=seed % 86400)]
+    population = _core_population(n_strategies)
+    error_metrics = {'negotiationFailures': {}, 'proposalFailures': {}, 'voteFailures': {}}
+    matrix_log = []
+    matchups = {}
+    balance_timeline = {}
+    tournaments = []
+    all_strategies = {}
+
+    def snapshot(strategy):
+        return {k: v for k, v in strategy.items() if k not in ('generation', 'parents')} | \
+            {'winHistory': list(strategy['winHistory'])}
+
+    for tournament_num in range(1, n_tournaments + 1):
+        for strategy in population:
+            all_strategies[strategy['id']] = strategy
+            timeline = balance_timeline.setdefault(strategy['id'], {
+                'name': strategy['name'], 'archetype': strategy['archetype'], 'dataPoints': []})
+            timeline['dataPoints'].append({'tournament': tournament_num, 'game': 0,
+                                           'balance': strategy['coinBalance'], 'profit': 0,
+                                           'isWinner': False, 'isEliminated': False})
+
+        starting = [snapshot(s) for s in population]
+        games = []
+        for game_number in range(1, n_games + 1):
+            game = _play_game(rng, game_number, population, n_rounds, clock, error_metrics, matrix_log)
+            games.append(game)
+
+            winner_id = game['finalResult']['winner']['strategyId']
+            for impact in game['economicImpact']:
+                strategy_id = impact['strategyId']
+                balance = all_strategies[strategy_id]['coinBalance']
+                balance_timeline[strategy_id]['dataPoints'].append({
+                    'tournament': tournament_num, 'game': game_number, 'balance': balance,
+                    'profit': impact['profit'], 'isWinner': impact['isWinner'],
+                    'isEliminated': balance < ELIMINATION_THRESHOLD})
+                if strategy_id != winner_id:
+                    matchups.setdefault(winner_id, {}).setdefault(strategy_id, {'wins': 0, 'losses': 0})['wins'] += 1
+                    matchups.setdefault(strategy_id, {}).setdefault(winner_id, {'wins': 0, 'losses': 0})['losses'] += 1
+
+        eliminated, survivors, created = _evolve(rng, tournament_num, population, eliminate_count)
+
+        tournaments.append({
+            'tournamentNumber': tournament_num,
+            'strategies': starting,
+            'games': games,
+            'startingBalances': [{'id': s['id'], 'name': s['name'], 'balance': s['coinBalance']} for s in starting],
+            'endingBalances': [{'id': s['id'], 'name': s['name'], 'balance': s['coinBalance'],
+                                'balanceChange': s['coinBalance'] - b['coinBalance']}
+                               for s, b in zip(population, starting)],
+            'strategiesEliminated': [snapshot(s) for s in eliminated],
+            'strategiesEvolved': [snapshot(c) | {'basedOn': c['parents'], 'avoiding': c['avoiding']} for c in created],
+            'evolutionDetails': {
+                'eliminated': [{'id': s['id'], 'name': s['name'], 'strategy': s['strategy'],
+                                'finalBalance': s['coinBalance'], 'archetype': s['archetype'],
+                                'gamesPlayed': s['gamesPlayed'], 'winRate': _win_rate(s)} for s in eliminated],
+                'created': [{'id': c['id'], 'name': c['name'], 'strategy': c['strategy'],
+                             'archetype': c['archetype'], 'parents': c['parents'], 'avoiding': c['avoiding'],
+                             'startingBalance': c['coinBalance'], 'generation': c['generation']} for c in created],
+                'survivors': [{'id': s['id'], 'name': s['name'], 'strategy': s['strategy'],
+                               'archetype': s['archetype'], 'balance': s['coinBalance'],
+                               'gamesPlayed': s['gamesPlayed'], 'winRate': _win_rate(s)} for s in survivors]
+            }
+        })
+
+        population = survivors + created
+
+    final_stats = sorted((snapshot(s) for s in all_strategies.values()), key=lambda s: s['coinBalance'], reverse=True)
+    export = {
+        'simulationParams': {'numberOfTournaments': n_tournaments, 'gamesPerTournament': n_games},
+        'finalStats': final_stats,
+        'tournaments': tournaments,
+        'balanceTimeline': balance_timeline,
+        'strategyMatchups': matchups,
+        'errorMetrics': dict(error_metrics, totalGames=n_tournaments * n_games),
+        'completedAt': clock[0].isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+    }
+
+    progress = {
+        'completedTournaments': n_tournaments,
+        'totalTournaments': n_tournaments,
+        'timestamp': export['completedAt'],
+        'tournamentData': tournaments,
+        'balanceTimeline': balance_timeline,
+        'errorMetrics': error_metrics,
+        'strategyMatchups': matchups,
+        'currentStrategies': [snapshot(s) for s in population]
+    }
+
+    csv_rows = [(timeline['name'], strategy_id, p['tournament'], p['game'], p['balance'], p['profit'],
+                 str(p['isWinner']).lower(), str(p['isEliminated']).lower())
+                for strategy_id, timeline in balance_timeline.items() for p in timeline['dataPoints']]
+
+    return export, progress, csv_rows, matrix_log
+
+def bankruptcy_progress(export, games_played):
+    """Build a bankruptcy_progress snapshot in the bankruptcy evolution system's layout"""
+    strategies = []
+    for strategy in export['finalStats']:
+        wins = sum(h['isWinner'] for h in strategy['winHistory'])
+        total_profit = sum(h['profit'] for h in strategy['winHistory'])
+        strategies.append({
+            'id': strategy['id'], 'name': strategy['name'], 'archetype': strategy['archetype'],
+            'strategy': strategy['strategy'], 'coinBalance': strategy['coinBalance'],
+            'gamesPlayed': strategy['gamesPlayed'], 'wins': wins,
+            'avgProfit': round(total_profit / max(strategy['gamesPlayed'], 1)), 'totalProfit': total_profit,
+            'generationNumber': 1, 'parentIds': None
+        })
+    return {
+        'timestamp': export['completedAt'],
+        'totalGamesPlayed': games_played,
+        'totalEvolutions': sum(len(t['evolutionDetails']['created']) for t in export['tournaments']),
+        'strategies': strategies,
+        'eliminatedStrategies': [e for t in export['tournaments'] for e in t['evolutionDetails']['eliminated']],
+        'evolutionHistory': [],
+        'systemParams': {'entryFee': ENTRY_FEE, 'startingBalance': STARTING_BALANCE,
+                         'populationSize': len(export['tournaments'][0]['strategies']), 'gameDelayMinutes': 5}
+    }
+
+def write_synthetic_files(output_dir, seed=42, n_strategies=6, n_tournaments=3, n_games=5, n_rounds=1):
+    """Generate a run and write every export flavour into output_dir; returns {kind: path}"""
+    os.makedirs(output_dir, exist_ok=True)
+    export, progress, csv_rows, matrix_log = generate_run(seed, n_strategies, n_tournaments, n_games, n_rounds)
+    stamp = export['completedAt'].replace(':', '-').replace('.', '-')
+
+    paths = {
+        'enhanced_evolution': os.path.join(output_dir, f'enhanced_evolution_{stamp}.json'),
+        'incremental_progress': os.path.join(output_dir, f'incremental_progress_t{n_tournaments}_{stamp}.json'),
+        'bankruptcy_progress': os.path.join(output_dir, f'bankruptcy_progress_g{n_tournaments * n_games}_{stamp}.json'),
+        'balance_timeline_csv': os.path.join(output_dir, f'balance_timeline_{stamp}.csv'),
+        'matrix_log': os.path.join(output_dir, f'improved_matrix_log_{stamp}.json')
+    }
+
+    with open(paths['enhanced_evolution'], 'w') as f:
+        json.dump(export, f, indent=2)
+    with open(paths['incremental_progress'], 'w') as f:
+        json.dump(progress, f, indent=2)
+    with open(paths['bankruptcy_progress'], 'w') as f:
+        json.dump(bankruptcy_progress(export, n_tournaments * n_games), f, indent=2)
+    with open(paths['balance_timeline_csv'], 'w', newline='') as f:
+        f.write('Strategy,StrategyId,Tournament,Game,Balance,Profit,IsWinner,IsEliminated\n')
+        for row in csv_rows:
+            f.write(','.join([json.dumps(row[0]), json.dumps(row[1])] + [str(v) for v in row[2:]]) + '\n')
+    with open(paths['matrix_log'], 'w') as f:
+        json.dump(matrix_log, f, indent=2)
+
+    return paths
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate synthetic Agent Battle exports')
+    parser.add_argument('output_dir', nargs='?', default='synthetic_exports')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--strategies', type=int, default=6, help='strategies per tournament')
+    parser.add_argument('--tournaments', type=int, default=3)
+    parser.add_argument('--games', type=int, default=5, help='games per tournament')
+    parser.add_argument('--rounds', type=int, default=1, help='negotiation rounds per game')
+    args = parser.parse_args()
+
+    print(f"🧪 Generating {args.tournaments} tournaments × {args.games} games with "
+          f"{args.strategies} strategies (seed {args.seed})...")
+    paths = write_synthetic_files(args.output_dir, args.seed, args.strategies,
+                                  args.tournaments, args.games, args.rounds)
+    for kind, path in paths.items():
+        print(f"✅ {kind}: {path} ({os.path.getsize(path) / 1024:.0f} KB)")
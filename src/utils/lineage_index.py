@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Lineage Closure Index
+Precomputes every strategy's ancestor closure with inheritance weights, so ancestry questions
+("41% of this survivor's ancestry is Aggressive Maximizer", "is A an ancestor of B", "everything
+descended from C") are dictionary lookups instead of graph walks. Parents always exist before their
+children, so each new strategy's closure is built from its parents' closures as it arrives and the
+index grows incrementally with every generation.
+"""
+
+import json
+import sys
+from collections import Counter, defaultdict
+
+from memory_budget import apply_memory_flag, load_export, report_memory
+
+LINEAGE_VERSION = 1
+
+class LineageIndex:
+    """Ancestor/descendant closures and weighted ancestry shares, maintained incrementally.
+
+    `ancestry[s]` maps every ancestor of s to the fraction of s inherited from it, summed over all
+    paths (parent weights are normalised per child). Founders (strategies without parents) map to
+    themselves with share 1, and the founder shares of any strategy add up to 1.
+    """
+
+    def __init__(self):
+        self.info = {}                         # id -> {'name', 'archetype', 'generation'}
+        self.parents = {}                      # id -> [(parent id, normalised weight)]
+        self.ancestry = {}                     # id -> {ancestor id: share}
+        self.founder_shares = {}               # id -> {founder id: share}
+        self.depths = {}                       # id -> longest parent chain back to a founder
+        self.descendants = defaultdict(set)    # id -> every strategy that inherits from it
+        self._by_name = {}                     # name -> latest id with that name
+
+    def __contains__(self, strategy_id):
+        return strategy_id in self.info
+
+    def __len__(self):
+        return len(self.info)
+
+    def add(self, strategy_id, name=None, archetype=None, generation=0, parents=()):
+        """Add one strategy; parents are (id, weight) pairs already in the index. Returns False if known."""
+        if strategy_id in self.info:
+            return False
+        parents = [(p, float(w)) for p, w in parents if p in self.info and p != strategy_id]
+        total = sum(w for _, w in parents)
+        if parents and total <= 0:
+            parents, total = [(p, 1.0) for p, _ in parents], float(len(parents))
+        parents = [(p, w / total) for p, w in parents]
+
+        self.info[strategy_id] = {'name': name or strategy_id, 'archetype': archetype, 'generation': generation}
+        self.parents[strategy_id] = parents
+        self._by_name[name or strategy_id] = strategy_id
+
+        ancestry = Counter()
+        founders = Counter()
+        for parent, weight in parents:
+            ancestry[parent] += weight
+            for ancestor, share in self.ancestry[parent].items():
+                ancestry[ancestor] += weight * share
+            for founder, share in self.founder_shares[parent].items():
+                founders[founder] += weight * share
+        self.ancestry[strategy_id] = dict(ancestry)
+        self.depths[strategy_id] = max((self.depths[p] + 1 for p, _ in parents), default=0)
+        self.founder_shares[strategy_id] = dict(founders) if parents else {strategy_id: 1.0}
+        for ancestor in ancestry:
+            self.descendants[ancestor].add(strategy_id)
+        return True
+
+    def resolve_name(self, name):
+        """Latest strategy id with this name (export parents are recorded by name)"""
+        return self._by_name.get(name)
+
+    def ancestors(self, strategy_id):
+        return self.ancestry.get(strategy_id, {}).keys()
+
+    def is_ancestor(self, ancestor_id, strategy_id):
+        return ancestor_id in self.ancestry.get(strategy_id, {})
+
+    def shares(self, strategy_id, by='founder'):
+        """Ancestry shares by founder id, founder name or founder archetype, largest first"""
+        shares = Counter()
+        for founder, share in self.founder_shares.get(strategy_id, {}).items():
+            key = founder if by == 'founder' else self.info[founder]['name' if by == 'name' else 'archetype']
+            shares[key] += share
+        return shares.most_common()
+
+    # Loading
+
+    def update_from_tournaments(self, tournament_data):
+        """Add strategies from enhanced/incremental exports in tournament order; returns how many were new"""
+        added = 0
+        for tournament in tournament_data:
+            number = tournament.get('tournamentNumber', 0)
+            for strategy in tournament.get('strategies', []):
+                added += self.add(strategy['id'], strategy.get('name'), strategy.get('archetype'), 0)
+            evolution_details = tournament.get('evolutionDetails', {})
+            created = evolution_details.get('created', []) + [
+                dict(evolved, parents=evolved.get('basedOn', [])) for evolved in tournament.get('strategiesEvolved', [])
+                if evolved.get('id') and evolved.get('id') not in self.info]
+            for strategy in created:
+                parents = [(self.resolve_name(p.get('name')), p.get('weight', 50)) for p in strategy.get('parents', [])]
+                added += self.add(strategy['id'], strategy.get('name'), strategy.get('archetype'),
+                                  strategy.get('generation', number), parents)
+        return added
+
+    def update_from_progress(self, data):
+        """Add strategies from a bankruptcy_progress snapshot (generationNumber / parentIds / blendWeights)"""
+        strategies = data.get('strategies', []) + data.get('eliminatedStrategies', [])
+        added = 0
+        for strategy in sorted(strategies, key=lambda s: s.get('generationNumber') or 1):
+            parent_ids = strategy.get('parentIds') or []
+            weights = strategy.get('blendWeights') or [1] * len(parent_ids)
+            added += self.add(strategy['id'], strategy.get('name'), strategy.get('archetype'),
+                              (strategy.get('generationNumber') or 1) - 1, list(zip(parent_ids, weights)))
+        return added
+
+    def update(self, data):
+        """Add whatever is new in an export or snapshot; call again as new generations arrive"""
+        tournament_data = data.get('tournamentData', data.get('tournaments'))
+        if tournament_data is not None:
+            return self.update_from_tournaments(tournament_data)
+        return self.update_from_progress(data)
+
+    # Persistence
+
+    def to_dict(self):
+        return {'version': LINEAGE_VERSION,
+                'strategies': [[sid, info['name'], info['archetype'], info['generation'], self.parents[sid]]
+                               for sid, info in self.info.items()]}
+
+    @classmethod
+    def from_dict(cls, payload):
+        """Rebuild from to_dict(); insertion order keeps parents ahead of children"""
+        index = cls()
+        if payload.get('version') == LINEAGE_VERSION:
+            for strategy_id, name, archetype, generation, parents in payload['strategies']:
+                index.add(strategy_id, name, archetype, generation, parents)
+        return index
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+def build_lineage_index(*sources):
+    """Index one or more exports/snapshots (paths or parsed dicts), oldest first"""
+    index = LineageIndex()
+    for source in sources:
+        index.update(load_export(source) if isinstance(source, str) else source)
+    return index
+
+def final_survivors(data):
+    """Ids alive at the end of an export or snapshot"""
+    tournament_data = data.get('tournamentData', data.get('tournaments'))
+    if tournament_data:
+        survivors = tournament_data[-1].get('evolutionDetails', {}).get('survivors', [])
+        if survivors:
+            return [s['id'] for s in survivors]
+    return [s['id'] for s in data.get('finalStats', data.get('strategies', []))]
+
+def print_lineage_report(index, strategy_ids, by='name', top=3):
+    print(f"\n🧬 LINEAGE INDEX: {len(index)} strategies, "
+          f"{sum(len(a) for a in index.ancestry.values())} ancestor links")
+    print("=" * 60)
+    for strategy_id in strategy_ids:
+        if strategy_id not in index:
+            continue
+        info = index.info[strategy_id]
+        shares = ', '.join(f"{share:.0%} {key}" for key, share in index.shares(strategy_id, by)[:top])
+        print(f"   {info['name']:<30} gen {info['generation']:<3} depth {index.depths[strategy_id]:<3} "
+              f"{len(index.ancestors(strategy_id)):3} ancestors | {shares}")
+
+    influence = sorted(index.descendants.items(), key=lambda item: -len(item[1]))[:5]
+    if influence:
+        print("\n🌳 Most prolific ancestors:")
+        for strategy_id, descendants in influence:
+            print(f"   {index.info[strategy_id]['name']:<30} {len(descendants)} descendants")
+
+if __name__ == "__main__":
+    apply_memory_flag()
+    if len(sys.argv) < 2:
+        print("Usage: python3 lineage_index.py <evolution_data.json | bankruptcy_progress.json> [more ...] "
+              "[--by name|archetype] [--save index.json] [--memory-budget MB]")
+        sys.exit(1)
+
+    args = sys.argv[1:]
+    by, save_path = 'name', None
+    if '--by' in args:
+        i = args.index('--by')
+        by = args[i + 1]
+        del args[i:i + 2]
+    if '--save' in args:
+        i = args.index('--save')
+        save_path = args[i + 1]
+        del args[i:i + 2]
+
+    index = LineageIndex()
+    data = None
+    for path in args:
+        data = load_export(path)
+        print(f"📁 {path}: {index.update(data)} new strategies")
+    print_lineage_report(index, final_survivors(data), by)
+    if save_path:
+        index.save(save_path)
+        print(f"\n✅ Lineage index saved as: {save_path}")
+    report_memory()
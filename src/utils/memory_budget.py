@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Memory Budget
+Keeps the visualizers inside a fixed memory budget on small workers. Set AGENT_BATTLE_MEMORY_MB
+(or pass --memory-budget <MB>) and exports are streamed without the sections the charts never read,
+stats stages work through tournaments in budget-sized chunks, intermediate tables spill to
+memory-mapped temp files once resident memory nears the budget, and process pools shrink so
+workers don't multiply the footprint. Without a budget every loader behaves as before.
+"""
+
+import atexit
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+from profiling import current_rss_mb, peak_rss_mb
+from string_table import INTERNED_KEYS, SHARED_TABLE, interning_hook, load_interned_json
+
+try:
+    import ijson
+except ImportError:  # Fall back to json.load (dropping sections after each object) without the streaming parser
+    ijson = None
+
+MEMORY_ENV = 'AGENT_BATTLE_MEMORY_MB'
+
+# Per-game sections no chart or stats stage reads; they are most of a large export
+DEFAULT_DROP = frozenset({'rounds', 'negotiations'})
+
+SPILL_FRACTION = 0.75   # spill intermediate tables once RSS passes this share of the budget
+CHUNK_SHARE = 0.1       # share of the budget one stats chunk may use
+FIGURE_SHARE = 0.5      # share of the remaining budget one figure's canvas may take
+FIGURE_PIXEL_BYTES = 12 # RGBA canvas plus the copies the tight-bbox pass and PNG writer make
+MIN_DPI = 50
+MEMO_CHARS = 64         # strings up to this length are shared while streaming (IDs, names, archetypes)
+WORKER_MB = 150         # rough resident size of one pool worker (interpreter, NumPy, pandas, matplotlib)
+
+_selected = None
+_spill_dir = None
+
+def set_budget(mb):
+    """Set the budget for this process and, through the environment, its workers"""
+    global _selected
+    mb = float(mb)
+    if mb <= 0:
+        raise ValueError("Memory budget must be a positive number of MB")
+    _selected = mb
+    os.environ[MEMORY_ENV] = f'{mb:g}'
+
+def budget_mb():
+    """The active budget in MB, or None when memory is unconstrained"""
+    if _selected is not None:
+        return _selected
+    value = os.environ.get(MEMORY_ENV, '').strip()
+    if not value:
+        return None
+    try:
+        mb = float(value)
+    except ValueError:
+        raise ValueError(f"{MEMORY_ENV} must be a number of MB, got '{value}'")
+    return mb if mb > 0 else None
+
+def apply_memory_flag(argv=None):
+    """Strip '--memory-budget <MB>' from the command line (sys.argv by default) and select that budget"""
+    argv = sys.argv if argv is None else argv
+    if '--memory-budget' in argv:
+        i = argv.index('--memory-budget')
+        if i + 1 >= len(argv):
+            raise ValueError("--memory-budget needs a size in MB")
+        set_budget(argv[i + 1])
+        del argv[i:i + 2]
+    return budget_mb()
+
+def over_budget(fraction=SPILL_FRACTION):
+    """True when a budget is set and resident memory has passed the given share of it"""
+    budget = budget_mb()
+    return budget is not None and current_rss_mb() > budget * fraction
+
+def chunk_rows(row_bytes, total, share=CHUNK_SHARE):
+    """Rows per chunk so one chunk stays within a share of the budget (all rows when unconstrained)"""
+    budget = budget_mb()
+    if budget is None or total <= 0:
+        return max(total, 1)
+    return int(min(total, max(1, budget * share * 1024 * 1024 // max(row_bytes, 1))))
+
+def chunk_ranges(total, size):
+    """(start, stop) ranges covering range(total) in chunks of size"""
+    return [(start, min(start + size, total)) for start in range(0, total, max(size, 1))]
+
+def worker_count(requested=None):
+    """Pool size capped so the workers fit in what is left of the budget"""
+    workers = requested or os.cpu_count() or 1
+    budget = budget_mb()
+    if budget is None:
+        return workers
+    return max(1, min(workers, int((budget - current_rss_mb()) // WORKER_MB)))
+
+def figure_dpi(size_inches, dpi):
+    """dpi capped so a figure of size_inches renders within what is left of the budget"""
+    budget = budget_mb()
+    if budget is None or not isinstance(dpi, (int, float)):
+        return dpi
+    headroom = max(budget - current_rss_mb(), 0) * FIGURE_SHARE * 1024 * 1024
+    width, height = size_inches
+    cap = int((headroom / max(width * height * FIGURE_PIXEL_BYTES, 1)) ** 0.5)
+    return max(MIN_DPI, min(dpi, cap))
+
+def spill_dir():
+    """Temp directory for spilled tables, created on first use and removed at exit"""
+    global _spill_dir
+    if _spill_dir is None:
+        _spill_dir = tempfile.mkdtemp(prefix='agent_battle_spill_')
+        atexit.register(shutil.rmtree, _spill_dir, True)
+    return _spill_dir
+
+def spill_table(name, table, force=False):
+    """Move a dict of NumPy columns to memory-mapped .npy files once RSS nears the budget.
+
+    The returned dict reads the same; pages of the spilled columns are file-backed,
+    so the kernel can drop them under pressure instead of the process being killed.
+    """
+    if not force and not over_budget():
+        return table
+
+    spilled = dict(table)
+    for key, column in table.items():
+        if isinstance(column, np.ndarray) and column.dtype != object and column.size:
+            path = os.path.join(spill_dir(), f'{name}.{key}.npy')
+            np.save(path, column)
+            spilled[key] = np.load(path, mmap_mode='r')
+    return spilled
+
+def release(data, *keys):
+    """Drop parsed sections that have been consumed so the next stage can reuse their memory"""
+    for key in keys:
+        data.pop(key, None)
+
+def _streamed_events(f, drop, table, keys):
+    """ijson events with dropped subtrees skipped and repeated strings shared.
+
+    json.load memoizes object keys; ijson doesn't, so keys and short values
+    (IDs, names) are shared through a memo and free text through the string table.
+    """
+    skip = skip_prefix = None
+    memo = {}
+    for prefix, event, value in ijson.parse(f):
+        if skip is not None:
+            if prefix == skip or prefix.startswith(skip_prefix):
+                continue
+            skip = None
+        if event == 'map_key':
+            if value in drop:
+                skip = f'{prefix}.{value}' if prefix else value
+                skip_prefix = skip + '.'
+                continue
+            value = memo.setdefault(value, value)
+        elif event == 'string' and value:
+            if len(value) <= MEMO_CHARS:
+                value = memo.setdefault(value, value)
+            elif prefix.rpartition('.')[2] in keys:
+                value = table.canonical(value)
+        yield prefix, event, value
+
+def _dropping_hook(drop, table, keys):
+    intern = interning_hook(table, keys)
+    def hook(obj):
+        for key in drop & obj.keys():
+            del obj[key]
+        return intern(obj)
+    return hook
+
+def stream_export(path, drop=DEFAULT_DROP, table=SHARED_TABLE, keys=INTERNED_KEYS):
+    """Parse an export without the dropped per-game sections ever being built.
+
+    With ijson the file is streamed and only the kept objects are materialised;
+    without it json.load drops each section as soon as its object is parsed.
+    """
+    drop = frozenset(drop)
+    if ijson is not None:
+        with open(path, 'rb') as f:
+            return dict(ijson.kvitems(_streamed_events(f, drop, table, keys), '', use_float=True))
+
+    with open(path, 'r') as f:
+        return json.load(f, object_hook=_dropping_hook(drop, table, keys))
+
+def load_export(path, drop=DEFAULT_DROP):
+    """Interned export, streamed without the dropped sections when a budget is set"""
+    if budget_mb() is None:
+        return load_interned_json(path)
+    return stream_export(path, drop)
+
+def report_memory():
+    """Print the run's peak RSS against the budget; returns the peak in MB"""
+    peak = peak_rss_mb()
+    budget = budget_mb()
+    if budget is None:
+        print(f"🧠 Peak RSS {peak:.0f} MB")
+    elif peak > budget:
+        print(f"⚠️ Peak RSS {peak:.0f} MB exceeded the {budget:g} MB budget")
+    else:
+        print(f"🧠 Peak RSS {peak:.0f} MB (budget {budget:g} MB)")
+    return peak
+
+if __name__ == "__main__":
+    apply_memory_flag()
+    if len(sys.argv) < 2:
+        print("Usage: python3 memory_budget.py <evolution_data.json> [--memory-budget MB]")
+        sys.exit(1)
+
+    data = stream_export(sys.argv[1])
+    tournaments = data.get('tournamentData', data.get('tournaments', []))
+    print(f"✅ Streamed {len(tournaments)} tournaments without {', '.join(sorted(DEFAULT_DROP))}")
+    report_memory()
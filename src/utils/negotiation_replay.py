@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Negotiation Replay Animation
+Animates how proposals and votes shift round by round within a game: vote totals against the 61%
+winning threshold, the voter × proposer vote matrix, and the current leader's proposed split.
+Each game's rounds are packed into dense arrays once; frames tween between rounds and are drawn by
+blitting only the animated artists over a cached background, and games are rendered to GIF/MP4 in
+a process pool, so a whole tournament animates in minutes instead of one full re-plot per frame.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+from profiling import profiled, span
+from render_quality import apply_quality_flag, tier
+from string_table import load_interned_json
+
+WINNING_PERCENTAGE = 61
+FRAMES_PER_ROUND = 8      # tween frames from one round's state to the next
+HOLD_FRAMES = 6           # frames each round's final state stays on screen
+FPS = 12
+MAX_DPI = 100             # animation frames don't need the 300-dpi publication setting
+FIGURE_SIZE = (12, 5.5)
+FORMATS = ('gif', 'mp4')
+
+ACTIVE_COLOR = '#4c72b0'
+ELIMINATED_COLOR = '#c8c8c8'
+LEADER_COLOR = '#dd8452'
+WINNER_COLOR = '#55a868'
+
+def game_arrays(game):
+    """Dense round arrays for one game, or None when it recorded no votes.
+
+    proposals[r, proposer, recipient] and votes[r, voter, proposer] hold percentages (NaN where a
+    player made no proposal); totals[r, proposer] is the vote percentage out of all players, as the
+    game computes it; active[r, p] marks players still allowed to propose in round r.
+    """
+    players = game.get('players', [])
+    ids = [p['id'] for p in players]
+    index = {player_id: i for i, player_id in enumerate(ids)}
+    strategy_index = {p.get('agent', {}).get('strategyId'): i for i, p in enumerate(players)}
+    rounds = [r for r in game.get('rounds', []) if r.get('votes')]
+    if not ids or not rounds:
+        return None
+
+    n = len(ids)
+    proposals = np.full((len(rounds), n, n), np.nan, dtype=np.float32)
+    votes = np.zeros((len(rounds), n, n), dtype=np.float32)
+    active = np.zeros((len(rounds), n), dtype=bool)
+    for r, round_data in enumerate(rounds):
+        for proposal in round_data.get('proposals', []):
+            proposer = index.get(proposal.get('playerId'))
+            if proposer is None:
+                continue
+            active[r, proposer] = True
+            for recipient, share in (proposal.get('proposal') or {}).items():
+                if recipient in index:
+                    proposals[r, proposer, index[recipient]] = float(share)
+        for voter_id, vote in round_data['votes'].items():
+            voter = index.get(vote.get('playerId', voter_id))
+            if voter is None:
+                continue
+            for target, count in (vote.get('votes') or {}).items():
+                if target in index:
+                    votes[r, voter, index[target]] = float(count)
+        if not active[r].any():
+            active[r] = votes[r].sum(axis=0) > 0
+
+    winner = (game.get('finalResult') or {}).get('winner') or {}
+    winner_index = index.get(winner.get('playerId', winner.get('id')),
+                             strategy_index.get(winner.get('strategyId', (winner.get('agent') or {}).get('strategyId'))))
+    return {
+        'names': [p.get('name', p['id']) for p in players],
+        'proposals': proposals,
+        'votes': votes,
+        'totals': votes.sum(axis=1) / n,
+        'active': active,
+        'winner': winner_index
+    }
+
+def frame_states(arrays, frames_per_round=FRAMES_PER_ROUND, hold_frames=HOLD_FRAMES):
+    """(round index, blend, hold) per frame; blend goes 0→1 from the previous round's state"""
+    frames = []
+    for r in range(len(arrays['votes'])):
+        frames += [(r, (k + 1) / frames_per_round, False) for k in range(frames_per_round)]
+        frames += [(r, 1.0, True)] * hold_frames
+    return frames
+
+class ReplayFigure:
+    """Static axes drawn once into a cached background; only the animated artists are redrawn per frame"""
+
+    def __init__(self, arrays, title, dpi):
+        self.arrays = arrays
+        n = len(arrays['names'])
+        labels = [name[:22] for name in arrays['names']]
+        self.fig, (self.ax_totals, self.ax_matrix, self.ax_split) = plt.subplots(
+            1, 3, figsize=FIGURE_SIZE, dpi=dpi, gridspec_kw={'width_ratios': [1.1, 1, 1.1]})
+        self.fig.suptitle(title, fontsize=13, fontweight='bold')
+        y = np.arange(n)
+
+        self.ax_totals.set_title('Vote share (% of all players)')
+        self.ax_totals.set_xlim(0, 100)
+        self.ax_totals.set_yticks(y, labels, fontsize=8)
+        self.ax_totals.invert_yaxis()
+        self.ax_totals.axvline(WINNING_PERCENTAGE, color='red', linestyle='--', linewidth=1)
+        self.ax_totals.text(WINNING_PERCENTAGE + 1, n - 0.5, f'{WINNING_PERCENTAGE}% wins', color='red', fontsize=8)
+        self.total_bars = self.ax_totals.barh(y, np.zeros(n), color=ACTIVE_COLOR, animated=True)
+
+        self.ax_matrix.set_title('Votes cast (voter → proposer)')
+        self.image = self.ax_matrix.imshow(np.zeros((n, n)), cmap='Blues', vmin=0, vmax=100, animated=True)
+        self.ax_matrix.set_xticks(y, [str(i + 1) for i in y], fontsize=7)
+        self.ax_matrix.set_yticks(y, [str(i + 1) for i in y], fontsize=7)
+        self.ax_matrix.set_xlabel('Proposer')
+        self.ax_matrix.set_ylabel('Voter')
+
+        self.ax_split.set_xlim(0, 100)
+        self.ax_split.set_yticks(y, labels, fontsize=8)
+        self.ax_split.invert_yaxis()
+        self.ax_split.set_xlabel('Proposed share (%)')
+        self.split_bars = self.ax_split.barh(y, np.zeros(n), color=LEADER_COLOR, animated=True)
+        self.split_title = self.ax_split.set_title(' ', fontsize=10, animated=True)
+        self.round_text = self.fig.text(0.5, 0.9, '', ha='center', fontsize=11, animated=True)
+
+        self.fig.tight_layout(rect=(0, 0, 1, 0.9))
+        self.fig.canvas.draw()
+        self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self.animated = [*self.total_bars, self.image, *self.split_bars, self.split_title, self.round_text]
+        self.width, self.height = self.fig.canvas.get_width_height()
+
+    def state(self, r, blend):
+        """Vote totals, vote matrix and proposals interpolated between rounds r-1 and r"""
+        arrays = self.arrays
+        n = len(arrays['names'])
+        previous_votes = arrays['votes'][r - 1] if r else np.zeros((n, n), dtype=np.float32)
+        previous_totals = arrays['totals'][r - 1] if r else np.zeros(n, dtype=np.float32)
+        votes = previous_votes + (arrays['votes'][r] - previous_votes) * blend
+        totals = previous_totals + (arrays['totals'][r] - previous_totals) * blend
+        return totals, votes
+
+    def render(self, r, blend, final):
+        """Blit one frame and return it as an (h, w, 3) uint8 array"""
+        arrays = self.arrays
+        totals, votes = self.state(r, blend)
+        active = arrays['active'][r]
+        leader = int(np.argmax(np.where(active, totals, -1)))
+        winner = arrays['winner'] if final and arrays['winner'] is not None else None
+
+        for i, bar in enumerate(self.total_bars):
+            bar.set_width(totals[i])
+            bar.set_color(WINNER_COLOR if i == winner else ACTIVE_COLOR if active[i] else ELIMINATED_COLOR)
+        self.image.set_data(votes)
+        split = np.nan_to_num(arrays['proposals'][r, leader])
+        for i, bar in enumerate(self.split_bars):
+            bar.set_width(split[i])
+        who = 'Winning' if winner is not None else 'Leading'
+        self.split_title.set_text(f"{who} proposal: {arrays['names'][leader][:22]}")
+        status = f"Round {r + 1}/{len(arrays['votes'])} · {int(active.sum())} active"
+        if winner is not None:
+            status += f" · winner: {arrays['names'][winner]}"
+        self.round_text.set_text(status)
+
+        canvas = self.fig.canvas
+        canvas.restore_region(self.background)
+        for artist in self.animated:
+            self.fig.draw_artist(artist)
+        return np.asarray(canvas.buffer_rgba())[..., :3].copy()
+
+    def close(self):
+        plt.close(self.fig)
+
+def _write_gif(frames, durations, output_file):
+    """Quantize every frame against one palette sampled across the replay, then write without re-optimizing"""
+    from PIL import Image
+    sample = np.concatenate(frames[::max(1, len(frames) // 4)], axis=0)
+    palette = Image.fromarray(sample).quantize(colors=256, method=Image.Quantize.MEDIANCUT)
+    images = [Image.fromarray(frame).quantize(palette=palette, dither=Image.Dither.NONE) for frame in frames]
+    images[0].save(output_file, save_all=True, append_images=images[1:], duration=durations, loop=0,
+                   optimize=False, disposal=1)
+
+def _write_mp4(frames, repeats, output_file, fps):
+    height, width = frames[0].shape[:2]
+    command = ['ffmpeg', '-loglevel', 'error', '-y', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+               '-s', f'{width}x{height}', '-r', str(fps), '-i', '-',
+               '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', '-c:v', 'libx264', output_file]
+    with subprocess.Popen(command, stdin=subprocess.PIPE) as ffmpeg:
+        for frame, count in zip(frames, repeats):
+            data = frame.tobytes()
+            for _ in range(count):
+                ffmpeg.stdin.write(data)
+        ffmpeg.stdin.close()
+    if ffmpeg.returncode:
+        raise RuntimeError(f"ffmpeg exited with status {ffmpeg.returncode} writing {output_file}")
+
+def render_replay(arrays, title, output_file, fmt='gif', dpi=MAX_DPI, fps=FPS):
+    """Worker entry point: render one game's frames and write the animation, returning the path.
+
+    Hold frames leave every artist unchanged, so they are not redrawn: GIFs stretch the previous
+    frame's duration and MP4s repeat its bytes.
+    """
+    figure = ReplayFigure(arrays, title, dpi)
+    frames, repeats = [], []
+    last_round = len(arrays['votes']) - 1
+    try:
+        previous = None
+        for r, blend, hold in frame_states(arrays):
+            final = r == last_round and hold
+            key = (r, blend, final)
+            if key == previous:
+                repeats[-1] += 1
+                continue
+            frames.append(figure.render(r, blend, final))
+            repeats.append(1)
+            previous = key
+    finally:
+        figure.close()
+
+    if fmt == 'mp4':
+        _write_mp4(frames, repeats, output_file, fps)
+    else:
+        _write_gif(frames, [round(1000 * count / fps) for count in repeats], output_file)
+    return output_file
+
+def replay_jobs(tournament_data, tournaments=None, games=None, fmt='gif', output_dir='.'):
+    """(arrays, title, output file) for every selected game that recorded votes"""
+    jobs = []
+    for tournament in tournament_data:
+        number = tournament.get('tournamentNumber', 0)
+        if tournaments and number not in tournaments:
+            continue
+        for g, game in enumerate(tournament.get('games', [])):
+            game_number = game.get('gameNumber', g + 1)
+            if games and game_number not in games:
+                continue
+            arrays = game_arrays(game)
+            if arrays is None:
+                continue
+            title = f'Tournament {number} · Game {game_number} negotiation replay'
+            output_file = os.path.join(output_dir, f'negotiation_replay_t{number:03d}_g{game_number:03d}.{fmt}')
+            jobs.append((arrays, title, output_file))
+    return jobs
+
+@profiled('negotiation_replay')
+def render_replays(tournament_data, tournaments=None, games=None, fmt='gif', output_dir='.', workers=None):
+    """Animate the selected games in a process pool; returns the written files"""
+    if fmt == 'mp4' and shutil.which('ffmpeg') is None:
+        print("⚠️ ffmpeg not found; writing GIFs instead")
+        fmt = 'gif'
+    with span('pack'):
+        jobs = replay_jobs(tournament_data, tournaments, games, fmt, output_dir)
+    if not jobs:
+        print("No games with recorded votes found!")
+        return []
+
+    dpi = min(tier()['dpi'], MAX_DPI)
+    print(f"🎬 Rendering {len(jobs)} negotiation replay(s) as {fmt.upper()} at {dpi} dpi")
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    with span('render'):
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                outputs = list(executor.map(render_replay, *zip(*jobs), [fmt] * len(jobs), [dpi] * len(jobs)))
+        else:
+            outputs = [render_replay(arrays, title, output_file, fmt, dpi) for arrays, title, output_file in jobs]
+    return outputs
+
+def _int_list(value):
+    return {int(v) for v in value.split(',') if v}
+
+if __name__ == "__main__":
+    apply_quality_flag()
+    if len(sys.argv) < 2:
+        print("Usage: python3 negotiation_replay.py <evolution_data.json> [--tournament N[,M]] [--game G[,H]] "
+              "[--format gif|mp4] [--workers N] [--output-dir DIR] [--quality preview|standard|publication]")
+        print("       Without --tournament, the last tournament's games are animated.")
+        sys.exit(1)
+
+    args = sys.argv[1:]
+    options = {'--tournament': None, '--game': None, '--format': 'gif', '--workers': None, '--output-dir': '.'}
+    for flag in list(options):
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            del args[i:i + 2]
+    if options['--format'] not in FORMATS:
+        print(f"Unknown format '{options['--format']}'; choose from {', '.join(FORMATS)}")
+        sys.exit(1)
+
+    data = load_interned_json(args[0])
+    tournament_data = data.get('tournamentData', data.get('tournaments', []))
+    if not tournament_data:
+        print("No tournament data found!")
+        sys.exit(1)
+    tournaments = _int_list(options['--tournament']) if options['--tournament'] \
+        else {tournament_data[-1].get('tournamentNumber', 0)}
+    games = _int_list(options['--game']) if options['--game'] else None
+    os.makedirs(options['--output-dir'], exist_ok=True)
+
+    outputs = render_replays(tournament_data, tournaments, games, options['--format'], options['--output-dir'],
+                             int(options['--workers']) if options['--workers'] else None)
+    for output_file in outputs:
+        print(f"✅ Replay saved as: {output_file}")
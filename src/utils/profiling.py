@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Stage Profiling Hooks
+Context-manager spans and stage markers recording wall time, CPU time and memory per visualizer stage.
+Set AGENT_BATTLE_PROFILE=1 (or a directory) to write a JSON report per run, and
+AGENT_BATTLE_CPROFILE=1 to also dump cProfile stats next to it.
+"""
+
+import functools
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows has no resource module; peak memory is reported as 0
+    resource = None
+
+PROFILE_ENV = 'AGENT_BATTLE_PROFILE'
+CPROFILE_ENV = 'AGENT_BATTLE_CPROFILE'
+
+_PAGE_MB = os.sysconf('SC_PAGE_SIZE') / (1024 * 1024) if hasattr(os, 'sysconf') else 0
+_runs = []
+
+def current_rss_mb():
+    """Current resident set size in MB (falls back to the peak where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * _PAGE_MB
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _enabled(env_name):
+    return os.environ.get(env_name, '').lower() not in ('', '0', 'false', 'no')
+
+def _report_dir():
+    value = os.environ.get(PROFILE_ENV, '')
+    return value if os.path.isdir(value) else '.'
+
+@contextmanager
+def span(name):
+    """Time one stage of the active profiled run; a no-op when no run is active"""
+    if not _runs:
+        yield
+        return
+
+    run = _runs[-1]
+    record = {'name': name, 'depth': run['depth'], 'order': run['opened']}
+    run['opened'] += 1
+    run['depth'] += 1
+    rss_start = current_rss_mb()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        yield
+    finally:
+        record['wall'] = time.perf_counter() - wall_start
+        record['cpu'] = time.process_time() - cpu_start
+        record['rss_mb'] = current_rss_mb()
+        record['rss_delta_mb'] = record['rss_mb'] - rss_start
+        record['peak_rss_mb'] = peak_rss_mb()
+        run['depth'] -= 1
+        run['spans'].append(record)
+
+def stage(name):
+    """Close the run's current stage marker and open the next one; stage(None) just closes it.
+
+    Markers time consecutive steps of a long function body without wrapping them in
+    with-blocks; a marker still open when its profiled function returns is closed with it.
+    """
+    if not _runs:
+        return
+    stages = _runs[-1]['stages']
+    if stages[-1] is not None:
+        stages[-1].__exit__(None, None, None)
+        stages[-1] = None
+    if name is not None:
+        stages[-1] = span(name)
+        stages[-1].__enter__()
+
+def write_report(run):
+    """Write a finished run's spans as JSON and print a one-line-per-stage summary"""
+    timestamp_str = datetime.now().strftime('%Y%m%d_%H%M%S')
+    base = os.path.join(_report_dir(), f"profile_{run['name']}_{timestamp_str}")
+    spans = sorted(run['spans'], key=lambda s: s['order'])
+
+    report = {
+        'run': run['name'],
+        'timestamp': datetime.now().isoformat(),
+        'wall': run['wall'],
+        'cpu': run['cpu'],
+        'peak_rss_mb': peak_rss_mb(),
+        'spans': [{k: v for k, v in s.items() if k != 'order'} for s in spans]
+    }
+    with open(base + '.json', 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"⏱️ Profile for {run['name']}: {run['wall']:.2f}s wall, {run['cpu']:.2f}s CPU, "
+          f"peak {report['peak_rss_mb']:.0f} MB")
+    for s in spans:
+        print(f"   {'  ' * s['depth']}• {s['name']}: {s['wall']:.3f}s wall, {s['cpu']:.3f}s CPU, "
+              f"{s['rss_delta_mb']:+.1f} MB")
+
+    if run['profiler'] is not None:
+        run['profiler'].dump_stats(base + '.prof')
+        print(f"   📄 cProfile stats: {base}.prof")
+    print(f"   📄 Stage report: {base}.json")
+
+    return base + '.json'
+
+@contextmanager
+def profiled_run(name):
+    """Open a profiled run; nested inside another run it is recorded as a span instead"""
+    if _runs:
+        # Nested profiled functions keep their own stage marker so they can't close the caller's
+        _runs[-1]['stages'].append(None)
+        try:
+            with span(name):
+                try:
+                    yield
+                finally:
+                    stage(None)
+        finally:
+            _runs[-1]['stages'].pop()
+        return
+    if not _enabled(PROFILE_ENV):
+        yield
+        return
+
+    profiler = None
+    if _enabled(CPROFILE_ENV):
+        import cProfile
+        profiler = cProfile.Profile()
+
+    run = {'name': name, 'depth': 0, 'opened': 0, 'spans': [], 'stages': [None], 'profiler': profiler}
+    _runs.append(run)
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        stage(None)
+        if profiler is not None:
+            profiler.disable()
+        run['wall'] = time.perf_counter() - wall_start
+        run['cpu'] = time.process_time() - cpu_start
+        _runs.pop()
+        write_report(run)
+
+def profiled(name=None):
+    """Decorator running a function inside profiled_run"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with profiled_run(name or fn.__name__):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Render Quality Tiers
+One setting shared by every visualizer: 'preview' for a fast look (low dpi, no tight-bbox pass,
+rasterized dense layers, decimated series), 'standard', and 'publication' (the 300-dpi blog output).
+Pick a tier with AGENT_BATTLE_RENDER=<tier> or --quality <tier> on any visualizer command line.
+Under a memory budget (memory_budget.py) the default tier is 'preview' and every figure's dpi is
+capped to fit what is left of the budget.
+"""
+
+import os
+import sys
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from memory_budget import budget_mb, figure_dpi
+
+RENDER_ENV = 'AGENT_BATTLE_RENDER'
+DEFAULT_TIER = 'publication'
+BUDGET_TIER = 'preview'
+
+TIERS = {
+    'preview': {'dpi': 72, 'bbox_inches': None, 'rasterize_over': 500, 'max_points': 200,
+                'antialiased': False, 'max_legend': 15},
+    'standard': {'dpi': 150, 'bbox_inches': 'tight', 'rasterize_over': 5000, 'max_points': 2000,
+                 'antialiased': True, 'max_legend': None},
+    'publication': {'dpi': 300, 'bbox_inches': 'tight', 'rasterize_over': None, 'max_points': None,
+                    'antialiased': True, 'max_legend': None}
+}
+
+# Draw-time settings for tiers without antialiasing; unhinted glyphs lay out several times faster
+FAST_RC = {'path.simplify_threshold': 1.0, 'text.hinting': 'none', 'text.hinting_factor': 1}
+
+_selected = None
+
+def set_tier(name):
+    """Select a tier for this process, overriding the environment"""
+    global _selected
+    if name not in TIERS:
+        raise ValueError(f"Unknown render tier '{name}'; choose from {', '.join(TIERS)}")
+    _selected = name
+
+def tier_name():
+    default = BUDGET_TIER if budget_mb() is not None else DEFAULT_TIER
+    name = _selected or os.environ.get(RENDER_ENV, default).strip().lower() or default
+    if name not in TIERS:
+        raise ValueError(f"Unknown render tier '{name}' in {RENDER_ENV}; choose from {', '.join(TIERS)}")
+    return name
+
+def tier():
+    return TIERS[tier_name()]
+
+def apply_quality_flag(argv=None):
+    """Strip '--quality <tier>' from the command line (sys.argv by default) and select that tier"""
+    argv = sys.argv if argv is None else argv
+    if '--quality' in argv:
+        i = argv.index('--quality')
+        if i + 1 >= len(argv):
+            raise ValueError(f"--quality needs one of: {', '.join(TIERS)}")
+        set_tier(argv[i + 1])
+        del argv[i:i + 2]
+    return tier_name()
+
+def decimate(*arrays, max_points=None):
+    """Evenly thin parallel arrays for the current tier, always keeping the last point"""
+    max_points = max_points or tier()['max_points']
+    n = len(arrays[0])
+    if not max_points or n <= max_points:
+        return arrays if len(arrays) > 1 else arrays[0]
+    index = np.unique(np.append(np.arange(0, n, int(np.ceil(n / max_points))), n - 1))
+    thinned = tuple(a.iloc[index] if hasattr(a, 'iloc') else np.asarray(a)[index] for a in arrays)
+    return thinned if len(thinned) > 1 else thinned[0]
+
+def legend(ax=None, **kwargs):
+    """ax.legend, cut to the tier's entry limit; laying out legend text dominates preview renders"""
+    ax = ax or plt.gca()
+    handles, labels = ax.get_legend_handles_labels()
+    max_legend = tier()['max_legend']
+    if max_legend and len(handles) > max_legend:
+        kwargs.setdefault('title', f'+{len(handles) - max_legend} more')
+        handles, labels = handles[:max_legend], labels[:max_legend]
+    return ax.legend(handles, labels, **kwargs)
+
+def legend_layout(fig=None):
+    """tight_layout for charts with an outside legend; previews reserve a fixed margin instead"""
+    fig = fig or plt.gcf()
+    if tier()['bbox_inches'] is None:
+        fig.subplots_adjust(left=0.07, right=0.78, top=0.9, bottom=0.08)
+    else:
+        fig.tight_layout()
+
+def rasterize_dense(fig, min_points):
+    """Rasterize lines and collections with many points so vector outputs stay small"""
+    for ax in fig.axes:
+        for artist in ax.lines:
+            if len(artist.get_xdata()) >= min_points:
+                artist.set_rasterized(True)
+        for artist in ax.collections:
+            if len(artist.get_offsets()) >= min_points or len(artist.get_paths()) >= min_points:
+                artist.set_rasterized(True)
+
+def save_figure(output_file, fig=None, **kwargs):
+    """savefig with the current tier's dpi, bbox and rasterization settings"""
+    fig = fig or plt.gcf()
+    settings = tier()
+    if settings['rasterize_over']:
+        rasterize_dense(fig, settings['rasterize_over'])
+    if not settings['antialiased']:
+        for ax in fig.axes:
+            for line in ax.lines:
+                line.set_antialiased(False)
+    options = {'dpi': settings['dpi'], 'bbox_inches': settings['bbox_inches']}
+    options.update(kwargs)
+    options['dpi'] = figure_dpi(fig.get_size_inches(), options['dpi'])
+    # Preview paths are simplified as aggressively as Agg allows, and text skips hinting
+    with plt.rc_context(FAST_RC if not settings['antialiased'] else {}):
+        fig.savefig(output_file, **options)
+    return output_file
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Archetype × Generation × Tournament Rollup Cube
+Precomputes profit, game, win, elimination and entry counts per (tournament, archetype, generation)
+cell so dashboard questions like "average profit of AGGRESSIVE-derived gen-3 strategies in
+tournaments 50–100" are a prefix-sum difference and a small sum instead of a pass over every game.
+Tournaments are added one at a time (re-adding one replaces it), so the cube follows a running
+simulation's incremental progress files.
+"""
+
+import json
+import sys
+import time
+
+import numpy as np
+
+from lineage_index import LineageIndex
+from memory_budget import apply_memory_flag, load_export, report_memory
+
+MEASURES = ('profit', 'games', 'wins', 'eliminations', 'entries')
+DIMENSIONS = ('archetype', 'generation', 'tournament')
+CUBE_VERSION = 1
+
+PROFIT, GAMES, WINS, ELIMINATIONS, ENTRIES = range(len(MEASURES))
+
+def _as_int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+class RollupCube:
+    """Dense (tournament, archetype, generation, measure) sums with tournament prefix sums.
+
+    With archetypes='lineage' (the default) a strategy is filed under the archetype contributing the
+    largest share of its founder ancestry, so evolved strategies count as "AGGRESSIVE-derived" and
+    so on; archetypes='recorded' uses the archetype field as exported (EVOLVED_* for evolved ones).
+    """
+
+    def __init__(self, archetypes='lineage'):
+        self.archetype_mode = archetypes
+        self.lineage = LineageIndex()
+        self.archetypes = []          # axis labels
+        self.generations = []
+        self._archetype_index = {}
+        self._generation_index = {}
+        self._strategy_cell = {}      # strategy id -> (archetype index, generation index)
+        self.data = np.zeros((1, 0, 0, len(MEASURES)))
+        self.prefix = np.zeros((1, 0, 0, len(MEASURES)))
+        self.tournaments = set()
+        self._stale_from = None       # first tournament row whose prefix needs rebuilding
+
+    # Building
+
+    def _index(self, value, labels, index, axis):
+        if value not in index:
+            index[value] = len(labels)
+            labels.append(value)
+            if index[value] >= self.data.shape[axis]:
+                pad = [(0, 0)] * 4
+                pad[axis] = (0, max(4, self.data.shape[axis]))
+                self.data = np.pad(self.data, pad)
+                self.prefix = np.pad(self.prefix, pad)
+        return index[value]
+
+    def _cell(self, strategy_id, recorded_archetype):
+        cell = self._strategy_cell.get(strategy_id)
+        if cell is None:
+            archetype = recorded_archetype or 'UNKNOWN'
+            generation = 0
+            if strategy_id in self.lineage:
+                generation = _as_int(self.lineage.info[strategy_id]['generation'])
+                if self.archetype_mode == 'lineage':
+                    shares = self.lineage.shares(strategy_id, 'archetype')
+                    archetype = (shares[0][0] if shares else None) or archetype
+            cell = (self._index(archetype, self.archetypes, self._archetype_index, 1),
+                    self._index(generation, self.generations, self._generation_index, 2))
+            self._strategy_cell[strategy_id] = cell
+        return cell
+
+    def add_tournament(self, tournament):
+        """Aggregate one tournament's games and eliminations into its slab"""
+        self.lineage.update_from_tournaments([tournament])
+        number = _as_int(tournament.get('tournamentNumber'))
+        recorded = {s.get('id'): s.get('archetype') for s in tournament.get('strategies', [])}
+        details = tournament.get('evolutionDetails', {})
+        for strategy in details.get('created', []) + details.get('eliminated', []):
+            recorded.setdefault(strategy.get('id'), strategy.get('archetype'))
+
+        cells = {strategy_id: self._cell(strategy_id, archetype) for strategy_id, archetype in recorded.items()}
+        for game in tournament.get('games', []):
+            for impact in game.get('economicImpact', []):
+                if impact.get('strategyId') not in cells:
+                    cells[impact.get('strategyId')] = self._cell(impact.get('strategyId'), None)
+        if number >= self.data.shape[0]:
+            rows = self.data.shape[0]
+            pad = [(0, max(number + 1 - rows, rows)), (0, 0), (0, 0), (0, 0)]
+            self.data = np.pad(self.data, pad)
+            self.prefix = np.pad(self.prefix, pad)
+            # New prefix rows start at zero and must carry the running totals forward
+            self._stale_from = rows if self._stale_from is None else min(self._stale_from, rows)
+
+        # Entrants are the strategies that started the tournament (or played in it); strategies created
+        # at its end play 0 games here and enter the next tournament instead
+        entrants = {s.get('id') for s in tournament.get('strategies', [])}
+        entrants.update(impact.get('strategyId') for game in tournament.get('games', [])
+                        for impact in game.get('economicImpact', []))
+        slab = np.zeros(self.data.shape[1:])
+        for strategy_id in entrants:
+            a, g = cells[strategy_id]
+            slab[a, g, ENTRIES] += 1
+        for game in tournament.get('games', []):
+            for impact in game.get('economicImpact', []):
+                a, g = cells[impact.get('strategyId')]
+                slab[a, g, PROFIT] += impact.get('profit', 0)
+                slab[a, g, GAMES] += 1
+                slab[a, g, WINS] += bool(impact.get('isWinner'))
+        for eliminated in details.get('eliminated', []):
+            a, g = cells[eliminated.get('id')]
+            slab[a, g, ELIMINATIONS] += 1
+
+        self.data[number] = slab
+        self.tournaments.add(number)
+        self._stale_from = number if self._stale_from is None else min(self._stale_from, number)
+
+    def update(self, data):
+        """Add every tournament in an export or progress file; returns how many were added or replaced"""
+        tournament_data = data.get('tournamentData', data.get('tournaments', []))
+        for tournament in tournament_data:
+            self.add_tournament(tournament)
+        return len(tournament_data)
+
+    def _refresh(self):
+        """Rebuild prefix sums from the earliest changed tournament on (only the new row when appending)"""
+        start = self._stale_from
+        if start is None:
+            return
+        if start == 0:
+            self.prefix[0] = self.data[0]
+            start = 1
+        np.cumsum(self.data[start:], axis=0, out=self.prefix[start:])
+        self.prefix[start:] += self.prefix[start - 1]
+        self._stale_from = None
+
+    # Queries
+
+    def _selection(self, value, index):
+        if value is None:
+            return None
+        if isinstance(value, (str, int, np.integer)):
+            value = [value]
+        return np.array([index[v] for v in value if v in index], dtype=np.intp)
+
+    def _tournament_bounds(self, tournaments):
+        """Inclusive (first, last) row range, clipped to the tournaments held"""
+        last = self.data.shape[0] - 1
+        if tournaments is None:
+            low, high = 0, last
+        elif isinstance(tournaments, (int, np.integer)):
+            low, high = int(tournaments), int(tournaments)
+        elif isinstance(tournaments, range):
+            low, high = tournaments.start, tournaments.stop - 1
+        else:
+            low, high = tournaments
+        return max(0, low), min(high, last)
+
+    def block(self, archetype=None, generation=None, tournaments=None):
+        """(archetype, generation, measure) sums over a tournament range, restricted to the selection"""
+        self._refresh()
+        low, high = self._tournament_bounds(tournaments)
+        if high < low:
+            block = np.zeros(self.data.shape[1:])
+        else:
+            block = self.prefix[high] - self.prefix[low - 1] if low > 0 else self.prefix[high]
+        archetypes = self._selection(archetype, self._archetype_index)
+        generations = self._selection(generation, self._generation_index)
+        if archetypes is not None:
+            block = block[archetypes]
+        if generations is not None:
+            block = block[:, generations]
+        return block
+
+    def query(self, archetype=None, generation=None, tournaments=None):
+        """Totals and derived rates for a slice; None on a dimension rolls it up.
+
+        archetype / generation take one value or an iterable; tournaments takes a number, an
+        inclusive (first, last) pair or a range.
+        """
+        return _measures(self.block(archetype, generation, tournaments).sum(axis=(0, 1)))
+
+    def rollup(self, by, archetype=None, generation=None, tournaments=None):
+        """{key: measures} grouped by one or more of 'archetype', 'generation', 'tournament'"""
+        by = (by,) if isinstance(by, str) else tuple(by)
+        if 'tournament' in by:
+            low, high = self._tournament_bounds(tournaments)
+            rows = {}
+            for number in sorted(t for t in self.tournaments if low <= t <= high):
+                rest = tuple(d for d in by if d != 'tournament')
+                for key, measures in (self.rollup(rest, archetype, generation, number).items() if rest
+                                      else [((), self.query(archetype, generation, number))]):
+                    full = dict(zip(rest, key), tournament=number)
+                    rows[tuple(full[d] for d in by)] = measures
+            return rows
+
+        block = self.block(archetype, generation, tournaments)
+        archetypes = self._labels(archetype, self.archetypes, self._archetype_index)
+        generations = self._labels(generation, self.generations, self._generation_index)
+        if by == ('archetype',):
+            sums = block.sum(axis=1)
+            return {(label,): _measures(sums[i]) for i, label in enumerate(archetypes) if sums[i, ENTRIES] or sums[i, GAMES]}
+        if by == ('generation',):
+            sums = block.sum(axis=0)
+            return {(label,): _measures(sums[j]) for j, label in enumerate(generations) if sums[j, ENTRIES] or sums[j, GAMES]}
+        rows = {}
+        for i, a in enumerate(archetypes):
+            for j, g in enumerate(generations):
+                if block[i, j, ENTRIES] or block[i, j, GAMES]:
+                    key = {'archetype': a, 'generation': g}
+                    rows[tuple(key[d] for d in by)] = _measures(block[i, j])
+        return rows
+
+    def _labels(self, value, labels, index):
+        """Axis labels in the same order as _selection picks their rows"""
+        if value is None:
+            return labels
+        values = [value] if isinstance(value, (str, int, np.integer)) else value
+        return [v for v in values if v in index]
+
+    # Persistence
+
+    def save(self, path):
+        """npz with the sums and axis labels; lineage is rebuilt from the next update"""
+        self._refresh()
+        meta = {'version': CUBE_VERSION, 'archetype_mode': self.archetype_mode, 'archetypes': self.archetypes,
+                'generations': self.generations, 'tournaments': sorted(self.tournaments),
+                'lineage': self.lineage.to_dict()}
+        np.savez_compressed(path, data=self.data, meta=np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as archive:
+            meta = json.loads(archive['meta'].tobytes().decode('utf-8'))
+            if meta.get('version') != CUBE_VERSION:
+                raise ValueError(f"{path} has cube version {meta.get('version')}, expected {CUBE_VERSION}")
+            cube = cls(meta['archetype_mode'])
+            cube.data = archive['data']
+        cube.prefix = np.zeros_like(cube.data)
+        cube.archetypes, cube.generations = meta['archetypes'], meta['generations']
+        cube._archetype_index = {label: i for i, label in enumerate(cube.archetypes)}
+        cube._generation_index = {label: i for i, label in enumerate(cube.generations)}
+        cube.tournaments = set(meta['tournaments'])
+        cube.lineage = LineageIndex.from_dict(meta['lineage'])
+        cube._stale_from = 0
+        return cube
+
+def _measures(sums):
+    profit, games, wins, eliminations, entries = (float(v) for v in sums)
+    return {'profit': profit, 'games': int(games), 'wins': int(wins), 'eliminations': int(eliminations),
+            'entries': int(entries), 'avg_profit': profit / games if games else None,
+            'win_rate': wins / games if games else None,
+            'elimination_rate': eliminations / entries if entries else None}
+
+def build_rollup_cube(*sources, archetypes='lineage'):
+    """Cube over one or more exports/progress files (paths or parsed dicts), oldest first"""
+    cube = RollupCube(archetypes)
+    for source in sources:
+        cube.update(load_export(source) if isinstance(source, str) else source)
+    return cube
+
+def _parse_values(text, convert=str):
+    return [convert(v) for v in text.split(',') if v]
+
+def _parse_range(text):
+    if '-' in text:
+        low, high = text.split('-', 1)
+        return int(low), int(high)
+    return int(text), int(text)
+
+def _format(measures):
+    avg = '-' if measures['avg_profit'] is None else f"{measures['avg_profit']:+.1f}"
+    win_rate = '-' if measures['win_rate'] is None else f"{measures['win_rate']:.1%}"
+    return (f"{measures['games']:>6} games  avg profit {avg:>7}  win rate {win_rate:>6}  "
+            f"{measures['eliminations']:>3} eliminations / {measures['entries']} entries")
+
+if __name__ == "__main__":
+    apply_memory_flag()
+    if len(sys.argv) < 2:
+        print("Usage: python3 rollup_cube.py <evolution_data.json | progress.json> [more ...] "
+              "[--archetype A[,B]] [--generation 3[,4]] [--tournaments 50-100] "
+              "[--by archetype,generation,tournament] [--recorded-archetypes] [--save cube.npz] [--memory-budget MB]")
+        sys.exit(1)
+
+    args = sys.argv[1:]
+    options = {'--archetype': None, '--generation': None, '--tournaments': None, '--by': None, '--save': None}
+    for flag in list(options):
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            del args[i:i + 2]
+    mode = 'recorded' if '--recorded-archetypes' in args else 'lineage'
+    args = [a for a in args if a != '--recorded-archetypes']
+
+    start = time.perf_counter()
+    cube = build_rollup_cube(*args, archetypes=mode)
+    cube.block()
+    print(f"🧊 Rollup cube: {len(cube.archetypes)} archetypes × {len(cube.generations)} generations × "
+          f"{len(cube.tournaments)} tournaments built in {time.perf_counter() - start:.2f}s ({mode} archetypes)")
+
+    selection = {
+        'archetype': _parse_values(options['--archetype']) if options['--archetype'] else None,
+        'generation': _parse_values(options['--generation'], int) if options['--generation'] else None,
+        'tournaments': _parse_range(options['--tournaments']) if options['--tournaments'] else None
+    }
+    repeats = 1000
+    start = time.perf_counter()
+    for _ in range(repeats):
+        total = cube.query(**selection)
+    elapsed = (time.perf_counter() - start) / repeats
+    print(f"\n📊 Selection {', '.join(f'{k}={v}' for k, v in selection.items() if v is not None) or '(everything)'}")
+    print(f"   {_format(total)}   [{elapsed * 1e6:.0f} µs per query]")
+
+    if options['--by']:
+        by = _parse_values(options['--by'])
+        print(f"\n📋 Rolled up by {', '.join(by)}:")
+        for key, measures in sorted(cube.rollup(by, **selection).items(), key=lambda item: str(item[0])):
+            print(f"   {' / '.join(str(k) for k in key):<35} {_format(measures)}")
+
+    if options['--save']:
+        cube.save(options['--save'])
+        print(f"\n✅ Cube saved as: {options['--save']}")
+    report_memory()
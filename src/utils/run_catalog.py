@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Simulation Run Catalog
+Indexes every export (enhanced evolution, progress, bankruptcy progress, balance CSVs and matrix logs)
+into a local SQLite catalog so runs can be queried without reparsing their JSON. Backup snapshots go
+into the same database through backup_ingest.py, which the index command also runs.
+Re-running the indexer only touches files that are new or changed since the last pass.
+"""
+
+import glob
+import json
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime
+
+import numpy as np
+
+from timeline_store import build_timeline_store, final_balances, load_csv_store, load_reconstructed_store
+
+CATALOG_FILE = 'run_catalog.sqlite'
+CATALOG_VERSION = 1
+
+# Export kind by filename pattern, relative to each scanned directory
+FILE_PATTERNS = [
+    ('enhanced_evolution', 'enhanced_evolution_*.json'),
+    ('progress', 'incremental_progress_*.json'),
+    ('bankruptcy_progress', 'bankruptcy_progress_*.json'),
+    ('balance_csv', 'balance_timeline_*.csv'),
+    ('matrix_log', 'improved_matrix_log_*.json')
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    indexed_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL UNIQUE REFERENCES files(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    timestamp TEXT,
+    planned_tournaments INTEGER,
+    games_per_tournament INTEGER,
+    completed_tournaments INTEGER,
+    total_games INTEGER,
+    strategy_count INTEGER,
+    params_json TEXT
+);
+CREATE TABLE IF NOT EXISTS run_strategies (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    strategy_id TEXT NOT NULL,
+    name TEXT,
+    archetype TEXT,
+    generation INTEGER,
+    final_balance INTEGER,
+    games_played INTEGER,
+    wins INTEGER,
+    tournaments_played INTEGER,
+    tournaments_survived INTEGER,
+    eliminated INTEGER,
+    PRIMARY KEY (run_id, strategy_id)
+);
+CREATE TABLE IF NOT EXISTS games (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    tournament INTEGER NOT NULL,
+    game INTEGER NOT NULL,
+    winner_id TEXT,
+    players INTEGER,
+    rounds INTEGER,
+    pool INTEGER,
+    max_payout INTEGER
+);
+CREATE TABLE IF NOT EXISTS matrix_logs (
+    run_id INTEGER PRIMARY KEY REFERENCES runs(id) ON DELETE CASCADE,
+    entries INTEGER,
+    failures INTEGER,
+    corrected INTEGER,
+    players INTEGER,
+    max_round INTEGER,
+    avg_prompt_length REAL,
+    avg_response_length REAL
+);
+CREATE INDEX IF NOT EXISTS runs_kind_timestamp ON runs(kind, timestamp);
+CREATE INDEX IF NOT EXISTS run_strategies_survival ON run_strategies(strategy_id, tournaments_survived);
+CREATE INDEX IF NOT EXISTS run_strategies_archetype ON run_strategies(archetype);
+CREATE INDEX IF NOT EXISTS games_run ON games(run_id, tournament, game);
+CREATE INDEX IF NOT EXISTS games_winner ON games(winner_id);
+"""
+
+_FILENAME_TIMESTAMP = re.compile(r'(\d{4}-\d{2}-\d{2}T\d{2}-\d{2}-\d{2}-\d{3}Z)')
+
+def open_catalog(catalog_file=CATALOG_FILE):
+    """Open (and create if needed) the catalog database"""
+    conn = sqlite3.connect(catalog_file)
+    conn.execute('PRAGMA foreign_keys = ON')
+    conn.execute('PRAGMA journal_mode = WAL')
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version not in (0, CATALOG_VERSION):
+        raise RuntimeError(f"{catalog_file} has catalog version {version}, expected {CATALOG_VERSION}")
+    conn.executescript(SCHEMA)
+    conn.execute(f'PRAGMA user_version = {CATALOG_VERSION}')
+    return conn
+
+def _timestamp_from_name(path):
+    """ISO timestamp embedded in export filenames (2025-06-02T20-49-26-808Z → 2025-06-02T20:49:26.808Z)"""
+    match = _FILENAME_TIMESTAMP.search(path)
+    if not match:
+        return None
+    date, time_part = match.group(1).split('T')
+    h, m, s, ms = time_part.rstrip('Z').split('-')
+    return f"{date}T{h}:{m}:{s}.{ms}Z"
+
+def _game_summary(game, tournament_num, game_index):
+    """One row of per-game summary columns"""
+    impacts = game.get('economicImpact', [])
+    winner = next((i.get('strategyId') for i in impacts if i.get('isWinner')), None)
+    if winner is None:
+        winner = (game.get('finalResult') or {}).get('winner')
+    return (tournament_num, game.get('gameNumber', game_index + 1), winner,
+            len(game.get('players', [])) or len(impacts), len(game.get('rounds', [])),
+            sum(i.get('entryFee', 0) for i in impacts),
+            max((i.get('payout', 0) for i in impacts), default=None))
+
+def summarize_games(tournament_data):
+    """Per-game summary rows for every game in a tournament list"""
+    rows = []
+    for t_index, tournament in enumerate(tournament_data):
+        tournament_num = tournament.get('tournamentNumber', t_index + 1)
+        for g_index, game in enumerate(tournament.get('games', [])):
+            rows.append(_game_summary(game, tournament_num, g_index))
+    return rows
+
+def summarize_store(store, generations=None, evolved_out=None):
+    """Per-strategy rows (final balance, wins, tournaments played/survived) from a timeline store.
+
+    evolved_out maps strategy id -> tournament number for strategies removed by evolution
+    (evolutionDetails.eliminated), which carry no elimination flag in the timeline.
+    """
+    generations = generations or {}
+    evolved_out = evolved_out or {}
+    n = len(store['strategy_ids'])
+    if n == 0:
+        return []
+
+    codes = store['strategy']
+    played = store['game'] > 0
+    games_played = np.bincount(codes[played], minlength=n)
+    wins = np.bincount(codes[played], weights=store['is_winner'][played], minlength=n)
+    removed_in = np.array([evolved_out.get(sid, -1) for sid in store['strategy_ids']], dtype=np.int64)
+    eliminated = (np.bincount(codes, weights=store['is_eliminated'], minlength=n) > 0) | (removed_in >= 0)
+
+    # A tournament counts as survived when the strategy has no elimination flag in it
+    # and was not evolved out at its end
+    stride = int(store['tournament'].max(initial=0)) + 1
+    keys = codes.astype(np.int64) * stride + store['tournament']
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    eliminated_in = np.zeros(len(unique_keys), dtype=bool)
+    np.logical_or.at(eliminated_in, inverse, store['is_eliminated'].astype(bool))
+    key_strategy = unique_keys // stride
+    eliminated_in |= removed_in[key_strategy] == unique_keys % stride
+    tournaments_played = np.bincount(key_strategy, minlength=n)
+    tournaments_survived = np.bincount(key_strategy[~eliminated_in], minlength=n)
+
+    finals = final_balances(store)
+    rows = []
+    for i, strategy_id in enumerate(store['strategy_ids']):
+        rows.append((strategy_id, store['names'][i], store['archetypes'][i], generations.get(strategy_id),
+                     None if np.isnan(finals[i]) else int(finals[i]), int(games_played[i]), int(wins[i]),
+                     int(tournaments_played[i]), int(tournaments_survived[i]), int(eliminated[i])))
+    return rows
+
+def _generations(tournament_data, strategies=()):
+    """Generation number per strategy id from evolutionDetails and strategy lists"""
+    generations = {}
+    for strategy in strategies:
+        if strategy.get('generationNumber') is not None:
+            generations[strategy['id']] = strategy['generationNumber']
+    for tournament in tournament_data:
+        for strategy in tournament.get('strategies', []):
+            generations.setdefault(strategy.get('id'), strategy.get('generation', 1))
+        for created in tournament.get('evolutionDetails', {}).get('created', []):
+            generations[created.get('id')] = created.get('generation', generations.get(created.get('id')))
+    return generations
+
+def _evolved_out(tournament_data):
+    """Tournament number each strategy was removed in, from evolutionDetails.eliminated"""
+    removed = {}
+    for t_index, tournament in enumerate(tournament_data):
+        tournament_num = tournament.get('tournamentNumber', t_index + 1)
+        for eliminated in tournament.get('evolutionDetails', {}).get('eliminated', []):
+            removed.setdefault(eliminated.get('id'), tournament_num)
+    return removed
+
+def describe_export(data, path):
+    """Run columns, strategy rows and game rows for an enhanced export or progress file"""
+    tournament_data = data.get('tournamentData', data.get('tournaments', []))
+    params = data.get('simulationParams', {})
+
+    balance_timeline = data.get('balanceTimeline', {})
+    store = build_timeline_store(balance_timeline) if balance_timeline \
+        else load_reconstructed_store(tournament_data, source_path=path)
+
+    games = summarize_games(tournament_data)
+    run = {
+        'timestamp': data.get('completedAt', data.get('timestamp')),
+        'planned_tournaments': params.get('numberOfTournaments', data.get('totalTournaments')),
+        'games_per_tournament': params.get('gamesPerTournament'),
+        'completed_tournaments': data.get('completedTournaments', len(tournament_data)),
+        'total_games': len(games),
+        'strategy_count': len(store['strategy_ids']),
+        'params': params
+    }
+    strategies = summarize_store(store, _generations(tournament_data, data.get('currentStrategies', [])),
+                                 _evolved_out(tournament_data))
+    return run, strategies, games
+
+def describe_bankruptcy_progress(data):
+    """Bankruptcy runs have no tournaments; strategies carry running totals instead"""
+    strategies = []
+    eliminated = {s.get('id') for s in data.get('eliminatedStrategies', [])}
+    for strategy in data.get('strategies', []) + data.get('eliminatedStrategies', []):
+        strategies.append((strategy.get('id'), strategy.get('name'), strategy.get('archetype'),
+                           strategy.get('generationNumber'), strategy.get('coinBalance'),
+                           strategy.get('gamesPlayed'), strategy.get('wins'), None, None,
+                           int(strategy.get('id') in eliminated)))
+    run = {
+        'timestamp': data.get('timestamp'),
+        'total_games': data.get('totalGamesPlayed'),
+        'strategy_count': len(strategies),
+        'params': data.get('systemParams', {})
+    }
+    return run, strategies, []
+
+def describe_csv(path):
+    """Balance CSVs only carry the timeline, so per-game rows are left empty"""
+    store = load_csv_store(path)
+    played = store['game'] > 0
+    run = {
+        'completed_tournaments': len(np.unique(store['tournament'])),
+        'total_games': len(np.unique(store['tournament'][played] * 1000 + store['game'][played])),
+        'strategy_count': len(store['strategy_ids'])
+    }
+    return run, summarize_store(store), []
+
+def describe_matrix_log(entries):
+    """Matrix logs are lists of LLM calls; summarise success and prompt sizes"""
+    if not isinstance(entries, list):
+        entries = entries.get('entries', [])
+    count = len(entries)
+    stats = (
+        count,
+        sum(1 for e in entries if not e.get('success', True)),
+        sum(1 for e in entries if e.get('corrected')),
+        len({e.get('playerName') for e in entries}),
+        max((e.get('round', 0) for e in entries), default=0),
+        sum(e.get('promptLength', 0) for e in entries) / count if count else None,
+        sum(e.get('responseLength', 0) for e in entries) / count if count else None
+    )
+    run = {'timestamp': entries[0].get('timestamp') if entries else None, 'total_games': None}
+    return run, stats
+
+def _load_json(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def index_file(conn, path, kind, stat):
+    """(Re)index one file inside a single transaction"""
+    with conn:
+        conn.execute('DELETE FROM files WHERE path = ?', (path,))
+        file_id = conn.execute(
+            'INSERT INTO files (path, kind, size, mtime_ns, indexed_at) VALUES (?, ?, ?, ?, ?)',
+            (path, kind, stat.st_size, stat.st_mtime_ns, datetime.now().isoformat())).lastrowid
+
+        strategies, games, matrix_stats = [], [], None
+        if kind == 'balance_csv':
+            run, strategies, games = describe_csv(path)
+        elif kind == 'matrix_log':
+            run, matrix_stats = describe_matrix_log(_load_json(path))
+        elif kind == 'bankruptcy_progress':
+            run, strategies, games = describe_bankruptcy_progress(_load_json(path))
+        else:
+            run, strategies, games = describe_export(_load_json(path), path)
+
+        run_id = conn.execute(
+            'INSERT INTO runs (file_id, kind, timestamp, planned_tournaments, games_per_tournament, '
+            'completed_tournaments, total_games, strategy_count, params_json) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (file_id, kind, run.get('timestamp') or _timestamp_from_name(path), run.get('planned_tournaments'),
+             run.get('games_per_tournament'), run.get('completed_tournaments'), run.get('total_games'),
+             run.get('strategy_count'), json.dumps(run.get('params', {})))).lastrowid
+
+        conn.executemany('INSERT OR REPLACE INTO run_strategies VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                         [(run_id,) + row for row in strategies])
+        conn.executemany('INSERT INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?)', [(run_id,) + row for row in games])
+        if matrix_stats is not None:
+            conn.execute('INSERT INTO matrix_logs VALUES (?, ?, ?, ?, ?, ?, ?, ?)', (run_id,) + matrix_stats)
+
+def discover_files(directories):
+    """(absolute path, kind) for every export found under the given directories"""
+    found = {}
+    for directory in directories:
+        for kind, pattern in FILE_PATTERNS:
+            for path in glob.glob(os.path.join(directory, pattern)):
+                found[os.path.abspath(path)] = kind
+    return found
+
+def update_catalog(conn, directories=('.',)):
+    """Index new and changed files, drop entries for deleted ones; returns (added, updated, removed)"""
+    known = {path: (size, mtime_ns) for path, size, mtime_ns in conn.execute('SELECT path, size, mtime_ns FROM files')}
+    found = discover_files(directories)
+    scanned = {os.path.abspath(d) for d in directories}
+
+    added = updated = 0
+    for path, kind in sorted(found.items()):
+        stat = os.stat(path)
+        if known.get(path) == (stat.st_size, stat.st_mtime_ns):
+            continue
+        try:
+            index_file(conn, path, kind, stat)
+        except (ValueError, KeyError, TypeError, AttributeError, sqlite3.Error) as e:
+            print(f"⚠️ Skipping {os.path.basename(path)}: {e}")
+            continue
+        if path in known:
+            updated += 1
+        else:
+            added += 1
+
+    # Only forget files that lived under a directory we just scanned
+    gone = [path for path in known if path not in found
+            and any(path.startswith(d + os.sep) for d in scanned)]
+    with conn:
+        conn.executemany('DELETE FROM files WHERE path = ?', [(path,) for path in gone])
+
+    return added, updated, len(gone)
+
+def runs_where_survived(conn, strategy_id, min_tournaments=1):
+    """Runs in which a strategy survived at least min_tournaments tournaments"""
+    return conn.execute(
+        'SELECT r.id, r.kind, r.timestamp, f.path, s.name, s.tournaments_survived, s.final_balance '
+        'FROM run_strategies s JOIN runs r ON r.id = s.run_id JOIN files f ON f.id = r.file_id '
+        'WHERE s.strategy_id = ? AND s.tournaments_survived >= ? ORDER BY r.timestamp',
+        (strategy_id, min_tournaments)).fetchall()
+
+def latest_run_file(conn, kind):
+    """Path of the newest indexed file of a kind (by run timestamp), or None"""
+    row = conn.execute('SELECT f.path FROM runs r JOIN files f ON f.id = r.file_id WHERE r.kind = ? '
+                       'ORDER BY r.timestamp DESC LIMIT 1', (kind,)).fetchone()
+    return row[0] if row else None
+
+def list_runs(conn, kind=None):
+    """Indexed runs ordered by timestamp, optionally filtered by kind"""
+    query = ('SELECT r.id, r.kind, r.timestamp, r.completed_tournaments, r.total_games, r.strategy_count, f.path '
+             'FROM runs r JOIN files f ON f.id = r.file_id')
+    if kind:
+        return conn.execute(query + ' WHERE r.kind = ? ORDER BY r.timestamp', (kind,)).fetchall()
+    return conn.execute(query + ' ORDER BY r.timestamp').fetchall()
+
+if __name__ == "__main__":
+    usage = ("Usage: python3 run_catalog.py index [directories ...]   (also ingests their backups/)\n"
+             "       python3 run_catalog.py runs [kind]\n"
+             "       python3 run_catalog.py survived <strategy_id> [min_tournaments]")
+    if len(sys.argv) < 2:
+        print(usage)
+        sys.exit(1)
+
+    command = sys.argv[1]
+    conn = open_catalog()
+
+    if command == 'index':
+        directories = sys.argv[2:] or ['.']
+        start = datetime.now()
+        added, updated, removed = update_catalog(conn, directories)
+        total = conn.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+        print(f"✅ Catalog updated in {(datetime.now() - start).total_seconds():.1f}s: "
+              f"{added} added, {updated} updated, {removed} removed ({total} files indexed)")
+
+        # Imported here: backup_ingest builds on this module
+        from backup_ingest import BACKUP_SCHEMA, ingest_backups
+        conn.executescript(BACKUP_SCHEMA)
+        snapshots, duplicates, new_games, new_events = ingest_backups(conn, directories)
+        print(f"💾 Backups: {snapshots} snapshots parsed, {duplicates} duplicate states skipped, "
+              f"{new_games} new games, {new_events} new evolution events")
+    elif command == 'runs':
+        for run_id, kind, timestamp, tournaments, games, strategies, path in list_runs(conn, sys.argv[2] if len(sys.argv) > 2 else None):
+            print(f"#{run_id} {kind:<20} {timestamp or '?':<25} T={tournaments or '-'} G={games or '-'} "
+                  f"S={strategies or '-'}  {os.path.basename(path)}")
+    elif command == 'survived' and len(sys.argv) > 2:
+        min_tournaments = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+        rows = runs_where_survived(conn, sys.argv[2], min_tournaments)
+        print(f"🔍 {len(rows)} runs where {sys.argv[2]} survived ≥{min_tournaments} tournaments")
+        for run_id, kind, timestamp, path, name, survived, balance in rows:
+            print(f"   #{run_id} {timestamp} {name}: survived {survived}, final balance {balance}  ({os.path.basename(path)})")
+    else:
+        print(usage)
+        sys.exit(1)
@@ -9,6 +9,9 @@ import glob
 import os
 from collections import defaultdict
 
+from profiling import profiled, stage
+
+@profiled()
 def analyze_balance_timeline(csv_file=None):
     # If no file specified, find the most recent balance timeline CSV
     if csv_file is None:
@@ -20,6 +23,7 @@ def analyze_balance_timeline(csv_file=None):
         print(f"Using most recent file: {csv_file}")
     
     # Read and parse CSV data
+    stage('parse')
     data = []
     try:
         with open(csv_file, 'r') as f:
@@ -40,6 +44,7 @@ def analyze_balance_timeline(csv_file=None):
         return
     
     # Organize data by strategy
+    stage('group')
     strategies = defaultdict(list)
     for row in data:
         strategies[row['Strategy']].append(row)
@@ -52,6 +57,7 @@ def analyze_balance_timeline(csv_file=None):
     print("=" * 50)
     
     # Calculate statistics for each strategy
+    stage('strategy_stats')
     strategy_stats = []
     
     for strategy_name, strategy_data in strategies.items():
@@ -95,6 +101,7 @@ def analyze_balance_timeline(csv_file=None):
         })
     
     # Sort by final balance (descending)
+    stage('rankings')
     strategy_stats.sort(key=lambda x: x['final'], reverse=True)
     
     # Display results
@@ -116,6 +123,7 @@ def analyze_balance_timeline(csv_file=None):
     print("-" * 50)
     
     # Create simplified ASCII chart
+    stage('ascii_chart')
     max_balance = max(max(row['Balance'] for row in stats['data']) for stats in strategy_stats)
     chart_height = 10
     chart_width = 40
@@ -153,6 +161,7 @@ def analyze_balance_timeline(csv_file=None):
     print(f"   0 Game 0{' ' * (chart_width - 15)}Final Game")
     
     # Key insights
+    stage('insights')
     print("\n🎯 KEY INSIGHTS")
     print("-" * 50)
     
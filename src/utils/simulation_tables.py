@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Normalized Simulation Tables
+Flattens an enhanced_evolution export into Arrow tables (strategies, lineage, games, economic
+impacts, proposals, votes, balance points) and writes them as compressed Parquet. Every strategy
+ID column is dictionary-encoded against one shared dictionary, and tables are read back with
+column projection and memory mapping.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+from string_table import load_interned_json
+from timeline_store import build_timeline_store, load_reconstructed_store
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Only needed to write or read the Parquet files
+    pa = None
+    pq = None
+
+TABLES = ['strategies', 'lineage', 'games', 'economic_impacts', 'proposals', 'votes', 'balance_points']
+
+# Columns holding strategy ids; these are dictionary-encoded
+STRATEGY_COLUMNS = {'strategy_id', 'parent_id', 'winner_id', 'proposer_id', 'recipient_id', 'voter_id', 'target_id'}
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for Parquet tables: pip install pyarrow")
+
+def _columns(*names):
+    """Empty column lists for a table"""
+    return {name: [] for name in names}
+
+def _append(table, *values):
+    """Append one row to a table of column lists"""
+    for column, value in zip(table.values(), values):
+        column.append(value)
+
+def _player_strategies(game):
+    """Map playerN ids to strategy ids for one game"""
+    return {p.get('id'): (p.get('agent') or {}).get('strategyId', p.get('strategyId')) for p in game.get('players', [])}
+
+def collect_strategies(tournament_data, final_stats=()):
+    """Strategy rows keyed by id, first sighting wins, as in create_evolution_tree"""
+    strategies = {}
+    final_balance = {s.get('id'): s.get('coinBalance') for s in final_stats}
+
+    for t_index, tournament in enumerate(tournament_data):
+        tournament_num = tournament.get('tournamentNumber', t_index + 1)
+        starting = {b.get('id'): b.get('balance') for b in tournament.get('startingBalances', [])}
+        created = {c.get('id'): c for c in tournament.get('evolutionDetails', {}).get('created', [])}
+
+        for strategy in tournament.get('strategies', []) + tournament.get('strategiesEvolved', []):
+            strategy_id = strategy.get('id')
+            if not strategy_id or strategy_id in strategies:
+                continue
+            details = created.get(strategy_id, {})
+            strategies[strategy_id] = {
+                'name': strategy.get('name', ''),
+                'archetype': strategy.get('archetype', ''),
+                'generation': details.get('generation', 0 if t_index == 0 else None),
+                'first_tournament': tournament_num,
+                'starting_balance': details.get('startingBalance', starting.get(strategy_id)),
+                'is_core': t_index == 0,
+                'final_balance': final_balance.get(strategy_id),
+                'strategy_text': strategy.get('strategy', '')
+            }
+    return strategies
+
+def normalize_export(data, source_path=None):
+    """Flatten an export into plain column lists per table"""
+    tournament_data = data.get('tournaments', data.get('tournamentData', []))
+    strategies = collect_strategies(tournament_data, data.get('finalStats', []))
+    ids_by_name = {}
+    for strategy_id, info in strategies.items():
+        ids_by_name.setdefault(info['name'], strategy_id)
+
+    tables = {
+        'strategies': _columns('strategy_id', 'name', 'archetype', 'generation', 'first_tournament',
+                               'starting_balance', 'is_core', 'final_balance', 'strategy_text'),
+        'lineage': _columns('strategy_id', 'parent_id', 'parent_name', 'weight', 'tournament', 'avoiding'),
+        'games': _columns('tournament', 'game', 'players', 'rounds', 'winner_id', 'winning_votes', 'pool'),
+        'economic_impacts': _columns('tournament', 'game', 'strategy_id', 'entry_fee', 'payout', 'profit', 'is_winner'),
+        'proposals': _columns('tournament', 'game', 'round', 'proposer_id', 'recipient_id', 'share'),
+        'votes': _columns('tournament', 'game', 'round', 'voter_id', 'target_id', 'votes'),
+        'balance_points': _columns('strategy_id', 'tournament', 'game', 'balance', 'profit', 'is_winner', 'is_eliminated')
+    }
+
+    for strategy_id, info in strategies.items():
+        _append(tables['strategies'], strategy_id, *info.values())
+
+    for t_index, tournament in enumerate(tournament_data):
+        tournament_num = tournament.get('tournamentNumber', t_index + 1)
+
+        for created in tournament.get('evolutionDetails', {}).get('created', []):
+            for parent in created.get('parents', []):
+                _append(tables['lineage'], created.get('id'), ids_by_name.get(parent.get('name')),
+                        parent.get('name'), parent.get('weight'), tournament_num, created.get('avoiding'))
+
+        for g_index, game in enumerate(tournament.get('games', [])):
+            game_num = game.get('gameNumber', g_index + 1)
+            players = _player_strategies(game)
+            impacts = game.get('economicImpact', [])
+            winner = (game.get('finalResult') or {}).get('winner') or {}
+
+            _append(tables['games'], tournament_num, game_num, len(players), len(game.get('rounds', [])),
+                    winner.get('strategyId'), winner.get('votes'), sum(i.get('entryFee', 0) for i in impacts))
+
+            for impact in impacts:
+                _append(tables['economic_impacts'], tournament_num, game_num, impact.get('strategyId'),
+                        impact.get('entryFee', 0), impact.get('payout', 0), impact.get('profit', 0),
+                        bool(impact.get('isWinner', False)))
+
+            for r_index, round_data in enumerate(game.get('rounds', [])):
+                round_num = round_data.get('roundNumber', r_index + 1)
+                for proposal in round_data.get('proposals', []):
+                    for recipient, share in (proposal.get('proposal') or {}).items():
+                        _append(tables['proposals'], tournament_num, game_num, round_num,
+                                proposal.get('strategyId'), players.get(recipient), share)
+                for vote in (round_data.get('votes') or {}).values():
+                    for target, count in (vote.get('votes') or {}).items():
+                        _append(tables['votes'], tournament_num, game_num, round_num,
+                                vote.get('strategyId'), players.get(target), count)
+
+    balance_timeline = data.get('balanceTimeline', {})
+    store = build_timeline_store(balance_timeline) if balance_timeline \
+        else load_reconstructed_store(tournament_data, source_path=source_path)
+    points = tables['balance_points']
+    points['strategy_id'] = list(np.asarray(store['strategy_ids'], dtype=object)[store['strategy']])
+    for column in ('tournament', 'game', 'balance', 'profit', 'is_winner', 'is_eliminated'):
+        points[column] = store[column]
+
+    # Strategies only seen in the timeline still need a row for name/archetype lookups
+    for i, strategy_id in enumerate(store['strategy_ids']):
+        if strategy_id not in strategies:
+            _append(tables['strategies'], strategy_id, store['names'][i], store['archetypes'][i],
+                    None, None, None, False, None, '')
+
+    return tables
+
+def _dictionary_column(values, dictionary, codes):
+    """Dictionary-encode strategy ids against the shared dictionary (None stays null)"""
+    indices = np.array([codes.get(v, -1) for v in values], dtype=np.int32)
+    mask = indices < 0
+    return pa.DictionaryArray.from_arrays(pa.array(indices, mask=mask if mask.any() else None), dictionary)
+
+def to_arrow_tables(tables):
+    """Convert normalized column lists into Arrow tables with a shared strategy dictionary"""
+    _require_pyarrow()
+    strategy_ids = list(tables['strategies']['strategy_id'])
+    codes = {strategy_id: i for i, strategy_id in enumerate(strategy_ids)}
+    dictionary = pa.array(strategy_ids, type=pa.string())
+
+    arrow_tables = {}
+    for name, columns in tables.items():
+        arrays = {}
+        for column, values in columns.items():
+            if column in STRATEGY_COLUMNS:
+                arrays[column] = _dictionary_column(values, dictionary, codes)
+            else:
+                arrays[column] = pa.array(values)
+        arrow_tables[name] = pa.table(arrays)
+    return arrow_tables
+
+def default_tables_dir(json_file):
+    """enhanced_evolution_<ts>.json → enhanced_evolution_<ts>_tables/"""
+    return os.path.splitext(json_file)[0] + '_tables'
+
+def export_tables(json_file, output_dir=None, compression='zstd'):
+    """Normalize an export and write one Parquet file per table; returns the output directory"""
+    _require_pyarrow()
+    output_dir = output_dir or default_tables_dir(json_file)
+    os.makedirs(output_dir, exist_ok=True)
+
+    data = load_interned_json(json_file)
+
+    arrow_tables = to_arrow_tables(normalize_export(data, source_path=json_file))
+    for name, table in arrow_tables.items():
+        pq.write_table(table, os.path.join(output_dir, f'{name}.parquet'), compression=compression)
+    return output_dir, {name: table.num_rows for name, table in arrow_tables.items()}
+
+def read_table(tables_dir, name, columns=None, filters=None):
+    """Read one table, projecting only the requested columns; filters use pyarrow's (col, op, value) form"""
+    _require_pyarrow()
+    return pq.read_table(os.path.join(tables_dir, f'{name}.parquet'), columns=columns,
+                         filters=filters, memory_map=True)
+
+def read_frame(tables_dir, name, columns=None, filters=None):
+    """read_table as a pandas DataFrame (strategy ids come back as categoricals)"""
+    return read_table(tables_dir, name, columns, filters).to_pandas()
+
+def is_tables_dir(path):
+    """True for a directory written by export_tables"""
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, 'balance_points.parquet'))
+
+def load_tables_store(tables_dir, strategy_ids=None):
+    """Build a timeline store from the balance_points table, optionally for a subset of strategies"""
+    filters = [('strategy_id', 'in', list(strategy_ids))] if strategy_ids else None
+    points = read_table(tables_dir, 'balance_points', filters=filters)
+    labels = read_table(tables_dir, 'strategies', columns=['strategy_id', 'name', 'archetype'])
+
+    strategy_column = points.column('strategy_id').combine_chunks()
+    dictionary = strategy_column.dictionary.to_pylist()
+    codes = strategy_column.indices.to_numpy(zero_copy_only=False)
+
+    # Keep strategies in first-appearance order, as build_timeline_store does
+    present, first_index = np.unique(codes, return_index=True)
+    order = present[np.argsort(first_index)]
+    remap = np.full(len(dictionary), -1, dtype=np.int64)
+    remap[order] = np.arange(len(order))
+    strategy = remap[codes]
+    sort = np.argsort(strategy, kind='stable')
+
+    names = dict(zip(labels.column('strategy_id').to_pylist(), labels.column('name').to_pylist()))
+    archetypes = dict(zip(labels.column('strategy_id').to_pylist(), labels.column('archetype').to_pylist()))
+    ids = [dictionary[code] for code in order]
+
+    store = {
+        'strategy_ids': ids,
+        'names': [names.get(i) or i for i in ids],
+        'archetypes': [archetypes.get(i) or 'Unknown' for i in ids],
+        'offsets': np.concatenate(([0], np.cumsum(np.bincount(strategy, minlength=len(ids))))),
+        'strategy': strategy[sort].astype(np.int32)
+    }
+    for column in ('tournament', 'game', 'balance', 'profit', 'is_winner', 'is_eliminated'):
+        store[column] = points.column(column).to_numpy()[sort]
+    return store
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python3 simulation_tables.py <enhanced_evolution.json> [output_dir]")
+        sys.exit(1)
+
+    json_file = sys.argv[1]
+    output_dir, counts = export_tables(json_file, sys.argv[2] if len(sys.argv) > 2 else None)
+
+    json_size = os.path.getsize(json_file)
+    parquet_size = sum(os.path.getsize(os.path.join(output_dir, f'{name}.parquet')) for name in TABLES)
+    print(f"✅ Wrote {len(counts)} tables to {output_dir} "
+          f"({parquet_size / 1024:.0f} KB vs {json_size / 1024:.0f} KB JSON)")
+    for name in TABLES:
+        print(f"   • {name}: {counts[name]} rows")
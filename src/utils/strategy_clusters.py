@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Strategy Text Clustering
+Measures how novel evolved strategy descriptions are. Each text is hashed into signed word unigram
+and bigram buckets, weighted by sublinear term frequency and randomly projected to a small dense
+vector, and that vector is cached under the text's content hash, so a new generation embeds only
+texts never seen before. Vectors are centred on a reference mean frozen in the same cache, so scores
+for a strategy don't depend on which other runs are analysed alongside it. Clustering (spherical
+k-means) and per-run novelty (1 - similarity to the closest earlier strategy) are NumPy matrix
+operations over the cached vectors.
+"""
+
+import os
+import re
+import sys
+import zlib
+from collections import Counter
+from datetime import datetime
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from render_quality import apply_quality_flag, save_figure
+from string_table import load_interned_json, text_id
+from timeline_store import CACHE_DIR
+
+HASH_BITS = 16            # 2^16 signed hash buckets
+EMBEDDING_DIMS = 256      # random projection keeps cosine similarities within a few percent
+PROJECTION_SEED = 20250601
+VECTORS_VERSION = 1
+CACHE_FILE = os.path.join(CACHE_DIR, 'strategy_text_vectors.npz')
+NEAR_DUPLICATE = 0.9      # similarity above which a strategy counts as a rewording
+BLOCK_ROWS = 4096
+REFERENCE_MIN = 64        # cached texts needed before the centring mean is frozen
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+_projection = None
+
+def projection_matrix():
+    """Fixed ±1 bucket-to-embedding projection; cached vectors stay valid as long as the seed does"""
+    global _projection
+    if _projection is None:
+        rng = np.random.default_rng(PROJECTION_SEED)
+        _projection = rng.choice(np.array([-1, 1], dtype=np.int8), size=(1 << HASH_BITS, EMBEDDING_DIMS))
+    return _projection
+
+def text_features(text):
+    """Hashed bucket indices and sublinear signed weights for a text's word unigrams and bigrams"""
+    words = TOKEN_PATTERN.findall(text.lower())
+    counts = Counter()
+    for token in words + [f'{a} {b}' for a, b in zip(words, words[1:])]:
+        h = zlib.crc32(token.encode('utf-8'))
+        counts[h >> (32 - HASH_BITS)] += 1 if h & 1 else -1  # sign bit spreads out bucket collisions
+    buckets = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    return buckets, np.sign(values) * (1 + np.log(np.maximum(np.abs(values), 1)))
+
+def embed_texts(texts):
+    """Unit-length projected vectors for a batch of texts, one reduceat per block of texts"""
+    projection = projection_matrix()
+    features = [text_features(text) for text in texts]
+    lengths = np.array([len(buckets) for buckets, _ in features], dtype=np.int64)
+    vectors = np.zeros((len(texts), EMBEDDING_DIMS), dtype=np.float32)
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    buckets = np.concatenate([b for b, _ in features]) if features else np.zeros(0, np.int64)
+    weights = np.concatenate([w for _, w in features]) if features else np.zeros(0, np.float32)
+
+    step = BLOCK_ROWS // 4
+    for start in range(0, len(texts), step):
+        stop = min(start + step, len(texts))
+        lo, hi = offsets[start], offsets[stop]
+        filled = lengths[start:stop] > 0
+        if hi > lo:
+            block = projection[buckets[lo:hi]] * weights[lo:hi, None]
+            vectors[start:stop][filled] = np.add.reduceat(block, offsets[start:stop][filled] - lo, axis=0)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1)
+
+class TextVectorCache:
+    """Embedding per text content hash, persisted as one .npz next to the timeline caches"""
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.index = {}
+        self.vectors = np.zeros((0, EMBEDDING_DIMS), dtype=np.float32)
+        self.reference = None
+        self.reference_count = 0
+        self.reference_changed = False
+        self.added = 0
+        if path and os.path.exists(path):
+            try:
+                with np.load(path, allow_pickle=False) as npz:
+                    if int(npz['version']) == VECTORS_VERSION and int(npz['seed']) == PROJECTION_SEED:
+                        self.vectors = npz['vectors']
+                        self.index = {key: i for i, key in enumerate(npz['keys'].tolist())}
+                        if 'reference' in npz.files:
+                            self.reference = npz['reference']
+                            self.reference_count = int(npz['reference_count'])
+            except (OSError, ValueError, KeyError):
+                pass  # Corrupt caches are simply rebuilt
+
+    def lookup(self, texts):
+        """Vectors for texts, embedding only those whose content hash is not cached yet"""
+        keys = [text_id(text) for text in texts]
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in self.index and key not in missing:
+                missing[key] = text
+        if missing:
+            start = len(self.vectors)
+            self.vectors = np.concatenate([self.vectors, embed_texts(list(missing.values()))])
+            self.index.update({key: start + i for i, key in enumerate(missing)})
+            self.added += len(missing)
+        return self.vectors[[self.index[key] for key in keys]]
+
+    def reference_mean(self):
+        """Mean of the cached vectors, frozen once REFERENCE_MIN texts are cached.
+
+        Until then it follows the cache as it grows (scores are provisional); afterwards
+        it never changes, so centred vectors stay comparable across invocations.
+        """
+        if self.reference_count < REFERENCE_MIN and len(self.vectors) > self.reference_count:
+            self.reference = self.vectors.mean(axis=0)
+            self.reference_count = len(self.vectors)
+            self.reference_changed = True
+        return self.reference if self.reference is not None else np.zeros(EMBEDDING_DIMS, dtype=np.float32)
+
+    @property
+    def provisional(self):
+        return self.reference_count < REFERENCE_MIN
+
+    def save(self):
+        if not (self.added or self.reference_changed) or not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp.npz'
+        extra = {} if self.reference is None else {'reference': self.reference, 'reference_count': self.reference_count}
+        np.savez(tmp_path, version=VECTORS_VERSION, seed=PROJECTION_SEED,
+                 keys=np.array(sorted(self.index, key=self.index.get), dtype=str), vectors=self.vectors, **extra)
+        os.replace(tmp_path, self.path)
+        self.added = 0
+        self.reference_changed = False
+
+def center(vectors, reference):
+    """Remove the reference corpus' common direction and renormalise.
+
+    Cached vectors cannot carry corpus IDF (it changes with every new text), so the shared
+    boilerplate every description has in common is taken out here instead.
+    """
+    centered = vectors - reference
+    norms = np.linalg.norm(centered, axis=1, keepdims=True)
+    return centered / np.where(norms > 0, norms, 1)
+
+def spherical_kmeans(embeddings, k, iterations=20, seed=0):
+    """Cosine k-means on unit vectors; returns (labels, unit centroids)"""
+    n = len(embeddings)
+    k = max(1, min(k, n))
+    rng = np.random.default_rng(seed)
+    centroids = embeddings[rng.choice(n, k, replace=False)].copy()
+    labels = np.full(n, -1)
+    for _ in range(iterations):
+        new_labels = np.concatenate([np.argmax(block @ centroids.T, axis=1)
+                                     for block in np.array_split(embeddings, max(1, n // BLOCK_ROWS))])
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        order = np.argsort(labels, kind='stable')
+        present, starts = np.unique(labels[order], return_index=True)
+        sums = np.zeros_like(centroids)
+        sums[present] = np.add.reduceat(embeddings[order], starts, axis=0)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        empty = norms[:, 0] == 0
+        centroids = np.where(empty[:, None], centroids, sums / np.where(norms > 0, norms, 1))
+    return labels, centroids
+
+def novelty(embeddings, order_keys):
+    """1 - cosine similarity to the most similar strategy with a smaller order key (1.0 for the first)"""
+    n = len(embeddings)
+    result = np.ones(n, dtype=np.float32)
+    nearest = np.full(n, -1)
+    for start in range(0, n, BLOCK_ROWS):
+        block = slice(start, min(start + BLOCK_ROWS, n))
+        similarity = embeddings[block] @ embeddings.T
+        earlier = order_keys[None, :] < order_keys[block, None]
+        similarity = np.where(earlier, similarity, -np.inf)
+        best = np.argmax(similarity, axis=1)
+        found = np.isfinite(similarity[np.arange(len(best)), best])
+        result[block] = np.where(found, 1 - similarity[np.arange(len(best)), best], 1.0)
+        nearest[block] = np.where(found, best, -1)
+    return np.clip(result, 0, 1), nearest
+
+def collect_strategy_texts(data, run=0):
+    """(run, id, name, generation, text) for every strategy description in an export or snapshot"""
+    records = {}
+    tournament_data = data.get('tournamentData', data.get('tournaments'))
+    if tournament_data is not None:
+        for tournament in tournament_data:
+            number = tournament.get('tournamentNumber', 0)
+            for strategy in tournament.get('strategies', []):
+                records.setdefault(strategy['id'], (run, strategy['id'], strategy.get('name', ''), 0,
+                                                    strategy.get('strategy', '')))
+            details = tournament.get('evolutionDetails', {})
+            for created in details.get('created', []) + tournament.get('strategiesEvolved', []):
+                if created.get('id') and created.get('strategy'):
+                    records.setdefault(created['id'], (run, created['id'], created.get('name', ''),
+                                                       created.get('generation', number), created['strategy']))
+    for strategy in data.get('strategies', []) + data.get('eliminatedStrategies', []):
+        if strategy.get('strategy'):
+            records.setdefault(strategy['id'], (run, strategy['id'], strategy.get('name', ''),
+                                                (strategy.get('generationNumber') or 1) - 1, strategy['strategy']))
+    return [record for record in records.values() if record[4]]
+
+def cluster_strategies(records, k=None, cache=None):
+    """Embed, cluster and score novelty for collected strategy records"""
+    cache = cache if cache is not None else TextVectorCache()
+    vectors = cache.lookup([record[4] for record in records])
+    new_texts = cache.added
+    embeddings = center(vectors, cache.reference_mean())
+    cache.save()
+
+    k = k or max(1, int(np.sqrt(len(records) / 2)))
+    labels, _ = spherical_kmeans(embeddings, k)
+
+    # Novelty only compares strategies of the same run, created in an earlier generation
+    runs = np.array([record[0] for record in records], dtype=np.int64)
+    generations = np.array([record[3] for record in records], dtype=np.int64)
+    scores = np.ones(len(records), dtype=np.float32)
+    nearest = np.full(len(records), -1)
+    for run in np.unique(runs):
+        members = np.flatnonzero(runs == run)
+        run_scores, run_nearest = novelty(embeddings[members], generations[members])
+        scores[members] = run_scores
+        nearest[members] = np.where(run_nearest >= 0, members[np.maximum(run_nearest, 0)], -1)
+
+    return {'records': records, 'embeddings': embeddings, 'labels': labels, 'novelty': scores,
+            'nearest': nearest, 'generations': generations, 'new_texts': new_texts,
+            'provisional': cache.provisional}
+
+def create_novelty_chart(result):
+    """Mean novelty per generation next to the largest clusters"""
+    generations, scores, labels = result['generations'], result['novelty'], result['labels']
+    evolved = generations > 0
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+
+    if evolved.any():
+        gens = np.unique(generations[evolved])
+        means = np.array([scores[evolved & (generations == g)].mean() for g in gens])
+        duplicates = np.array([(scores[evolved & (generations == g)] < 1 - NEAR_DUPLICATE).mean() for g in gens])
+        ax1.plot(gens, means, marker='o', color='darkgreen', label='mean novelty')
+        ax1.bar(gens, duplicates, alpha=0.3, color='red', label=f'share near-duplicates (sim ≥ {NEAR_DUPLICATE})')
+        ax1.set_ylim(0, 1)
+        ax1.legend(loc='upper right')
+    ax1.set_title('Strategy Text Novelty by Generation', fontsize=14, fontweight='bold')
+    ax1.set_xlabel('Generation')
+    ax1.grid(True, alpha=0.3)
+
+    sizes = np.bincount(labels)
+    top = np.argsort(-sizes)[:15]
+    names = [result['records'][int(np.flatnonzero(labels == c)[0])][2][:28] for c in top]
+    ax2.barh(range(len(top)), sizes[top], color='steelblue')
+    ax2.set_yticks(range(len(top)))
+    ax2.set_yticklabels(names, fontsize=9)
+    ax2.invert_yaxis()
+    ax2.set_title(f'Largest of {len(sizes)} Text Clusters (first member shown)', fontsize=14, fontweight='bold')
+    ax2.set_xlabel('Strategies')
+    plt.tight_layout()
+    return fig
+
+def print_cluster_report(result, top=10):
+    records, labels, scores, nearest = result['records'], result['labels'], result['novelty'], result['nearest']
+    print(f"\n🧠 STRATEGY TEXT CLUSTERS: {len(records)} strategies, {len(np.unique(labels))} clusters "
+          f"({result['new_texts']} new texts embedded, the rest cached)")
+    print("=" * 60)
+    if result['provisional']:
+        print(f"⚠️ Fewer than {REFERENCE_MIN} texts cached; novelty is provisional until the reference mean is frozen")
+    evolved = result['generations'] > 0
+    if evolved.any():
+        print(f"✨ Mean novelty of evolved strategies: {scores[evolved].mean():.2f}; "
+              f"{(scores[evolved] < 1 - NEAR_DUPLICATE).sum()} near-duplicates of an earlier strategy")
+    print("\n🔁 Least novel evolved strategies:")
+    for i in [i for i in np.argsort(scores) if evolved[i]][:top]:
+        match = records[nearest[i]][2] if nearest[i] >= 0 else '-'
+        print(f"   {records[i][2][:30]:<30} gen {records[i][3]:<3} novelty {scores[i]:.2f} (closest: {match[:30]})")
+
+if __name__ == "__main__":
+    apply_quality_flag()
+    if len(sys.argv) < 2:
+        print("Usage: python3 strategy_clusters.py <evolution_data.json | progress.json> [more_runs.json ...] [--quality tier]")
+        sys.exit(1)
+
+    records = []
+    for run, path in enumerate(sys.argv[1:]):
+        records.extend(collect_strategy_texts(load_interned_json(path), run))
+    if not records:
+        print("❌ No strategy texts found")
+        sys.exit(1)
+
+    result = cluster_strategies(records)
+    print_cluster_report(result)
+    create_novelty_chart(result)
+    output_file = f"strategy_novelty_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+    save_figure(output_file)
+    print(f"\n✅ Novelty chart saved as: {output_file}")
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Strategy Details Table
+Builds one row per strategy (lineage, description, final performance from an indexed lookup) and
+writes it as a paginated PNG series rendered in parallel, a multi-page vector PDF, or HTML/CSV
+tables that skip raster rendering entirely.
+"""
+
+import csv
+import html
+import os
+import sys
+import textwrap
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
+
+from memory_budget import worker_count
+from render_quality import save_figure, set_tier, tier, tier_name
+from string_table import SHARED_TABLE
+
+COLUMNS = ['Strategy Name', 'Generation', 'Archetype', 'Strategy Description',
+           'Based On (Weight)', 'Avoiding', 'Final Balance', 'Win Rate']
+COLUMN_WIDTHS = [0.14, 0.06, 0.12, 0.23, 0.18, 0.12, 0.10, 0.05]
+
+ROWS_PER_PAGE = 25
+DESCRIPTION_CHARS = 280  # raster pages only; HTML/CSV keep the full text
+FORMATS = ('png', 'pdf', 'html', 'csv')
+DETAILS_ENV = 'AGENT_BATTLE_DETAILS'
+
+ROW_COLORS = {True: (0.678, 0.847, 0.902, 0.3), False: (0.565, 0.933, 0.565, 0.3)}  # lightblue / lightgreen
+HEADER_COLOR = (0.5, 0.5, 0.5, 0.5)
+
+def final_performance_index(tournament_data):
+    """Latest (final balance, win rate) per strategy id from one pass over every tournament"""
+    index = {}
+    for tournament in tournament_data:
+        evolution_details = tournament.get('evolutionDetails', {})
+        for survivor in evolution_details.get('survivors', []):
+            index[survivor['id']] = (survivor['balance'], f"{survivor['winRate']}%")
+        for eliminated in evolution_details.get('eliminated', []):
+            index[eliminated['id']] = (f"{eliminated['finalBalance']} (eliminated)", f"{eliminated['winRate']}%")
+    return index
+
+def _generation_key(info):
+    return (0 if info.get('is_core') else info['first_seen'], info['name'])
+
+def details_rows(all_strategies, tournament_data):
+    """Table rows sorted by generation then name; rows sharing a description are grouped by text ID"""
+    performance = final_performance_index(tournament_data)
+    ordered = sorted(all_strategies.items(), key=lambda item: _generation_key(item[1]))
+
+    text_ids = {strategy_id: SHARED_TABLE.id_of(info.get('strategy_text', '')) for strategy_id, info in ordered}
+    shared_by = Counter(text_ids.values())
+    first_with_text = {}
+
+    rows = []
+    for strategy_id, info in ordered:
+        text_key = text_ids[strategy_id]
+        first = first_with_text.setdefault(text_key, info['name'])
+        parents = info.get('parents') or []
+        final_balance, win_rate = performance.get(strategy_id, ('Unknown', 'Unknown'))
+        rows.append({
+            'id': strategy_id,
+            'is_core': info.get('is_core', False),
+            'name': info['name'],
+            'generation': 'Core' if info.get('is_core', False) else f"Gen {info['first_seen']}",
+            'archetype': info['archetype'],
+            'description': info.get('strategy_text', ''),
+            'same_as': first if first != info['name'] else None,
+            'shared_by': shared_by[text_key],
+            'parents': ', '.join(f"{p['name']} ({p.get('weight', '?')}%)" for p in parents),
+            'avoiding': info.get('avoiding', ''),
+            'final_balance': str(final_balance),
+            'win_rate': str(win_rate)
+        })
+    return rows
+
+def _cell_description(row):
+    if row['same_as']:
+        return f"(same description as {row['same_as']})"
+    text = textwrap.shorten(row['description'], DESCRIPTION_CHARS, placeholder=' …')
+    text = textwrap.fill(text, width=50)
+    if row['shared_by'] > 1:
+        text += f"\n[shared by {row['shared_by']} strategies]"
+    return text
+
+def draw_details_table(ax, rows):
+    """Draw rows as a matplotlib table; colours are passed in bulk rather than styled per cell"""
+    ax.axis('tight')
+    ax.axis('off')
+    cell_text = [[row['name'], row['generation'], row['archetype'], _cell_description(row),
+                  textwrap.fill(row['parents'], width=36), textwrap.fill(row['avoiding'], width=22),
+                  row['final_balance'], row['win_rate']] for row in rows]
+
+    table = ax.table(cellText=cell_text,
+                     colLabels=COLUMNS,
+                     cellColours=[[ROW_COLORS[row['is_core']]] * len(COLUMNS) for row in rows],
+                     colColours=[HEADER_COLOR] * len(COLUMNS),
+                     colWidths=COLUMN_WIDTHS,
+                     cellLoc='left',
+                     loc='center',
+                     bbox=[0, 0, 1, 1])
+    table.auto_set_font_size(False)
+    table.set_fontsize(9)
+    table.scale(1, 2)
+    for j in range(len(COLUMNS)):
+        table[(0, j)].set_text_props(weight='bold')
+    return table
+
+def create_details_figure(rows, page_number=1, page_count=1):
+    """One table page sized to its rows"""
+    fig, ax = plt.subplots(figsize=(20, max(4, 0.55 * len(rows) + 2)))
+    draw_details_table(ax, rows)
+    page = f' (page {page_number}/{page_count})' if page_count > 1 else ''
+    plt.title(f'📋 Complete Strategy Evolution Details{page}\n'
+              'Blue = Core Strategies, Green = Evolved Strategies',
+              fontsize=16, fontweight='bold', pad=20)
+    return fig
+
+def render_details_page(rows, page_number, page_count, output_file, dpi, tier=None):
+    """Worker entry point: render and save one page with the parent's tier settings"""
+    if tier:
+        set_tier(tier)
+    fig = create_details_figure(rows, page_number, page_count)
+    save_figure(output_file, fig, dpi=dpi)
+    plt.close(fig)
+    return output_file
+
+def paginate(rows, rows_per_page=ROWS_PER_PAGE):
+    return [rows[i:i + rows_per_page] for i in range(0, len(rows), rows_per_page)] or [[]]
+
+def render_png_pages(rows, base_name, rows_per_page=ROWS_PER_PAGE, dpi=None, workers=None):
+    """<base>.png for a single page, otherwise <base>_p01.png … rendered in a process pool"""
+    dpi = dpi or tier()['dpi']  # resolved here so workers need not inherit the tier
+    pages = paginate(rows, rows_per_page)
+    if len(pages) == 1:
+        return [render_details_page(pages[0], 1, 1, f'{base_name}.png', dpi)]
+
+    width = len(str(len(pages)))
+    outputs = [f'{base_name}_p{i:0{max(2, width)}d}.png' for i in range(1, len(pages) + 1)]
+    jobs = [(page, i + 1, len(pages), outputs[i], dpi, tier_name()) for i, page in enumerate(pages)]
+
+    workers = min(worker_count(workers), len(pages))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(render_details_page, *zip(*jobs)))
+    return [render_details_page(*job) for job in jobs]
+
+def write_pdf(rows, output_file, rows_per_page=ROWS_PER_PAGE):
+    """Multi-page vector PDF; PdfPages needs one process, and vector pages are cheap to draw"""
+    pages = paginate(rows, rows_per_page)
+    with PdfPages(output_file) as pdf:
+        for i, page in enumerate(pages):
+            fig = create_details_figure(page, i + 1, len(pages))
+            pdf.savefig(fig, bbox_inches=tier()['bbox_inches'])
+            plt.close(fig)
+    return output_file
+
+def write_csv(rows, output_file):
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Strategy ID'] + COLUMNS)
+        for row in rows:
+            writer.writerow([row['id'], row['name'], row['generation'], row['archetype'], row['description'],
+                             row['parents'], row['avoiding'], row['final_balance'], row['win_rate']])
+    return output_file
+
+def write_html(rows, output_file):
+    """Standalone HTML table; full descriptions, duplicates collapsed to a reference"""
+    body = []
+    for row in rows:
+        description = (f"<em>same description as {html.escape(row['same_as'])}</em>" if row['same_as']
+                       else html.escape(row['description']))
+        cells = [row['name'], row['generation'], row['archetype'], None, row['parents'], row['avoiding'],
+                 row['final_balance'], row['win_rate']]
+        tds = ''.join(f'<td>{description}</td>' if cell is None else f'<td>{html.escape(cell)}</td>' for cell in cells)
+        body.append(f'<tr class="{"core" if row["is_core"] else "evolved"}" id="{html.escape(row["id"])}">{tds}</tr>')
+
+    header = ''.join(f'<th>{html.escape(column)}</th>' for column in COLUMNS)
+    with open(output_file, 'w') as f:
+        f.write('<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Strategy Evolution Details</title>\n'
+                '<style>body{font-family:sans-serif}table{border-collapse:collapse;font-size:13px}'
+                'th,td{border:1px solid #ccc;padding:4px 6px;vertical-align:top;text-align:left}'
+                'th{background:#bbb;position:sticky;top:0}tr.core{background:#e6f3fa}tr.evolved{background:#e9fbe9}'
+                '</style></head><body>\n<h2>📋 Complete Strategy Evolution Details</h2>\n'
+                f'<p>{len(rows)} strategies. Blue = Core Strategies, Green = Evolved Strategies</p>\n'
+                f'<table><thead><tr>{header}</tr></thead><tbody>\n' + '\n'.join(body) +
+                '\n</tbody></table></body></html>\n')
+    return output_file
+
+def details_formats(formats=None):
+    """Requested output formats: argument, then AGENT_BATTLE_DETAILS, then png"""
+    formats = formats or os.environ.get(DETAILS_ENV, 'png')
+    if isinstance(formats, str):
+        formats = [f.strip().lower() for f in formats.split(',') if f.strip()]
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown details format(s) {sorted(unknown)}; choose from {', '.join(FORMATS)}")
+    return formats
+
+def write_strategy_details(all_strategies, tournament_data, base_name, formats=None,
+                           rows_per_page=ROWS_PER_PAGE, dpi=None):
+    """Write the details table in each requested format; returns the files written"""
+    formats = details_formats(formats)
+    rows = details_rows(all_strategies, tournament_data)
+    outputs = []
+
+    if 'csv' in formats:
+        outputs.append(write_csv(rows, f'{base_name}.csv'))
+    if 'html' in formats:
+        outputs.append(write_html(rows, f'{base_name}.html'))
+    if 'pdf' in formats:
+        outputs.append(write_pdf(rows, f'{base_name}.pdf', rows_per_page))
+    if 'png' in formats:
+        outputs.extend(render_png_pages(rows, base_name, rows_per_page, dpi))
+    return outputs
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python3 strategy_details.py <evolution_data.json> [png,pdf,html,csv]")
+        sys.exit(1)
+
+    from string_table import load_interned_json
+    from visualize_evolution_tree import collect_all_strategies
+
+    data = load_interned_json(sys.argv[1])
+    tournament_data = data.get('tournamentData', data.get('tournaments', []))
+    base_name = os.path.splitext(os.path.basename(sys.argv[1]))[0] + '_details'
+    for output in write_strategy_details(collect_all_strategies(tournament_data), tournament_data, base_name,
+                                         sys.argv[2] if len(sys.argv) > 2 else None):
+        print(f"✅ {output}")
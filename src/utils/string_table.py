@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+String Interning Table
+Exports repeat the same strategy descriptions, negotiation messages and LLM prompts thousands of
+times. Loading through load_interned_json keeps one copy of each distinct text in a shared
+content-hash table, and every text gets a short stable ID so duplicates group with a dict lookup.
+"""
+
+import hashlib
+import json
+import sys
+from collections import Counter
+
+# Free-text fields that repeat across tournaments, games and log entries
+INTERNED_KEYS = frozenset({'strategy', 'avoiding', 'message', 'prompt', 'response', 'error'})
+
+def text_id(text):
+    """Stable content-hash ID for a text (the same in every process and run)"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+class StringTable:
+    """Content-hash interning table: each distinct text is stored once under its text_id"""
+
+    def __init__(self):
+        self.texts = {}       # id -> canonical text
+        self.counts = Counter()  # id -> occurrences interned
+        self._ids = {}        # canonical text -> id
+
+    def intern(self, text):
+        """ID for a text, adding it to the table on first sight"""
+        text_key = self._ids.get(text)
+        if text_key is None:
+            text_key = text_id(text)
+            text = self.texts.setdefault(text_key, text)
+            self._ids[text] = text_key
+        self.counts[text_key] += 1
+        return text_key
+
+    def canonical(self, text):
+        """The table's single copy of a text"""
+        return self.texts[self.intern(text)]
+
+    def id_of(self, text):
+        """ID for a text without counting another occurrence"""
+        text_key = self._ids.get(text)
+        return text_key if text_key is not None else text_id(text)
+
+    def text(self, text_key):
+        return self.texts[text_key]
+
+    def __len__(self):
+        return len(self.texts)
+
+    def stats(self):
+        """Occurrences, distinct texts and the character totals with and without dedup"""
+        total_chars = sum(len(self.texts[k]) * n for k, n in self.counts.items())
+        unique_chars = sum(len(text) for text in self.texts.values())
+        return {
+            'occurrences': sum(self.counts.values()),
+            'unique': len(self.texts),
+            'total_chars': total_chars,
+            'unique_chars': unique_chars
+        }
+
+# Shared by every loader in the process so a text repeated across files is still stored once
+SHARED_TABLE = StringTable()
+
+def interning_hook(table=SHARED_TABLE, keys=INTERNED_KEYS):
+    """json object_hook replacing repeated free-text values with the table's canonical copy"""
+    def hook(obj):
+        for key in keys & obj.keys():
+            value = obj[key]
+            if isinstance(value, str) and value:
+                obj[key] = table.canonical(value)
+        return obj
+    return hook
+
+def load_interned_json(path, table=SHARED_TABLE, keys=INTERNED_KEYS):
+    """json.load with free-text fields interned while parsing, so duplicates never pile up"""
+    with open(path, 'r') as f:
+        return json.load(f, object_hook=interning_hook(table, keys))
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python3 string_table.py <export_or_log.json> [...]")
+        sys.exit(1)
+
+    for path in sys.argv[1:]:
+        load_interned_json(path)
+    stats = SHARED_TABLE.stats()
+    print(f"✅ Interned {stats['occurrences']} texts from {len(sys.argv) - 1} file(s) into {stats['unique']} distinct entries")
+    print(f"   {stats['total_chars'] / 1024:.0f} KB of text → {stats['unique_chars'] / 1024:.0f} KB stored "
+          f"({stats['total_chars'] / max(stats['unique_chars'], 1):.1f}x dedup)")
+    for text_key, count in SHARED_TABLE.counts.most_common(5):
+        preview = SHARED_TABLE.text(text_key).replace('\n', ' ')[:60]
+        print(f"   • {text_key} ×{count}: {preview}")
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Strategy Survival Analysis
+Kaplan-Meier survival and Nelson-Aalen hazard estimates per archetype and per generation,
+pooled across any number of evolution runs. Survivors are treated as censored.
+"""
+
+import sys
+import matplotlib.pyplot as plt
+import numpy as np
+from datetime import datetime
+
+from memory_budget import apply_memory_flag, load_export, report_memory
+from render_quality import apply_quality_flag, save_figure
+from timeline_store import export_to_store
+
+def build_event_table(data, run_id=0, store=None, source_path=None):
+    """Build one row per strategy: games survived, whether it was eliminated, archetype and generation"""
+    if store is None:
+        store = export_to_store(data, source_path=source_path)
+    strategy_ids = np.asarray(store['strategy_ids'], dtype=object)
+    n = len(strategy_ids)
+
+    tournament_data = data.get('tournamentData', data.get('tournaments', []))
+    eliminated_ids = set()
+    generations = {}
+    for tournament in tournament_data:
+        evolution_details = tournament.get('evolutionDetails', {})
+        eliminated_ids.update(e['id'] for e in evolution_details.get('eliminated', []))
+        for created in evolution_details.get('created', []):
+            generations[created['id']] = created.get('generation', tournament.get('tournamentNumber', 0))
+
+    played = store['game'] > 0
+    durations = np.bincount(store['strategy'][played], minlength=n)
+    flagged = np.bincount(store['strategy'][store['is_eliminated']], minlength=n) > 0
+    events = flagged | np.isin(strategy_ids, list(eliminated_ids))
+
+    return {
+        'run': np.full(n, run_id, dtype=np.int32),
+        'strategy_ids': strategy_ids,
+        'archetype': np.asarray(store['archetypes'], dtype=object),
+        'generation': np.asarray([generations.get(sid, 0) for sid in strategy_ids], dtype=np.int32),
+        'duration': durations.astype(np.int64),
+        'event': events
+    }
+
+def concat_event_tables(tables):
+    """Pool event tables from several runs into one"""
+    return {key: np.concatenate([t[key] for t in tables]) for key in tables[0]}
+
+def _segment_cumsum(values, group_starts):
+    """Cumulative sum that restarts at every group boundary"""
+    cs = np.cumsum(values)
+    base = np.concatenate(([0.0], cs[:-1]))[group_starts]
+    lengths = np.diff(np.append(group_starts, len(values)))
+    return cs - np.repeat(base, lengths)
+
+def kaplan_meier(groups, durations, events, label=str):
+    """Kaplan-Meier survival curves for every group at once.
+
+    Returns {label(group): {'time', 'at_risk', 'events', 'hazard', 'survival', 'cumulative_hazard'}}
+    in group order (numeric groups sort numerically; labels are formatted afterwards).
+    Everything is computed on the sorted (group, time) table with no per-strategy loops.
+    """
+    groups = groups.astype(str) if groups.dtype == object else groups
+    group_values, group_codes = np.unique(groups, return_inverse=True)
+    max_time = int(durations.max()) + 1 if len(durations) else 1
+
+    keys = group_codes.astype(np.int64) * max_time + durations
+    unique_keys, key_index = np.unique(keys, return_inverse=True)
+    totals = np.bincount(key_index)
+    deaths = np.bincount(key_index, weights=events.astype(float))
+
+    key_groups = unique_keys // max_time
+    key_times = unique_keys % max_time
+    group_starts = np.flatnonzero(np.r_[True, key_groups[1:] != key_groups[:-1]])
+
+    # At-risk count is everyone in the group whose duration is >= t
+    group_sizes = np.bincount(group_codes, minlength=len(group_values))
+    exits_before = _segment_cumsum(totals.astype(float), group_starts) - totals
+    at_risk = group_sizes[key_groups] - exits_before
+
+    hazard = deaths / at_risk
+    log_step = np.where(hazard < 1, np.log1p(-np.minimum(hazard, 1 - 1e-12)), -1e9)
+    survival = np.exp(_segment_cumsum(log_step, group_starts))
+    cumulative_hazard = _segment_cumsum(hazard, group_starts)
+
+    curves = {}
+    bounds = np.append(group_starts, len(unique_keys))
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        curves[label(group_values[key_groups[start]])] = {
+            'time': key_times[start:end],
+            'at_risk': at_risk[start:end],
+            'events': deaths[start:end],
+            'hazard': hazard[start:end],
+            'survival': survival[start:end],
+            'cumulative_hazard': cumulative_hazard[start:end]
+        }
+
+    return curves
+
+def plot_survival_curves(ax, curves, title):
+    """Draw Kaplan-Meier step curves on an axis"""
+    colors = plt.cm.Set3(np.linspace(0, 1, max(len(curves), 1)))
+
+    for color, (label, curve) in zip(colors, curves.items()):
+        times = np.concatenate(([0], curve['time']))
+        survival = np.concatenate(([1.0], curve['survival']))
+        n_total = int(curve['at_risk'][0])
+        ax.step(times, survival * 100, where='post', linewidth=2.5, color=color,
+                label=f"{label} (n={n_total})")
+
+    ax.set_xlabel('Games Played', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Surviving (%)', fontsize=12, fontweight='bold')
+    ax.set_title(title, fontsize=13, fontweight='bold')
+    ax.set_ylim(0, 105)
+    ax.grid(True, alpha=0.3)
+    ax.legend(loc='lower left', fontsize=9)
+
+def create_survival_chart(event_table, run_count=1):
+    """Create side-by-side survival charts by archetype and by generation"""
+    fig, (ax_archetype, ax_generation) = plt.subplots(1, 2, figsize=(20, 8))
+
+    by_archetype = kaplan_meier(event_table['archetype'], event_table['duration'], event_table['event'])
+    by_generation = kaplan_meier(event_table['generation'], event_table['duration'], event_table['event'],
+                                 label='Gen {}'.format)
+
+    plot_survival_curves(ax_archetype, by_archetype, 'By Archetype')
+    plot_survival_curves(ax_generation, by_generation, 'By Generation')
+
+    fig.suptitle(f'⏳ Strategy Survival (Kaplan-Meier) across {run_count} run(s), '
+                 f'{len(event_table["duration"])} strategies',
+                 fontsize=16, fontweight='bold')
+    plt.tight_layout()
+
+    return fig, by_archetype, by_generation
+
+def print_survival_summary(curves, heading):
+    """Print median survival and final survival per group"""
+    print(f"\n{heading}")
+    print("-" * 50)
+    for label, curve in curves.items():
+        below_half = np.flatnonzero(curve['survival'] <= 0.5)
+        median = f"{curve['time'][below_half[0]]} games" if len(below_half) else 'not reached'
+        print(f"{label}: n={int(curve['at_risk'][0])}, eliminations={int(curve['events'].sum())}, "
+              f"median survival {median}, final S={curve['survival'][-1] * 100:.1f}%")
+
+def analyze_survival(json_files):
+    """Pool several evolution exports and chart survival by archetype and generation"""
+    tables = []
+    for run_id, json_file in enumerate(json_files):
+        print(f"📊 Loading evolution data from {json_file}...")
+        data = load_export(json_file)
+        tables.append(build_event_table(data, run_id, source_path=json_file))
+        del data  # free this run before parsing the next
+
+    event_table = concat_event_tables(tables)
+    if len(event_table['duration']) == 0:
+        print("❌ No strategies found to analyze")
+        return None
+
+    fig, by_archetype, by_generation = create_survival_chart(event_table, len(json_files))
+
+    timestamp_str = datetime.now().strftime('%Y%m%d_%H%M%S')
+    output_file = f'strategy_survival_{timestamp_str}.png'
+    save_figure(output_file)
+    print(f"✅ Survival chart saved: {output_file}")
+
+    print_survival_summary(by_archetype, "🧬 SURVIVAL BY ARCHETYPE")
+    print_survival_summary(by_generation, "🌱 SURVIVAL BY GENERATION")
+
+    return output_file
+
+if __name__ == "__main__":
+    apply_quality_flag()
+    apply_memory_flag()
+    if len(sys.argv) < 2:
+        print("Usage: python3 survival_analysis.py <evolution_data.json> [more_runs.json ...] [--memory-budget MB]")
+        sys.exit(1)
+
+    result = analyze_survival(sys.argv[1:])
+    report_memory()
+    if not result:
+        sys.exit(1)
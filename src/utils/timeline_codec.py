@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Compact Balance Timeline Codec
+Encodes an export's balanceTimeline as {"$codec": "abtl1", "data": <base64>} instead of one verbose
+JSON object per datapoint: game indices become run-length encoded steps on the run-wide game index,
+balances and profits are delta/zigzag varints, and the winner/eliminated flags are bit-packed.
+build_timeline_store decodes it transparently, so every Python loader reads either form. The JS side
+(evolutionReporter, resumeEvolution) only reads the verbose form, so encoded exports are written as
+<file>.abtl copies outside its *.json globs, and progress files that runs resume from are never encoded.
+"""
+
+import argparse
+import base64
+import json
+import os
+import struct
+import sys
+import zlib
+
+import numpy as np
+
+from timeline_store import build_timeline_store, global_game_index, store_to_balance_timeline
+
+CODEC = 'abtl1'
+HEADER = struct.Struct('<I')  # JSON header length
+SECTIONS = ['steps', 'balance', 'profit', 'flags']
+ENCODED_SUFFIX = '.abtl'
+
+# resumeEvolution.js restores tracker.balanceTimeline from these, so they must stay verbose
+PROGRESS_PREFIXES = ('incremental_progress_', 'bankruptcy_progress_')
+
+def is_encoded_timeline(balance_timeline):
+    """True for a balanceTimeline written by this codec"""
+    return isinstance(balance_timeline, dict) and balance_timeline.get('$codec') == CODEC
+
+def zigzag(values):
+    """Map signed integers onto unsigned ones so small magnitudes stay short"""
+    values = np.asarray(values, dtype=np.int64)
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+def unzigzag(values):
+    values = np.asarray(values, dtype=np.uint64)
+    return (values >> np.uint64(1)).astype(np.int64) ^ -(values & np.uint64(1)).astype(np.int64)
+
+def encode_varints(values):
+    """LEB128-encode unsigned integers, vectorized over byte positions"""
+    values = np.asarray(values, dtype=np.uint64)
+    if len(values) == 0:
+        return b''
+    lengths = np.ones(len(values), dtype=np.int64)
+    for k in range(1, 10):
+        lengths += values >= np.uint64(1 << (7 * k))
+    starts = np.cumsum(lengths) - lengths
+
+    out = np.empty(int(lengths.sum()), dtype=np.uint8)
+    for k in range(int(lengths.max())):
+        mask = lengths > k
+        chunk = (values[mask] >> np.uint64(7 * k)) & np.uint64(0x7f)
+        chunk |= np.where(lengths[mask] > k + 1, np.uint64(0x80), np.uint64(0))
+        out[starts[mask] + k] = chunk
+    return out.tobytes()
+
+def decode_varints(buffer):
+    """Decode every LEB128 integer in a byte buffer"""
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    if len(data) == 0:
+        return np.zeros(0, dtype=np.uint64)
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    position = np.arange(len(data)) - np.repeat(starts, ends - starts + 1)
+    payload = (data & 0x7f).astype(np.uint64) << (np.uint64(7) * position.astype(np.uint64))
+    return np.add.reduceat(payload, starts)
+
+def _segment_deltas(values, is_first):
+    """Difference to the previous row, restarting from zero at each strategy's first row"""
+    values = np.asarray(values, dtype=np.int64)
+    deltas = np.diff(values, prepend=0)
+    deltas[is_first] = values[is_first]
+    return deltas
+
+def _segment_cumsum(deltas, offsets):
+    """Invert _segment_deltas for rows grouped by the given offsets"""
+    totals = np.cumsum(deltas)
+    counts = np.diff(offsets)
+    before = np.concatenate(([0], totals))[offsets[:-1]]
+    return totals - np.repeat(before, counts)
+
+def encode_timeline_store(store):
+    """Pack a timeline store into the compact {"$codec", "data"} form"""
+    offsets = np.asarray(store['offsets'], dtype=np.int64)
+    n_rows = int(offsets[-1])
+    is_first = np.zeros(n_rows, dtype=bool)
+    is_first[offsets[:-1][np.diff(offsets) > 0]] = True
+
+    tournament = np.asarray(store['tournament'], dtype=np.int64)
+    game = np.asarray(store['game'], dtype=np.int64)
+    first_tournament = int(tournament.min()) if n_rows else 1
+    slots = int(game.max()) if n_rows else 0
+
+    # Steps: per-strategy deltas are almost always 1, so run-length encode them
+    step_deltas = _segment_deltas(global_game_index(tournament, game, slots, first_tournament), is_first)
+    run_starts = np.flatnonzero(np.concatenate(([n_rows > 0], step_deltas[1:] != step_deltas[:-1])))
+    run_lengths = np.diff(np.append(run_starts, n_rows))
+    runs = np.column_stack((zigzag(step_deltas[run_starts]), run_lengths.astype(np.uint64))).ravel()
+
+    # Balances as deltas; profits as the residual against that delta (zero on ordinary games)
+    balance_deltas = _segment_deltas(store['balance'], is_first)
+    expected_profit = np.where(is_first, 0, balance_deltas)
+    profit_residuals = np.asarray(store['profit'], dtype=np.int64) - expected_profit
+
+    flags = np.packbits(np.concatenate((np.asarray(store['is_winner'], dtype=bool),
+                                        np.asarray(store['is_eliminated'], dtype=bool))))
+    sections = {
+        'steps': encode_varints(runs),
+        'balance': encode_varints(zigzag(balance_deltas)),
+        'profit': encode_varints(zigzag(profit_residuals)),
+        'flags': flags.tobytes()
+    }
+
+    header = json.dumps({
+        'strategy_ids': list(store['strategy_ids']),
+        'names': list(store['names']),
+        'archetypes': list(store['archetypes']),
+        'counts': np.diff(offsets).tolist(),
+        'first_tournament': first_tournament,
+        'slots': slots,
+        'sections': {name: len(sections[name]) for name in SECTIONS}
+    }, separators=(',', ':')).encode('utf-8')
+
+    payload = HEADER.pack(len(header)) + header + b''.join(sections[name] for name in SECTIONS)
+    return {'$codec': CODEC, 'data': base64.b64encode(zlib.compress(payload, 9)).decode('ascii')}
+
+def encode_balance_timeline(balance_timeline):
+    """Compact form of a plain balanceTimeline dict (already-encoded input is returned as is)"""
+    if is_encoded_timeline(balance_timeline):
+        return balance_timeline
+    return encode_timeline_store(build_timeline_store(balance_timeline))
+
+def decode_timeline_store(encoded):
+    """Unpack the compact form straight into a columnar timeline store"""
+    payload = zlib.decompress(base64.b64decode(encoded['data']))
+    (header_len,) = HEADER.unpack_from(payload)
+    header = json.loads(payload[HEADER.size:HEADER.size + header_len])
+
+    sections = {}
+    position = HEADER.size + header_len
+    for name in SECTIONS:
+        length = header['sections'][name]
+        sections[name] = payload[position:position + length]
+        position += length
+
+    counts = np.asarray(header['counts'], dtype=np.int64)
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    n_rows = int(offsets[-1])
+    is_first = np.zeros(n_rows, dtype=bool)
+    is_first[offsets[:-1][counts > 0]] = True
+
+    runs = decode_varints(sections['steps']).reshape(-1, 2)
+    step_deltas = np.repeat(unzigzag(runs[:, 0]), runs[:, 1].astype(np.int64))
+    steps = _segment_cumsum(step_deltas, offsets)
+    balance_deltas = unzigzag(decode_varints(sections['balance']))
+    profit = unzigzag(decode_varints(sections['profit'])) + np.where(is_first, 0, balance_deltas)
+    flags = np.unpackbits(np.frombuffer(sections['flags'], dtype=np.uint8), count=2 * n_rows).astype(bool)
+
+    slots = header['slots'] + 1
+    return {
+        'strategy_ids': header['strategy_ids'],
+        'names': header['names'],
+        'archetypes': header['archetypes'],
+        'offsets': offsets,
+        'strategy': np.repeat(np.arange(len(counts), dtype=np.int32), counts),
+        'tournament': (steps // slots + header['first_tournament']).astype(np.int32),
+        'game': (steps % slots).astype(np.int32),
+        'balance': _segment_cumsum(balance_deltas, offsets),
+        'profit': profit,
+        'is_winner': flags[:n_rows],
+        'is_eliminated': flags[n_rows:]
+    }
+
+def decode_balance_timeline(balance_timeline):
+    """Plain balanceTimeline dict for either form"""
+    if not is_encoded_timeline(balance_timeline):
+        return balance_timeline
+    return store_to_balance_timeline(decode_timeline_store(balance_timeline))
+
+def default_output(json_file, expand=False):
+    """<file>.abtl for an encoded copy; expanding strips the suffix (or writes <stem>_expanded.json)"""
+    if not expand:
+        return json_file + ENCODED_SUFFIX
+    if json_file.endswith(ENCODED_SUFFIX):
+        return json_file[:-len(ENCODED_SUFFIX)]
+    return os.path.splitext(json_file)[0] + '_expanded.json'
+
+def convert_export(json_file, output=None, expand=False):
+    """Write a copy of an export with its balanceTimeline compacted (or expanded back); returns section sizes"""
+    if not expand and os.path.basename(json_file).startswith(PROGRESS_PREFIXES):
+        raise ValueError(f"{json_file} is a progress file runs resume from; the JS loaders can't read encoded timelines")
+    output = output or default_output(json_file, expand)
+    if os.path.exists(output):
+        raise ValueError(f"{output} already exists; remove it or pass another output")
+
+    with open(json_file, 'r') as f:
+        data = json.load(f)
+
+    timeline = data.get('balanceTimeline')
+    if not timeline:
+        raise ValueError(f"{json_file} has no balanceTimeline to convert")
+    before = len(json.dumps(timeline))
+    data['balanceTimeline'] = decode_balance_timeline(timeline) if expand else encode_balance_timeline(timeline)
+    after = len(json.dumps(data['balanceTimeline']))
+
+    tmp_path = output + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, output)
+    return before, after
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Write compact (or expanded) copies of exports\' balanceTimeline')
+    parser.add_argument('files', nargs='+', help=f'enhanced_evolution JSON files (or {ENCODED_SUFFIX} copies with --expand)')
+    parser.add_argument('--expand', action='store_true', help='write the verbose per-datapoint form back')
+    parser.add_argument('--output', help='output path (single input only); defaults to <file>.abtl, or the original name when expanding')
+    args = parser.parse_args()
+    if args.output and len(args.files) > 1:
+        parser.error('--output takes a single input file')
+
+    failed = False
+    for json_file in args.files:
+        output = args.output or default_output(json_file, args.expand)
+        size_before = os.path.getsize(json_file)
+        try:
+            before, after = convert_export(json_file, output, args.expand)
+        except ValueError as e:
+            print(f"⚠️  {e}")
+            failed = True
+            continue
+        print(f"✅ {json_file} → {output}: balanceTimeline {before / 1024:.0f} KB → {after / 1024:.0f} KB "
+              f"({before / max(after, 1):.1f}x), file {size_before / 1024:.0f} KB → {os.path.getsize(output) / 1024:.0f} KB")
+    if failed:
+        sys.exit(1)
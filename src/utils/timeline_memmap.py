@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Memory-Mapped Timeline Files
+Fixed-layout binary timelines (.abtm): store columns as contiguous arrays plus a per-strategy
+offset index, opened with numpy.memmap so multi-run charts only page in the strategies and
+game ranges they draw.
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+from datetime import datetime
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from memory_budget import load_export
+from render_quality import TIERS, decimate, legend, legend_layout, save_figure, set_tier
+from timeline_store import (ELIMINATION_THRESHOLD, STARTING_BALANCE, cache_path, export_to_store,
+                            games_per_tournament, global_game_index, load_timeline_store)
+
+MAGIC = b'ABTMMAP1'
+PREAMBLE = struct.Struct('<8sI')  # magic, header length
+ALIGNMENT = 64
+MAP_CACHE_VERSION = 1
+
+# Fixed on-disk dtypes; 'step' is the run-wide game index used for x positions and range paging
+COLUMN_DTYPES = {
+    'strategy': '<i4',
+    'tournament': '<i4',
+    'game': '<i4',
+    'step': '<i4',
+    'balance': '<i8',
+    'profit': '<i8',
+    'is_winner': '|b1',
+    'is_eliminated': '|b1'
+}
+
+def _align(position):
+    """Round a file position up to the column alignment"""
+    return (position + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def global_steps(store, slots=None):
+    """Run-wide game index of each row, so the same step means the same game in every run"""
+    if len(store['tournament']) == 0:
+        return np.zeros(0, dtype=np.int32)
+    slots = slots or games_per_tournament(games=store['game'])
+    return global_game_index(store['tournament'], store['game'], slots).astype(np.int32)
+
+def write_timeline_map(store, path, slots=None):
+    """Write a store as a .abtm file; rows within each strategy are ordered by step"""
+    slots = slots or games_per_tournament(games=store['game'])
+    steps = global_steps(store, slots)
+    order = np.lexsort((steps, store['strategy']))
+    columns = {name: np.ascontiguousarray(store[name][order] if name != 'step' else steps[order],
+                                          dtype=COLUMN_DTYPES[name]) for name in COLUMN_DTYPES}
+    offsets = np.ascontiguousarray(store['offsets'], dtype='<i8')
+
+    # Column positions depend on the header length, so lay out until it stops changing
+    layout = {}
+    header_len = 0
+    while True:
+        position = _align(PREAMBLE.size + header_len)
+        layout['offsets'] = [position, len(offsets)]
+        position = _align(position + offsets.nbytes)
+        for name, array in columns.items():
+            layout[name] = [position, len(array)]
+            position = _align(position + array.nbytes)
+        header = json.dumps({
+            'version': 1,
+            'strategy_ids': store['strategy_ids'],
+            'names': store['names'],
+            'archetypes': store['archetypes'],
+            'slots': int(slots),
+            'dtypes': COLUMN_DTYPES,
+            'layout': layout
+        }).encode('utf-8')
+        if len(header) == header_len:
+            break
+        header_len = len(header)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(PREAMBLE.pack(MAGIC, len(header)))
+        f.write(header)
+        for name, array in [('offsets', offsets)] + list(columns.items()):
+            f.seek(layout[name][0])
+            f.write(array.tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+def open_timeline_map(path):
+    """Open a .abtm file as a store whose columns are read-only memmaps"""
+    with open(path, 'rb') as f:
+        magic, header_len = PREAMBLE.unpack(f.read(PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a memory-mapped timeline file")
+        header = json.loads(f.read(header_len))
+
+    store = {key: header[key] for key in ('strategy_ids', 'names', 'archetypes')}
+    store['path'] = path
+    store['slots'] = header.get('slots')
+    dtypes = dict(header['dtypes'], offsets='<i8')
+    for name, (offset, length) in header['layout'].items():
+        if length == 0:
+            store[name] = np.zeros(0, dtype=dtypes[name])
+        else:
+            store[name] = np.memmap(path, dtype=dtypes[name], mode='r', offset=offset, shape=(length,))
+    return store
+
+def strategy_rows(timeline_map, strategy_index, step_range=None):
+    """Row slice for one strategy, narrowed to [start, stop) steps by binary search"""
+    start, stop = int(timeline_map['offsets'][strategy_index]), int(timeline_map['offsets'][strategy_index + 1])
+    if step_range is not None and stop > start:
+        steps = timeline_map['step'][start:stop]
+        low = start + int(np.searchsorted(steps, step_range[0], side='left'))
+        high = start + int(np.searchsorted(steps, step_range[1], side='left'))
+        start, stop = low, high
+    return slice(start, stop)
+
+def page_strategy(timeline_map, strategy_index, step_range=None, columns=('step', 'balance', 'is_eliminated')):
+    """Copy just the requested columns and rows for one strategy out of the map"""
+    rows = strategy_rows(timeline_map, strategy_index, step_range)
+    return {name: np.array(timeline_map[name][rows]) for name in columns}
+
+def select_strategies(timeline_map, selectors):
+    """Strategy indices matching any selector by exact id or case-insensitive name substring"""
+    if not selectors:
+        return list(range(len(timeline_map['strategy_ids'])))
+    selected = []
+    for i, (strategy_id, name) in enumerate(zip(timeline_map['strategy_ids'], timeline_map['names'])):
+        if any(s == strategy_id or s.lower() in name.lower() for s in selectors):
+            selected.append(i)
+    return selected
+
+def convert_to_timeline_map(source, output=None, data=None):
+    """Convert any export load_timeline_store understands into a .abtm file.
+
+    JSON exports lay out steps with simulationParams.gamesPerTournament, so a run whose last
+    tournament stopped early lines up with full runs of the same parameters. Pass data when
+    the export is already parsed.
+    """
+    output = output or os.path.splitext(source.rstrip(os.sep))[0] + '.abtm'
+    if source.endswith('.json'):
+        data = data if data is not None else load_export(source)
+        store = export_to_store(data, source_path=source)
+        return write_timeline_map(store, output, games_per_tournament(data, store['game']))
+    return write_timeline_map(load_timeline_store(source), output)
+
+def cached_map_path(source):
+    """Where the .abtm copy of a source file is kept in its timeline cache"""
+    return cache_path(source, 'timeline_map', MAP_CACHE_VERSION, extension='.abtm')
+
+def cached_timeline_map(source, data=None):
+    """Open the cached .abtm copy of a source file, converting it first when the source changed"""
+    path = cached_map_path(source)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        convert_to_timeline_map(source, path, data)
+    return open_timeline_map(path)
+
+def create_overlay_chart(map_files, selectors=None, step_range=None):
+    """Overlay balance lines for the selected strategies across many runs"""
+    plt.figure(figsize=(14, 8))
+
+    strategy_colors = {}
+    palette = plt.cm.Set3(np.linspace(0, 1, 12))
+    points_read = 0
+
+    for map_file in map_files:
+        timeline_map = open_timeline_map(map_file)
+        for i in select_strategies(timeline_map, selectors):
+            page = page_strategy(timeline_map, i, step_range)
+            if len(page['step']) == 0:
+                continue
+            points_read += len(page['step'])
+
+            name = timeline_map['names'][i]
+            first = name not in strategy_colors
+            color = strategy_colors.setdefault(name, palette[len(strategy_colors) % len(palette)])
+            plt.plot(*decimate(page['step'], page['balance']), linewidth=1.5, alpha=0.7, color=color,
+                     label=name if first else None)
+
+            eliminated = page['is_eliminated']
+            if eliminated.any():
+                plt.scatter(page['step'][eliminated], page['balance'][eliminated],
+                            color='red', s=40, marker='X', alpha=0.8, zorder=5)
+
+    plt.title(f'Strategy Balance Across {len(map_files)} Runs', fontsize=16, fontweight='bold')
+    plt.xlabel('Game (run-wide index)', fontsize=12)
+    plt.ylabel('Coin Balance', fontsize=12)
+    plt.grid(True, alpha=0.3)
+    plt.axhline(y=STARTING_BALANCE, color='gray', linestyle='--', alpha=0.5, label='Starting Balance')
+    plt.axhline(y=ELIMINATION_THRESHOLD, color='red', linestyle='--', alpha=0.5, label='Elimination Threshold')
+    legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+    legend_layout()
+
+    return points_read
+
+def visualize_overlay(map_files, selectors=None, step_range=None):
+    """Chart several .abtm runs on one set of axes and save the PNG"""
+    points_read = create_overlay_chart(map_files, selectors, step_range)
+    if points_read == 0:
+        print("❌ No datapoints matched the requested strategies and game range")
+        return None
+
+    output_file = f"balance_overlay_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+    save_figure(output_file)
+    print(f"✅ Overlay of {len(map_files)} runs ({points_read} datapoints paged in) saved as: {output_file}")
+    return output_file
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Memory-mapped timeline files and multi-run overlays')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    convert = subparsers.add_parser('convert', help='convert exports, CSVs or tables directories to .abtm')
+    convert.add_argument('sources', nargs='+')
+
+    overlay = subparsers.add_parser('overlay', help='overlay balance lines from several .abtm files')
+    overlay.add_argument('maps', nargs='+')
+    overlay.add_argument('--strategies', help='comma-separated strategy ids or name fragments')
+    overlay.add_argument('--games', help='run-wide game index range start:stop')
+    overlay.add_argument('--quality', choices=list(TIERS), help='render tier (default: AGENT_BATTLE_RENDER or publication)')
+
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        for source in args.sources:
+            output = convert_to_timeline_map(source)
+            print(f"✅ {source} → {output} ({os.path.getsize(output) / 1024:.0f} KB)")
+    else:
+        if args.quality:
+            set_tier(args.quality)
+        step_range = None
+        if args.games:
+            start, stop = args.games.split(':')
+            step_range = (int(start or 0), int(stop) if stop else np.iinfo(np.int32).max)
+        selectors = args.strategies.split(',') if args.strategies else None
+        if visualize_overlay(args.maps, selectors, step_range) is None:
+            sys.exit(1)
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Columnar Timeline Store
+Flattens per-strategy balance timelines into contiguous NumPy columns so analyses can run vectorized
+"""
+
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from memory_budget import budget_mb, stream_export, worker_count
+
+STARTING_BALANCE = 500
+ELIMINATION_THRESHOLD = 100
+ENTRY_FEE = 100
+
+STORE_COLUMNS = ['strategy', 'tournament', 'game', 'balance', 'profit', 'is_winner', 'is_eliminated']
+STORE_LABELS = ['strategy_ids', 'names', 'archetypes']
+
+CACHE_DIR = '.timeline_cache'
+RECONSTRUCTION_VERSION = 1
+
+# Below this many tournaments the process pool costs more than it saves
+PARALLEL_MIN_TOURNAMENTS = 8
+
+def build_timeline_store(balance_timeline):
+    """Convert a balanceTimeline dict into a columnar store.
+
+    Rows are grouped by strategy, so the rows for strategy i are
+    store[col][offsets[i]:offsets[i + 1]]. Timelines in the compact
+    timeline_codec form are decoded directly.
+    """
+    # Imported lazily: the codec builds on this module
+    from timeline_codec import decode_timeline_store, is_encoded_timeline
+    if is_encoded_timeline(balance_timeline):
+        return decode_timeline_store(balance_timeline)
+
+    strategy_ids = list(balance_timeline.keys())
+    names = []
+    archetypes = []
+    counts = np.zeros(len(strategy_ids), dtype=np.int64)
+
+    tournaments, games, balances, profits, winners, eliminated = [], [], [], [], [], []
+
+    for i, strategy_id in enumerate(strategy_ids):
+        timeline = balance_timeline[strategy_id]
+        names.append(timeline.get('name', strategy_id))
+        archetypes.append(timeline.get('archetype', 'UNKNOWN'))
+        datapoints = timeline.get('dataPoints', [])
+        counts[i] = len(datapoints)
+
+        for point in datapoints:
+            tournaments.append(point.get('tournament', 0))
+            games.append(point.get('game', 0))
+            balances.append(point.get('balance', 0))
+            profits.append(point.get('profit', 0))
+            winners.append(point.get('isWinner', False))
+            eliminated.append(point.get('isEliminated', False))
+
+    offsets = np.zeros(len(strategy_ids) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    return {
+        'strategy_ids': strategy_ids,
+        'names': names,
+        'archetypes': archetypes,
+        'offsets': offsets,
+        'strategy': np.repeat(np.arange(len(strategy_ids), dtype=np.int32), counts),
+        'tournament': np.asarray(tournaments, dtype=np.int32),
+        'game': np.asarray(games, dtype=np.int32),
+        'balance': np.asarray(balances, dtype=np.int64),
+        'profit': np.asarray(profits, dtype=np.int64),
+        'is_winner': np.asarray(winners, dtype=bool),
+        'is_eliminated': np.asarray(eliminated, dtype=bool)
+    }
+
+def load_csv_store(csv_file):
+    """Build a store from a balance_timeline_*.csv export"""
+    df = pd.read_csv(csv_file)
+    return dataframe_to_store(df)
+
+def dataframe_to_store(df):
+    """Build a store from a DataFrame using the visualizers' column names"""
+    id_column = 'StrategyId' if 'StrategyId' in df.columns else 'StrategyID'
+
+    # Stable sort keeps each strategy's rows in their recorded order
+    codes, strategy_ids = pd.factorize(df[id_column])
+    order = np.argsort(codes, kind='stable')
+    codes = codes[order]
+    df = df.iloc[order]
+
+    counts = np.bincount(codes, minlength=len(strategy_ids))
+    offsets = np.zeros(len(strategy_ids) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    first_rows = df.iloc[offsets[:-1]]
+    names = first_rows['Strategy'].astype(str).tolist()
+    if 'Archetype' in df.columns:
+        archetypes = first_rows['Archetype'].astype(str).tolist()
+    else:
+        archetypes = ['UNKNOWN'] * len(strategy_ids)
+
+    return {
+        'strategy_ids': [str(s) for s in strategy_ids],
+        'names': names,
+        'archetypes': archetypes,
+        'offsets': offsets,
+        'strategy': codes.astype(np.int32),
+        'tournament': df['Tournament'].to_numpy(dtype=np.int32),
+        'game': df['Game'].to_numpy(dtype=np.int32),
+        'balance': df['Balance'].to_numpy(dtype=np.int64),
+        'profit': df['Profit'].to_numpy(dtype=np.int64),
+        'is_winner': _as_bool(df['IsWinner']),
+        'is_eliminated': _as_bool(df['IsEliminated'])
+    }
+
+def _as_bool(series):
+    """Parse boolean columns written either as bools or as 'true'/'false' strings"""
+    if series.dtype == bool:
+        return series.to_numpy()
+    return series.astype(str).str.lower().eq('true').to_numpy()
+
+def load_timeline_store(path):
+    """Load a timeline store from any supported export file or Parquet tables directory"""
+    if path.endswith('.csv'):
+        return load_csv_store(path)
+
+    # Imported lazily: both formats build on this module
+    if os.path.isdir(path):
+        from simulation_tables import load_tables_store
+        return load_tables_store(path)
+    if path.endswith('.abtm'):
+        from timeline_memmap import open_timeline_map
+        return open_timeline_map(path)
+
+    if budget_mb() is not None:
+        data = stream_export(path)
+    else:
+        with open(path, 'r') as f:
+            data = json.load(f)
+
+    return export_to_store(data, source_path=path)
+
+def export_to_store(data, source_path=None):
+    """Store for an already-parsed export: its balanceTimeline, or one reconstructed from the games"""
+    balance_timeline = data.get('balanceTimeline', {})
+    if not balance_timeline:
+        tournament_data = data.get('tournamentData', data.get('tournaments', []))
+        return load_reconstructed_store(tournament_data, source_path=source_path)
+
+    return build_timeline_store(balance_timeline)
+
+def store_to_dataframe(store):
+    """Expand a store into the DataFrame layout used by the chart functions"""
+    strategy_idx = store['strategy']
+    return pd.DataFrame({
+        'Strategy': np.asarray(store['names'], dtype=object)[strategy_idx],
+        'StrategyID': np.asarray(store['strategy_ids'], dtype=object)[strategy_idx],
+        'Archetype': np.asarray(store['archetypes'], dtype=object)[strategy_idx],
+        'Tournament': store['tournament'],
+        'Game': store['game'],
+        'Balance': store['balance'],
+        'Profit': store['profit'],
+        'IsWinner': store['is_winner'],
+        'IsEliminated': store['is_eliminated']
+    })
+
+def store_to_balance_timeline(store):
+    """Convert a store back into the nested balanceTimeline dict format"""
+    balance_timeline = {}
+    offsets = store['offsets']
+
+    for i, strategy_id in enumerate(store['strategy_ids']):
+        start, end = offsets[i], offsets[i + 1]
+        balance_timeline[strategy_id] = {
+            'name': store['names'][i],
+            'archetype': store['archetypes'][i],
+            'dataPoints': [
+                {
+                    'tournament': int(t),
+                    'game': int(g),
+                    'balance': int(b),
+                    'profit': int(p),
+                    'isWinner': bool(w),
+                    'isEliminated': bool(e)
+                }
+                for t, g, b, p, w, e in zip(store['tournament'][start:end], store['game'][start:end],
+                                            store['balance'][start:end], store['profit'][start:end],
+                                            store['is_winner'][start:end], store['is_eliminated'][start:end])
+            ]
+        }
+
+    return balance_timeline
+
+def _tournament_deltas(tournament):
+    """Per-tournament reconstruction worker.
+
+    Emits one starting row per strategy (carrying its absolute balance) and one
+    delta row per economic impact. Rows are stitched into balances later.
+    """
+    tournament_num = tournament.get('tournamentNumber', 0)
+    ids, labels, games, values, profits, winners, is_start = [], [], [], [], [], [], []
+
+    for strategy in tournament.get('strategies', []):
+        ids.append(strategy['id'])
+        labels.append((strategy['name'], strategy.get('archetype', 'UNKNOWN')))
+        games.append(0)
+        values.append(strategy.get('coinBalance', STARTING_BALANCE))
+        profits.append(0)
+        winners.append(False)
+        is_start.append(True)
+
+    for game in tournament.get('games', []):
+        game_number = game.get('gameNumber', 0)
+        for impact in game.get('economicImpact', []):
+            profit = impact.get('profit', 0)
+            ids.append(impact.get('strategyId', ''))
+            labels.append(None)
+            games.append(game_number)
+            values.append(profit)
+            profits.append(profit)
+            winners.append(impact.get('isWinner', False))
+            is_start.append(False)
+
+    return tournament_num, ids, labels, games, values, profits, winners, is_start
+
+def _slim_tournament(tournament):
+    """Drop rounds/negotiations so only what reconstruction needs is sent to workers"""
+    return {
+        'tournamentNumber': tournament.get('tournamentNumber', 0),
+        'strategies': tournament.get('strategies', []),
+        'games': [{'gameNumber': game.get('gameNumber', 0), 'economicImpact': game.get('economicImpact', [])}
+                  for game in tournament.get('games', [])]
+    }
+
+def reconstruct_timeline_store(tournament_data, workers=None):
+    """Reconstruct a columnar timeline store from tournament games for legacy exports.
+
+    Tournaments are processed independently (in a process pool for long runs)
+    and stitched with a cumulative sum that restarts at each tournament's
+    starting balance, matching the sequential dataPoints reconstruction.
+    """
+    workers = worker_count(workers)
+
+    if workers > 1 and len(tournament_data) >= PARALLEL_MIN_TOURNAMENTS:
+        slim = [_slim_tournament(t) for t in tournament_data]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(_tournament_deltas, slim, chunksize=max(1, len(slim) // (workers * 4))))
+    else:
+        parts = [_tournament_deltas(t) for t in tournament_data]
+
+    # Factorize strategy IDs in first-seen order, the order the legacy dict was built in
+    codes_by_id = {}
+    labels = []
+    row_codes, row_tournaments, row_games, row_values, row_profits, row_winners, row_starts = [], [], [], [], [], [], []
+    for tournament_num, ids, part_labels, games, values, profits, winners, is_start in parts:
+        for strategy_id, label in zip(ids, part_labels):
+            if strategy_id not in codes_by_id and label is not None:
+                codes_by_id[strategy_id] = len(labels)
+                labels.append((strategy_id,) + label)
+        row_codes.append([codes_by_id.get(strategy_id, -1) for strategy_id in ids])
+        row_tournaments.append(np.full(len(ids), tournament_num, dtype=np.int32))
+        row_games.append(games)
+        row_values.append(values)
+        row_profits.append(profits)
+        row_winners.append(winners)
+        row_starts.append(is_start)
+
+    if not labels:
+        return build_timeline_store({})
+
+    codes = np.concatenate([np.asarray(c, dtype=np.int64) for c in row_codes])
+    tournaments = np.concatenate(row_tournaments)
+    games = np.concatenate([np.asarray(g, dtype=np.int32) for g in row_games])
+    values = np.concatenate([np.asarray(v, dtype=np.int64) for v in row_values])
+    profits = np.concatenate([np.asarray(p, dtype=np.int64) for p in row_profits])
+    winners = np.concatenate([np.asarray(w, dtype=bool) for w in row_winners])
+    starts = np.concatenate([np.asarray(s, dtype=bool) for s in row_starts])
+
+    # Impacts for strategies that had not started yet are ignored, as before
+    keep = codes >= 0
+    order = np.argsort(codes[keep], kind='stable')
+    codes, tournaments, games, values, profits, winners, starts = (
+        a[keep][order] for a in (codes, tournaments, games, values, profits, winners, starts))
+
+    # Cumulative sum that restarts at every starting-balance row
+    totals = np.cumsum(values)
+    start_positions = np.flatnonzero(starts)
+    segment_ids = np.cumsum(starts) - 1
+    before_segment = totals[start_positions] - values[start_positions]
+    balances = totals - before_segment[segment_ids]
+
+    counts = np.bincount(codes, minlength=len(labels))
+    offsets = np.zeros(len(labels) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    return {
+        'strategy_ids': [label[0] for label in labels],
+        'names': [label[1] for label in labels],
+        'archetypes': [label[2] for label in labels],
+        'offsets': offsets,
+        'strategy': codes.astype(np.int32),
+        'tournament': tournaments,
+        'game': games,
+        'balance': balances,
+        'profit': profits,
+        'is_winner': winners,
+        'is_eliminated': ~starts & (balances < ELIMINATION_THRESHOLD)
+    }
+
+def cache_path(source_path, stage, version, extension='.npz'):
+    """Cache file for a stage's output, keyed on the source file's identity"""
+    stat = os.stat(source_path)
+    key = f"{os.path.abspath(source_path)}|{stat.st_size}|{stat.st_mtime_ns}|{stage}|{version}"
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(source_path)), CACHE_DIR)
+    return os.path.join(cache_dir, f"{stage}_{digest}{extension}")
+
+def save_store(store, path):
+    """Write a store to a compressed .npz file"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp.npz'
+    np.savez_compressed(tmp_path,
+                        **{key: np.asarray(store[key], dtype=str) for key in STORE_LABELS},
+                        **{key: store[key] for key in STORE_COLUMNS + ['offsets']})
+    os.replace(tmp_path, path)
+
+def load_store(path):
+    """Read a store written by save_store"""
+    with np.load(path, allow_pickle=False) as npz:
+        store = {key: npz[key].tolist() for key in STORE_LABELS}
+        store.update({key: npz[key] for key in STORE_COLUMNS + ['offsets']})
+    return store
+
+def cached_store_stage(source_path, stage, builder, version=1):
+    """Run a store-producing pipeline stage once per source file and reuse its cached output"""
+    if source_path is None or not os.path.exists(source_path):
+        return builder()
+
+    cache_file = cache_path(source_path, stage, version)
+    if os.path.exists(cache_file):
+        try:
+            return load_store(cache_file)
+        except (OSError, ValueError, KeyError):
+            pass  # Corrupt cache entries are simply rebuilt
+
+    store = builder()
+    try:
+        save_store(store, cache_file)
+    except OSError as e:
+        print(f"⚠️ Could not cache {stage} output: {e}")
+    return store
+
+def load_reconstructed_store(tournament_data, source_path=None, workers=None):
+    """Reconstruction pipeline stage: rebuild a legacy timeline once and cache it next to the export"""
+    return cached_store_stage(source_path, 'reconstructed_timeline',
+                              lambda: reconstruct_timeline_store(tournament_data, workers),
+                              version=RECONSTRUCTION_VERSION)
+
+def games_per_tournament(data=None, games=None):
+    """gamesPerTournament from simulationParams, never less than the largest game number seen"""
+    planned = int((data or {}).get('simulationParams', {}).get('gamesPerTournament') or 0)
+    seen = int(np.max(games)) if games is not None and len(games) else 0
+    return max(planned, seen)
+
+def global_game_index(tournament, game, games_per_tournament, first_tournament=1):
+    """Monotonic run-wide game index.
+
+    Each tournament takes games_per_tournament + 1 slots (its game-0 starting
+    point plus every game), so indices never overlap however many games a
+    tournament has, and runs with the same parameters line up index for index.
+    """
+    return (np.asarray(tournament, dtype=np.int64) - first_tournament) * (games_per_tournament + 1) \
+        + np.asarray(game, dtype=np.int64)
+
+def final_balances(store):
+    """Last recorded balance for each strategy (NaN for strategies without datapoints)"""
+    offsets = store['offsets']
+    has_points = offsets[1:] > offsets[:-1]
+    result = np.full(len(store['strategy_ids']), np.nan)
+    result[has_points] = store['balance'][offsets[1:][has_points] - 1]
+    return result
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python3 timeline_store.py <evolution_data.json | balance_timeline.csv | tables_dir | timeline.abtm>")
+        sys.exit(1)
+
+    store = load_timeline_store(sys.argv[1])
+    print(f"✅ Loaded {len(store['balance'])} datapoints for {len(store['strategy_ids'])} strategies")
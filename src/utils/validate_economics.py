@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Economic Invariant Validator
+Checks that an evolution export is internally consistent before it gets charted:
+payout pools match entry fees, profits match payouts, timeline deltas match profits and
+the recorded timeline agrees with one reconstructed from the games.
+"""
+
+import json
+import sys
+import numpy as np
+import pandas as pd
+
+from memory_budget import budget_mb, chunk_ranges, chunk_rows, stream_export
+from timeline_store import (STORE_COLUMNS, build_timeline_store, reconstruct_timeline_store,
+                            store_to_dataframe)
+
+# Accounting checks real games can fail: payouts are Math.round(pool * pct / 100) each, and a
+# negotiation that runs out of rounds ends with no winner and nothing paid. These are reported
+# as warnings; every other check means the export itself is corrupt and blocks plotting.
+WARNING_CHECKS = frozenset({'payout_matches_pool', 'single_winner'})
+
+# Rough working-set bytes per timeline row or impact while a chunk is checked (DataFrames plus merges)
+CHECK_ROW_BYTES = 512
+
+def flatten_economic_impacts(tournament_data, start_tournament=0, stop_tournament=None):
+    """Flatten every economicImpact record into columns tagged with tournament/game indices"""
+    columns = {key: [] for key in ('tournament_index', 'game_index', 'tournament', 'game',
+                                   'strategy_id', 'entry_fee', 'payout', 'profit', 'is_winner')}
+    game_players = []
+    game_keys = []
+
+    for t_index, tournament in enumerate(tournament_data[start_tournament:stop_tournament], start=start_tournament):
+        tournament_num = tournament.get('tournamentNumber', t_index + 1)
+        for g_index, game in enumerate(tournament.get('games', [])):
+            game_number = game.get('gameNumber', g_index + 1)
+            game_keys.append((t_index, g_index, tournament_num, game_number))
+            game_players.append(len(game.get('players', [])))
+
+            for impact in game.get('economicImpact', []):
+                columns['tournament_index'].append(t_index)
+                columns['game_index'].append(g_index)
+                columns['tournament'].append(tournament_num)
+                columns['game'].append(game_number)
+                columns['strategy_id'].append(impact.get('strategyId', ''))
+                columns['entry_fee'].append(impact.get('entryFee', 0))
+                columns['payout'].append(impact.get('payout', 0))
+                columns['profit'].append(impact.get('profit', 0))
+                columns['is_winner'].append(bool(impact.get('isWinner')))
+
+    impacts = pd.DataFrame(columns)
+    games = pd.DataFrame(game_keys, columns=['tournament_index', 'game_index', 'tournament', 'game'])
+    games['players'] = game_players
+    return impacts, games
+
+def _plain(value):
+    """Convert NumPy scalars to plain Python values for JSON-friendly reports"""
+    return value.item() if hasattr(value, 'item') else value
+
+def _violations(frame, check, expected, actual, strategy_column=None):
+    """Turn the rows of a failing check into violation records"""
+    records = []
+    for row in frame.to_dict('records'):
+        record = {
+            'check': check,
+            'tournamentIndex': int(row['tournament_index']),
+            'gameIndex': int(row['game_index']),
+            'tournament': int(row['tournament']),
+            'game': int(row['game']),
+            'expected': _plain(row[expected]),
+            'actual': _plain(row[actual])
+        }
+        if strategy_column:
+            record['strategyId'] = row[strategy_column]
+        records.append(record)
+    return records
+
+def check_game_economics(impacts, games, games_per_tournament=None):
+    """Pool, profit, participation and winner invariants for every game"""
+    violations = []
+    if impacts.empty:
+        return violations
+
+    # Each impact: profit must equal payout - entryFee
+    impacts = impacts.assign(expected_profit=impacts['payout'] - impacts['entry_fee'])
+    bad_profit = impacts[impacts['profit'] != impacts['expected_profit']]
+    violations += _violations(bad_profit, 'profit_matches_payout', 'expected_profit', 'profit', 'strategy_id')
+
+    # Each game: payouts must distribute the entry-fee pool (each payout rounds by at most 1), with a single winner
+    per_game = impacts.groupby(['tournament_index', 'game_index', 'tournament', 'game'], sort=True).agg(
+        pool=('entry_fee', 'sum'), paid=('payout', 'sum'),
+        impacts=('strategy_id', 'size'), winners=('is_winner', 'sum')).reset_index()
+    off_pool = (per_game['pool'] - per_game['paid']).abs() > per_game['impacts']
+    violations += _violations(per_game[off_pool], 'payout_matches_pool', 'pool', 'paid')
+
+    per_game = per_game.assign(expected_winners=1)
+    violations += _violations(per_game[per_game['winners'] != 1], 'single_winner', 'expected_winners', 'winners')
+
+    # Every seated player must have an economic impact record
+    merged = games.merge(per_game[['tournament_index', 'game_index', 'impacts']],
+                         on=['tournament_index', 'game_index'], how='left').fillna({'impacts': 0})
+    merged = merged[merged['players'] > 0]
+    violations += _violations(merged[merged['players'] != merged['impacts']], 'impact_per_player', 'players', 'impacts')
+
+    if games_per_tournament:
+        counts = games.groupby(['tournament_index', 'tournament']).size().reset_index(name='games_played')
+        counts = counts.assign(game_index=-1, game=0, expected_games=games_per_tournament)
+        violations += _violations(counts[counts['games_played'] != games_per_tournament],
+                                  'games_per_tournament', 'expected_games', 'games_played')
+
+    return violations
+
+def check_timeline_deltas(timeline_df, tournament_lookup):
+    """Consecutive balanceTimeline datapoints must differ by the recorded profit"""
+    if timeline_df.empty:
+        return []
+
+    same_strategy = timeline_df['StrategyID'].eq(timeline_df['StrategyID'].shift())
+    same_tournament = timeline_df['Tournament'].eq(timeline_df['Tournament'].shift())
+    delta = timeline_df['Balance'].diff().fillna(0).astype(np.int64)
+    comparable = same_strategy & same_tournament & (timeline_df['Game'] > 0)
+    bad = timeline_df.assign(delta=delta)[comparable & (delta != timeline_df['Profit'])]
+
+    return _violations(_with_indices(bad, tournament_lookup), 'timeline_delta_matches_profit',
+                       'Profit', 'delta', 'StrategyID')
+
+def check_reconstruction(timeline_df, tournament_data, tournament_lookup):
+    """Balances reconstructed from the games must agree with the recorded timeline"""
+    if timeline_df.empty or not tournament_data:
+        return []
+
+    reconstructed = store_to_dataframe(reconstruct_timeline_store(tournament_data))
+    if reconstructed.empty:
+        return []
+
+    keys = ['StrategyID', 'Tournament', 'Game']
+    merged = timeline_df[keys + ['Balance']].merge(
+        reconstructed[keys + ['Balance']].drop_duplicates(keys, keep='last'),
+        on=keys, how='inner', suffixes=('', 'Reconstructed'))
+    bad = merged[merged['Balance'] != merged['BalanceReconstructed']]
+
+    return _violations(_with_indices(bad, tournament_lookup), 'reconstruction_matches_timeline',
+                       'BalanceReconstructed', 'Balance', 'StrategyID')
+
+def _with_indices(frame, tournament_lookup):
+    """Attach tournament/game index columns to rows keyed by tournament and game numbers"""
+    frame = frame.rename(columns={'Tournament': 'tournament', 'Game': 'game'})
+    return frame.assign(
+        tournament_index=frame['tournament'].map(tournament_lookup).fillna(-1).astype(int),
+        game_index=frame['game'] - 1)
+
+def _tournament_rows(store, first, stop):
+    """Timeline rows with first <= tournament number < stop, as a DataFrame"""
+    mask = (store['tournament'] >= first) & (store['tournament'] < stop)
+    return store_to_dataframe({**store, **{column: store[column][mask] for column in STORE_COLUMNS}})
+
+def validate_export(data, start_tournament=0, store=None):
+    """Run every invariant check on a loaded export.
+
+    start_tournament lets incremental progress snapshots skip tournaments that
+    were already validated in an earlier snapshot. Every check is local to a
+    tournament, so under a memory budget they run over chunks of tournaments.
+    Returns a list of violation dicts.
+    """
+    tournament_data = data.get('tournamentData', data.get('tournaments', []))
+    games_per_tournament = data.get('simulationParams', {}).get('gamesPerTournament')
+    tournament_lookup = {t.get('tournamentNumber', i + 1): i for i, t in enumerate(tournament_data)}
+    if store is None:
+        store = build_timeline_store(data.get('balanceTimeline', {}))
+
+    def number(index):
+        return tournament_data[index].get('tournamentNumber', index + 1)
+
+    remaining = len(tournament_data) - start_tournament
+    impact_rows = sum(len(game.get('economicImpact', [])) for t in tournament_data for game in t.get('games', []))
+    rows_per_tournament = (len(store['tournament']) + impact_rows) / max(len(tournament_data), 1)
+    size = chunk_rows(rows_per_tournament * CHECK_ROW_BYTES, remaining)
+    ranges = chunk_ranges(remaining, size) or [(0, 0)]
+
+    violations = []
+    for i, (start, stop) in enumerate(ranges):
+        start, stop = start + start_tournament, stop + start_tournament
+        impacts, games = flatten_economic_impacts(tournament_data, start, stop)
+        violations += check_game_economics(impacts, games, games_per_tournament)
+        del impacts, games
+
+        # Timeline rows are matched by tournament number; the outer chunks are open-ended
+        if i == 0 and not start_tournament:
+            first = -np.inf
+        else:
+            first = number(start) if start < len(tournament_data) else np.inf
+        last = number(stop) if i + 1 < len(ranges) else np.inf
+        timeline_df = _tournament_rows(store, first, last)
+        violations += check_timeline_deltas(timeline_df, tournament_lookup)
+        violations += check_reconstruction(timeline_df, tournament_data[start:stop], tournament_lookup)
+
+    return violations
+
+def blocking_violations(violations):
+    """Violations that mean the export is corrupt (everything but the WARNING_CHECKS)"""
+    return [v for v in violations if v['check'] not in WARNING_CHECKS]
+
+def report_violations(violations, max_shown=20):
+    """Print a short summary of violations grouped by check"""
+    if not violations:
+        print("✅ Economic invariants hold")
+        return
+
+    counts = pd.Series([v['check'] for v in violations]).value_counts()
+    errors = len(blocking_violations(violations))
+    if errors:
+        print(f"❌ {errors} economic invariant violations, {len(violations) - errors} warnings:")
+    else:
+        print(f"⚠️ {len(violations)} economic warnings (rounding or unresolved games), no corruption found:")
+    for check, count in counts.items():
+        print(f"   • {check}: {count}{' (warning)' if check in WARNING_CHECKS else ''}")
+
+    for v in violations[:max_shown]:
+        strategy = f" {v['strategyId']}" if 'strategyId' in v else ''
+        print(f"   T{v['tournament']} G{v['game']} (tournament #{v['tournamentIndex']}, game #{v['gameIndex']})"
+              f"{strategy}: {v['check']} expected {v['expected']}, got {v['actual']}")
+    if len(violations) > max_shown:
+        print(f"   ... and {len(violations) - max_shown} more")
+
+def validate_file(json_file, start_tournament=0):
+    """Load and validate an export file; returns the violation list (warnings included)"""
+    print(f"🔍 Validating economics in {json_file}...")
+
+    if budget_mb() is not None:
+        data = stream_export(json_file)
+    else:
+        with open(json_file, 'r') as f:
+            data = json.load(f)
+
+    violations = validate_export(data, start_tournament)
+    report_violations(violations)
+    return violations
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python3 validate_economics.py <evolution_data.json> [more_files.json ...]")
+        sys.exit(1)
+
+    failed = False
+    for json_file in sys.argv[1:]:
+        if blocking_violations(validate_file(json_file)):
+            failed = True
+
+    sys.exit(1 if failed else 0)
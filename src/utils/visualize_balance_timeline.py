@@ -10,6 +10,12 @@ import sys
 import glob
 import os
 
+from profiling import profiled, stage
+from render_quality import apply_quality_flag, decimate, legend, legend_layout, save_figure
+from simulation_tables import is_tables_dir
+from timeline_store import games_per_tournament, load_timeline_store, store_to_dataframe
+
+@profiled()
 def visualize_balance_timeline(csv_file=None):
     # If no file specified, find the most recent balance timeline CSV
     if csv_file is None:
@@ -20,16 +26,22 @@ def visualize_balance_timeline(csv_file=None):
         csv_file = max(csv_files, key=os.path.getctime)
         print(f"Using most recent file: {csv_file}")
     
-    # Read the CSV data
+    # Read the CSV data (or a Parquet tables directory / memory-mapped .abtm timeline)
+    stage('load')
     try:
-        df = pd.read_csv(csv_file)
+        if is_tables_dir(csv_file) or csv_file.endswith('.abtm'):
+            df = store_to_dataframe(load_timeline_store(csv_file))
+        else:
+            df = pd.read_csv(csv_file)
     except FileNotFoundError:
         print(f"File not found: {csv_file}")
         return
     
-    # Create a combined game number (Tournament.Game format)
-    df['GameNumber'] = df['Tournament'] + (df['Game'] / 10)
+    stage('build_dataframe')
+    # Create a combined game number (Tournament.Game format, one slot per game)
+    df['GameNumber'] = df['Tournament'] + df['Game'] / (games_per_tournament(games=df['Game']) + 1)
     
+    stage('plot')
     # Create the plot
     plt.figure(figsize=(14, 8))
     
@@ -39,7 +51,7 @@ def visualize_balance_timeline(csv_file=None):
     
     for i, strategy in enumerate(strategies):
         strategy_data = df[df['Strategy'] == strategy].sort_values('GameNumber')
-        plt.plot(strategy_data['GameNumber'], strategy_data['Balance'], 
+        plt.plot(*decimate(strategy_data['GameNumber'], strategy_data['Balance']), 
                 marker='o', linewidth=2, label=strategy, color=colors[i])
     
     # Customize the plot
@@ -47,24 +59,27 @@ def visualize_balance_timeline(csv_file=None):
     plt.xlabel('Game (Tournament.Game)', fontsize=12)
     plt.ylabel('Coin Balance', fontsize=12)
     plt.grid(True, alpha=0.3)
-    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+    legend(bbox_to_anchor=(1.05, 1), loc='upper left')
     
     # Add horizontal lines for key thresholds
     plt.axhline(y=500, color='gray', linestyle='--', alpha=0.5, label='Starting Balance')
     plt.axhline(y=100, color='red', linestyle='--', alpha=0.5, label='Elimination Threshold')
     
     # Adjust layout to prevent legend cutoff
-    plt.tight_layout()
+    stage('layout')
+    legend_layout()
     
     # Save the plot
-    output_file = csv_file.replace('.csv', '_chart.png')
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    output_file = os.path.splitext(csv_file.rstrip(os.sep))[0] + '_chart.png'
+    stage('savefig')
+    save_figure(output_file)
     print(f"Chart saved as: {output_file}")
     
     # Show basic statistics
     print("\n📊 Balance Timeline Statistics:")
     print("=" * 40)
     
+    stage('stats')
     final_balances = df[df['Game'] > 0].groupby('Strategy')['Balance'].last().sort_values(ascending=False)
     starting_balances = df[df['Game'] == 0].groupby('Strategy')['Balance'].first()
     
@@ -93,6 +108,7 @@ def visualize_balance_timeline(csv_file=None):
     return output_file
 
 if __name__ == "__main__":
+    apply_quality_flag()
     if len(sys.argv) > 1:
         csv_file = sys.argv[1]
     else:
@@ -4,24 +4,36 @@ Evolution Tree Visualizer for Agent Battle Strategy Evolution
 Shows both balance evolution over time and strategy family trees with parent-child relationships
 """
 
-import json
 import sys
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
-import pandas as pd
 import networkx as nx
 from datetime import datetime
 import numpy as np
-import textwrap
+
+from memory_budget import (DEFAULT_DROP, apply_memory_flag, budget_mb, load_export, release, report_memory,
+                           spill_table)
+from profiling import profiled, span
+from render_quality import apply_quality_flag, decimate, legend, legend_layout, save_figure
+from strategy_details import create_details_figure, details_rows, write_strategy_details
+from survival_analysis import build_event_table, create_survival_chart
+from timeline_codec import decode_balance_timeline
+from validate_economics import blocking_violations, report_violations, validate_export
+from timeline_store import (build_timeline_store, games_per_tournament, global_game_index,
+                            load_reconstructed_store, store_to_balance_timeline, store_to_dataframe)
+
+# Export sections none of the stages below read; skipped while parsing under a memory budget
+UNUSED_SECTIONS = DEFAULT_DROP | {'finalResult', 'agent', 'strategiesEliminated', 'strategyMatchups', 'errorMetrics'}
 
 def load_evolution_data(json_file):
     """Load and parse evolution data from JSON file"""
     print(f"📊 Loading evolution data from {json_file}...")
     
-    with open(json_file, 'r') as f:
-        data = json.load(f)
+    # Strategy texts and negotiation messages repeat across tournaments; keep one copy of each.
+    # Under a memory budget the sections no chart reads are never built
+    data = load_export(json_file, UNUSED_SECTIONS)
     
-    balance_timeline = data.get('balanceTimeline', {})
+    balance_timeline = decode_balance_timeline(data.get('balanceTimeline', {}))
     
     # Handle both old and new data formats
     tournament_data = data.get('tournamentData', data.get('tournaments', []))
@@ -32,94 +44,30 @@ def load_evolution_data(json_file):
     # If no balance timeline, try to extract from tournament data
     if not balance_timeline and tournament_data:
         print("🔄 No balance timeline found, attempting to reconstruct from tournament data...")
-        balance_timeline = reconstruct_balance_timeline(tournament_data)
+        balance_timeline = reconstruct_balance_timeline(tournament_data, source_path=json_file)
         print(f"📈 Reconstructed balance data for {len(balance_timeline)} strategies")
     
     return data, balance_timeline, tournament_data, tournaments_completed
 
-def reconstruct_balance_timeline(tournament_data):
+def reconstruct_balance_timeline(tournament_data, source_path=None):
     """Reconstruct balance timeline from tournament data for older formats"""
-    balance_timeline = {}
-    
-    for tournament in tournament_data:
-        tournament_num = tournament.get('tournamentNumber', 0)
-        
-        # Get starting strategies
-        starting_strategies = tournament.get('strategies', [])
-        for strategy in starting_strategies:
-            strategy_id = strategy['id']
-            strategy_name = strategy['name']
-            
-            if strategy_id not in balance_timeline:
-                balance_timeline[strategy_id] = {
-                    'name': strategy_name,
-                    'archetype': strategy.get('archetype', 'UNKNOWN'),
-                    'dataPoints': []
-                }
-            
-            # Add starting balance for this tournament
-            balance_timeline[strategy_id]['dataPoints'].append({
-                'tournament': tournament_num,
-                'game': 0,
-                'balance': strategy.get('coinBalance', 500),
-                'profit': 0,
-                'isWinner': False,
-                'isEliminated': False
-            })
-        
-        # Process games if available
-        games = tournament.get('games', [])
-        for game in games:
-            game_number = game.get('gameNumber', 0)
-            economic_impacts = game.get('economicImpact', [])
-            
-            for impact in economic_impacts:
-                strategy_id = impact.get('strategyId', '')
-                if strategy_id in balance_timeline:
-                    # Calculate new balance (approximate)
-                    last_balance = balance_timeline[strategy_id]['dataPoints'][-1]['balance']
-                    new_balance = last_balance + impact.get('profit', 0)
-                    
-                    balance_timeline[strategy_id]['dataPoints'].append({
-                        'tournament': tournament_num,
-                        'game': game_number,
-                        'balance': new_balance,
-                        'profit': impact.get('profit', 0),
-                        'isWinner': impact.get('isWinner', False),
-                        'isEliminated': new_balance < 100
-                    })
-    
-    return balance_timeline
+    store = load_reconstructed_store(tournament_data, source_path=source_path)
+    return store_to_balance_timeline(store)
 
-def create_balance_evolution_chart(balance_timeline, tournaments_completed, timestamp):
+def create_balance_evolution_chart(balance_timeline, tournaments_completed, timestamp, games_per_tournament=None,
+                                   store=None):
     """Create balance evolution chart similar to existing visualizer"""
     
-    # Convert to DataFrame for easier plotting
-    plot_data = []
-    
-    for strategy_id, timeline in balance_timeline.items():
-        strategy_name = timeline.get('name', strategy_id)
-        display_name = f"{strategy_name}" # Simplified name for cleaner chart
-        datapoints = timeline.get('dataPoints', [])
-        
-        for point in datapoints:
-            plot_data.append({
-                'Strategy': display_name,
-                'StrategyID': strategy_id,
-                'Tournament': point.get('tournament', 0),
-                'Game': point.get('game', 0),
-                'Balance': point.get('balance', 0),
-                'Profit': point.get('profit', 0),
-                'IsWinner': point.get('isWinner', False),
-                'IsEliminated': point.get('isEliminated', False)
-            })
-    
-    df = pd.DataFrame(plot_data)
+    # Columnar DataFrame straight from the timeline store (pass store to skip rebuilding it)
+    if store is None:
+        store = build_timeline_store(balance_timeline)
+    df = store_to_dataframe(store)
     if df.empty:
         return None
     
     # Create unique game numbers for x-axis
-    df['GameNumber'] = df['Tournament'] * 10 + df['Game']
+    slots = max(games_per_tournament or 0, int(df['Game'].max()))
+    df['GameNumber'] = global_game_index(df['Tournament'], df['Game'], slots)
     
     plt.figure(figsize=(20, 12))
     
@@ -133,7 +81,7 @@ def create_balance_evolution_chart(balance_timeline, tournaments_completed, time
         strategy_data = df[df['Strategy'] == strategy].sort_values('GameNumber')
         
         if len(strategy_data) > 0:
-            plt.plot(strategy_data['GameNumber'], strategy_data['Balance'], 
+            plt.plot(*decimate(strategy_data['GameNumber'], strategy_data['Balance']), 
                     label=strategy, linewidth=3, marker='o', markersize=5,
                     color=color_map[strategy])
             
@@ -152,8 +100,9 @@ def create_balance_evolution_chart(balance_timeline, tournaments_completed, time
     
     # Add tournament boundaries
     for t in range(1, tournaments_completed + 1):
-        plt.axvline(x=t*10, color='gray', linestyle='--', alpha=0.5)
-        plt.text(t*10 + 2, plt.ylim()[1] * 0.95, f'T{t}', 
+        boundary = global_game_index(t, 0, slots)
+        plt.axvline(x=boundary, color='gray', linestyle='--', alpha=0.5)
+        plt.text(boundary + 0.2, plt.ylim()[1] * 0.95, f'T{t}', 
                 rotation=90, alpha=0.7, fontsize=10)
     
     # Add profit/loss line
@@ -161,22 +110,14 @@ def create_balance_evolution_chart(balance_timeline, tournaments_completed, time
     plt.text(plt.xlim()[1] * 0.02, 520, 'Starting Balance (500)', 
              alpha=0.7, fontsize=10)
     
-    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=11)
+    legend(bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=11)
     plt.grid(True, alpha=0.3)
-    plt.tight_layout()
+    legend_layout()
     
     return df, color_map
 
-def create_evolution_tree(tournament_data, color_map):
-    """Create strategy evolution family tree"""
-    
-    plt.figure(figsize=(24, 16))
-    
-    # Build evolution graph
-    G = nx.DiGraph()
-    strategy_info = {}
-    
-    # Track all strategies across tournaments
+def collect_all_strategies(tournament_data):
+    """Every strategy seen in the run (core, created and evolved), keyed by id"""
     all_strategies = {}
     
     # First pass: collect all strategy info
@@ -224,6 +165,20 @@ def create_evolution_tree(tournament_data, color_map):
                     'is_core': False
                 }
     
+    return all_strategies
+
+def create_evolution_tree(tournament_data, color_map):
+    """Create strategy evolution family tree"""
+    
+    plt.figure(figsize=(24, 16))
+    
+    # Build evolution graph
+    G = nx.DiGraph()
+    strategy_info = {}
+    
+    # Track all strategies across tournaments
+    all_strategies = collect_all_strategies(tournament_data)
+    
     # If we have very few strategies (all core), create a simple display
     if len(all_strategies) <= 6 and all(s.get('is_core', True) for s in all_strategies.values()):
         print("📊 Detected core-strategies-only simulation, creating simplified tree...")
@@ -383,145 +338,89 @@ def create_simple_strategy_display(all_strategies, color_map):
     return None, all_strategies
 
 def create_strategy_details_table(all_strategies, tournament_data):
-    """Create detailed table of all strategies and their evolution"""
-    
-    fig, ax = plt.subplots(figsize=(20, 14))
-    ax.axis('tight')
-    ax.axis('off')
-    
-    # Prepare table data
-    table_data = []
-    
-    for strategy_id, info in all_strategies.items():
-        name = info['name']
-        archetype = info['archetype']
-        generation = info['first_seen']
-        is_core = info.get('is_core', False)
-        strategy_text = textwrap.fill(info.get('strategy_text', ''), width=50)
-        
-        # Get parent info
-        parents_text = ''
-        if 'parents' in info and info['parents']:
-            parent_strs = [f"{p['name']} ({p.get('weight', '?')}%)" for p in info['parents']]
-            parents_text = ', '.join(parent_strs)
-        
-        avoiding_text = info.get('avoiding', '')
-        
-        # Get final performance from tournament data
-        final_balance = 'Unknown'
-        win_rate = 'Unknown'
-        
-        # Find this strategy's final performance
-        for tournament in reversed(tournament_data):
-            evolution_details = tournament.get('evolutionDetails', {})
-            
-            # Check survivors
-            for survivor in evolution_details.get('survivors', []):
-                if survivor['id'] == strategy_id:
-                    final_balance = survivor['balance']
-                    win_rate = f"{survivor['winRate']}%"
-                    break
-            
-            # Check eliminated
-            for eliminated in evolution_details.get('eliminated', []):
-                if eliminated['id'] == strategy_id:
-                    final_balance = f"{eliminated['finalBalance']} (eliminated)"
-                    win_rate = f"{eliminated['winRate']}%"
-                    break
-        
-        table_data.append([
-            name,
-            'Core' if is_core else f'Gen {generation}',
-            archetype,
-            strategy_text,
-            parents_text,
-            avoiding_text,
-            str(final_balance),
-            str(win_rate)
-        ])
-    
-    # Sort by generation then by name
-    table_data.sort(key=lambda x: (0 if x[1] == 'Core' else int(x[1].split()[1]), x[0]))
-    
-    # Create table
-    columns = ['Strategy Name', 'Generation', 'Archetype', 'Strategy Description', 
-               'Based On (Weight)', 'Avoiding', 'Final Balance', 'Win Rate']
-    
-    table = ax.table(cellText=table_data,
-                     colLabels=columns,
-                     cellLoc='left',
-                     loc='center',
-                     bbox=[0, 0, 1, 1])
-    
-    # Style the table
-    table.auto_set_font_size(False)
-    table.set_fontsize(9)
-    table.scale(1, 2)
-    
-    # Color code rows
-    for i, row in enumerate(table_data):
-        generation = row[1]
-        if generation == 'Core':
-            color = 'lightblue'
-        else:
-            color = 'lightgreen'
-        
-        for j in range(len(columns)):
-            table[(i+1, j)].set_facecolor(color)
-            table[(i+1, j)].set_alpha(0.3)
-    
-    # Style headers
-    for j in range(len(columns)):
-        table[(0, j)].set_facecolor('gray')
-        table[(0, j)].set_alpha(0.5)
-        table[(0, j)].set_text_props(weight='bold')
-    
-    plt.title('📋 Complete Strategy Evolution Details\n'
-              'Blue = Core Strategies, Green = Evolved Strategies', 
-              fontsize=16, fontweight='bold', pad=20)
-    
-    return fig
+    """Create detailed table of all strategies and their evolution (single page)"""
+    return create_details_figure(details_rows(all_strategies, tournament_data))
 
-def visualize_evolution_comprehensive(json_file):
+@profiled()
+def visualize_evolution_comprehensive(json_file, details_formats=None, validate=True):
     """Create comprehensive evolution visualization"""
     
-    data, balance_timeline, tournament_data, tournaments_completed = load_evolution_data(json_file)
+    with span('load'):
+        data, balance_timeline, tournament_data, tournaments_completed = load_evolution_data(json_file)
+        store = spill_table('timeline', build_timeline_store(balance_timeline))
     timestamp = data.get('timestamp', 'Unknown')
     
     if not balance_timeline or not tournament_data:
         print("❌ Insufficient data for visualization")
         return None
     
+    if budget_mb() is not None:
+        # The columnar store stands in for both timeline forms from here on
+        release(data, 'balanceTimeline')
+        balance_timeline = None
+    
+    # Never chart corrupted or partial runs as results (rounding and unresolved games only warn)
+    if validate:
+        with span('validate'):
+            violations = validate_export(data, store=store)
+        report_violations(violations)
+        if blocking_violations(violations):
+            print("❌ Export failed economic validation, not plotting (--no-validate to plot anyway)")
+            return None
+    
     results = []
     
     # 1. Balance Evolution Chart
     print("📈 Creating balance evolution chart...")
-    df, color_map = create_balance_evolution_chart(balance_timeline, tournaments_completed, timestamp)
+    with span('balance_chart'):
+        df, color_map = create_balance_evolution_chart(balance_timeline, tournaments_completed, timestamp,
+                                                       games_per_tournament(data), store=store)
     
     if df is not None:
         timestamp_str = datetime.now().strftime('%Y%m%d_%H%M%S')
         balance_file = f'balance_evolution_with_tree_{timestamp_str}.png'
-        plt.savefig(balance_file, dpi=300, bbox_inches='tight')
+        with span('balance_chart_savefig'):
+            save_figure(balance_file)
+        plt.close()
         results.append(balance_file)
         print(f"✅ Balance chart saved: {balance_file}")
+        
+        # Survival curves sit alongside the balance chart
+        print("⏳ Creating survival curves...")
+        with span('survival_chart'):
+            event_table = build_event_table(data, store=store)
+            create_survival_chart(event_table)
+        survival_file = f'strategy_survival_{timestamp_str}.png'
+        with span('survival_chart_savefig'):
+            save_figure(survival_file)
+        plt.close()
+        results.append(survival_file)
+        print(f"✅ Survival chart saved: {survival_file}")
+    
+    if budget_mb() is not None:
+        # The tree and details table only read strategies and evolutionDetails
+        for tournament in tournament_data:
+            release(tournament, 'games')
     
     # 2. Evolution Family Tree
     print("🧬 Creating evolution family tree...")
-    G, all_strategies = create_evolution_tree(tournament_data, color_map)
+    with span('evolution_tree'):
+        G, all_strategies = create_evolution_tree(tournament_data, color_map)
     
     tree_file = f'strategy_evolution_tree_{timestamp_str}.png'
-    plt.savefig(tree_file, dpi=300, bbox_inches='tight')
+    with span('evolution_tree_savefig'):
+        save_figure(tree_file)
+    plt.close()
     results.append(tree_file)
     print(f"✅ Evolution tree saved: {tree_file}")
     
-    # 3. Strategy Details Table
+    # 3. Strategy Details Table (paged PNGs rendered in parallel, and/or PDF, HTML, CSV)
     print("📋 Creating strategy details table...")
-    fig = create_strategy_details_table(all_strategies, tournament_data)
-    
-    details_file = f'strategy_details_table_{timestamp_str}.png'
-    plt.savefig(details_file, dpi=300, bbox_inches='tight')
-    results.append(details_file)
-    print(f"✅ Strategy details saved: {details_file}")
+    with span('details_table'):
+        details_files = write_strategy_details(all_strategies, tournament_data,
+                                               f'strategy_details_table_{timestamp_str}', details_formats)
+    results.extend(details_files)
+    print(f"✅ Strategy details saved: {', '.join(details_files)}")
     
     # Print summary
     print(f"\n🏆 EVOLUTION SUMMARY:")
@@ -561,13 +460,23 @@ def visualize_evolution_comprehensive(json_file):
     return results
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python3 visualize_evolution_tree.py <evolution_data.json>")
+    apply_quality_flag()
+    apply_memory_flag()
+    args = sys.argv[1:]
+    details = None
+    validate = '--no-validate' not in args
+    args = [a for a in args if a != '--no-validate']
+    if '--details' in args:
+        i = args.index('--details')
+        details = args[i + 1] if i + 1 < len(args) else ''
+        del args[i:i + 2]
+    if len(args) != 1 or details == '':
+        print("Usage: python3 visualize_evolution_tree.py <evolution_data.json> [--details png,pdf,html,csv] [--memory-budget MB] [--no-validate]")
         print("Example: python3 visualize_evolution_tree.py enhanced_evolution_2025-01-01T12-00-00-000Z.json")
         sys.exit(1)
     
-    json_file = sys.argv[1]
-    results = visualize_evolution_comprehensive(json_file)
+    json_file = args[0]
+    results = visualize_evolution_comprehensive(json_file, details, validate)
     
     if results:
         print(f"\n🎉 Evolution visualization complete!")
@@ -575,6 +484,8 @@ if __name__ == "__main__":
         for file in results:
             print(f"   • {file}")
         print(f"\nOpen these files to see the complete evolution story! 🚀")
+        report_memory()
     else:
         print("❌ Visualization failed.")
+        report_memory()
         sys.exit(1) 
\ No newline at end of file
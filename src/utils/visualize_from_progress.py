@@ -4,34 +4,51 @@ Balance Timeline Visualizer for Progress JSON Files
 Generates charts showing coin evolution over tournaments and games
 """
 
-import json
 import sys
 import matplotlib.pyplot as plt
 import pandas as pd
 from datetime import datetime
 import numpy as np
 
-def visualize_progress_data(json_file):
+from memory_budget import apply_memory_flag, load_export, report_memory
+from profiling import profiled, span, stage
+from render_quality import apply_quality_flag, decimate, legend, legend_layout, save_figure
+from timeline_codec import decode_balance_timeline
+from timeline_store import games_per_tournament, global_game_index
+from validate_economics import blocking_violations, report_violations, validate_export
+
+@profiled()
+def visualize_progress_data(json_file, validate=True):
     """Generate balance timeline visualization from progress JSON"""
     
     print(f"📊 Loading progress data from {json_file}...")
     
     # Load the JSON data
-    with open(json_file, 'r') as f:
-        data = json.load(f)
+    with span('load'):
+        data = load_export(json_file)
     
     # Extract balance timeline data
-    balance_timeline = data.get('balanceTimeline', {})
+    balance_timeline = decode_balance_timeline(data.get('balanceTimeline', {}))
     tournaments_completed = data.get('completedTournaments', 0)
     
     if not balance_timeline:
         print("❌ No balance timeline data found in progress file")
         return None
     
+    # Never chart corrupted or partial runs as results (rounding and unresolved games only warn)
+    if validate:
+        with span('validate'):
+            violations = validate_export(data)
+        report_violations(violations)
+        if blocking_violations(violations):
+            print("❌ Progress file failed economic validation, not plotting (--no-validate to plot anyway)")
+            return None
+    
     print(f"✅ Found balance data for {len(balance_timeline)} strategies")
     print(f"🏆 Completed tournaments: {tournaments_completed}")
     
     # Convert to DataFrame for easier plotting
+    stage('build_dataframe')
     plot_data = []
     
     for strategy_id, timeline in balance_timeline.items():
@@ -58,12 +75,14 @@ def visualize_progress_data(json_file):
         print("❌ No timeline data to visualize")
         return None
     
-    # Create unique game numbers for x-axis (tournament * 10 + game)
-    df['GameNumber'] = df['Tournament'] * 10 + df['Game']
+    # Create unique game numbers for x-axis (global index that never overlaps across tournaments)
+    slots = games_per_tournament(data, df['Game'])
+    df['GameNumber'] = global_game_index(df['Tournament'], df['Game'], slots)
     
     print(f"📈 Plotting {len(df)} data points across {tournaments_completed} tournaments")
     
     # Create the visualization
+    stage('plot')
     plt.figure(figsize=(16, 10))
     
     # Color mapping for strategies
@@ -76,7 +95,7 @@ def visualize_progress_data(json_file):
         strategy_data = df[df['Strategy'] == strategy].sort_values('GameNumber')
         
         if len(strategy_data) > 0:
-            plt.plot(strategy_data['GameNumber'], strategy_data['Balance'], 
+            plt.plot(*decimate(strategy_data['GameNumber'], strategy_data['Balance']), 
                     label=strategy, linewidth=2.5, marker='o', markersize=4,
                     color=color_map[strategy])
             
@@ -95,8 +114,9 @@ def visualize_progress_data(json_file):
     
     # Add tournament boundaries
     for t in range(1, tournaments_completed + 1):
-        plt.axvline(x=t*10, color='gray', linestyle='--', alpha=0.5)
-        plt.text(t*10 + 3, plt.ylim()[1] * 0.95, f'T{t}', 
+        boundary = global_game_index(t, 0, slots)
+        plt.axvline(x=boundary, color='gray', linestyle='--', alpha=0.5)
+        plt.text(boundary + 0.2, plt.ylim()[1] * 0.95, f'T{t}', 
                 rotation=90, alpha=0.7, fontsize=9)
     
     # Add profit/loss line at starting balance
@@ -104,14 +124,16 @@ def visualize_progress_data(json_file):
     plt.text(plt.xlim()[1] * 0.02, 520, 'Starting Balance (500)', 
              alpha=0.7, fontsize=9)
     
-    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=10)
+    legend(bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=10)
     plt.grid(True, alpha=0.3)
-    plt.tight_layout()
+    stage('layout')
+    legend_layout()
     
     # Save the chart
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     output_file = f'balance_evolution_{timestamp}.png'
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    stage('savefig')
+    save_figure(output_file)
     
     print(f"✅ Balance evolution chart saved: {output_file}")
     
@@ -121,6 +143,7 @@ def visualize_progress_data(json_file):
     
     # Get final balances for each strategy
     final_standings = []
+    stage('standings')
     for strategy in strategies:
         strategy_data = df[df['Strategy'] == strategy].sort_values('GameNumber')
         if len(strategy_data) > 0:
@@ -157,15 +180,22 @@ def visualize_progress_data(json_file):
     return output_file
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python3 visualize_from_progress.py <progress_file.json>")
+    apply_quality_flag()
+    apply_memory_flag()
+    args = sys.argv[1:]
+    validate = '--no-validate' not in args
+    args = [a for a in args if a != '--no-validate']
+    if len(args) != 1:
+        print("Usage: python3 visualize_from_progress.py <progress_file.json> [--memory-budget MB] [--no-validate]")
         sys.exit(1)
     
-    json_file = sys.argv[1]
-    result = visualize_progress_data(json_file)
+    json_file = args[0]
+    result = visualize_progress_data(json_file, validate)
     
     if result:
         print(f"\n🎉 Visualization complete! Open {result} to see the chart.")
+        report_memory()
     else:
         print("❌ Visualization failed.")
+        report_memory()
         sys.exit(1) 
\ No newline at end of file
@@ -4,7 +4,6 @@ Strategy Relationship Matrix Visualizer
 Creates visual graphs showing which strategies beat which others.
 """
 
-import json
 import glob
 import os
 import sys
@@ -15,6 +14,13 @@ import pandas as pd
 from matplotlib.patches import Rectangle
 import networkx as nx
 
+from memory_budget import DEFAULT_DROP, apply_memory_flag, load_export, report_memory
+from profiling import profiled, span
+from render_quality import apply_quality_flag, save_figure
+
+# Export sections the matchup charts never read
+MATCHUP_DROP = DEFAULT_DROP | {'tournamentData', 'tournaments', 'balanceTimeline', 'errorMetrics'}
+
 def find_latest_evolution_file():
     """Find the most recent enhanced evolution JSON file"""
     json_files = glob.glob('enhanced_evolution_*.json')
@@ -33,8 +39,8 @@ def load_strategy_matchups(filename=None):
     print(f"Loading matchup data from: {filename}")
     
     try:
-        with open(filename, 'r') as f:
-            data = json.load(f)
+        # Only strategyMatchups is read; under a memory budget the rest is never built
+        data = load_export(filename, MATCHUP_DROP)
         
         matchups = data.get('strategyMatchups', {})
         if not matchups:
@@ -78,50 +84,55 @@ def get_short_name(strategy_id, name_map):
     
     return strategy_id[:8]
 
+def matchup_arrays(matchups, strategies):
+    """Wins and losses as [row, column] count matrices over a fixed strategy order.
+
+    One pass flattens the nested dict into index arrays; no per-cell loop over n x n.
+    """
+    index = {strategy: i for i, strategy in enumerate(strategies)}
+    rows, cols, wins, losses = [], [], [], []
+    for strategy, opponents in matchups.items():
+        row = index[strategy]
+        for opponent, matchup in opponents.items():
+            rows.append(row)
+            cols.append(index[opponent])
+            wins.append(matchup.get('wins', 0))
+            losses.append(matchup.get('losses', 0))
+    n = len(strategies)
+    win_matrix = np.zeros((n, n))
+    loss_matrix = np.zeros((n, n))
+    np.add.at(win_matrix, (rows, cols), wins)
+    np.add.at(loss_matrix, (rows, cols), losses)
+    return win_matrix, loss_matrix
+
+def matchup_strategies(*sources):
+    """Sorted union of every strategy id appearing in any of the matchup dicts"""
+    strategies = set()
+    for matchups in sources:
+        strategies.update(matchups)
+        for opponents in matchups.values():
+            strategies.update(opponents)
+    return sorted(strategies)
+
 def create_win_rate_matrix(matchups):
     """Create a matrix of win rates between strategies"""
     name_map = create_strategy_name_mapping()
+    strategies = matchup_strategies(matchups)
     
-    # Get all unique strategies
-    all_strategies = set()
-    for strategy in matchups.keys():
-        all_strategies.add(strategy)
-        for opponent in matchups[strategy].keys():
-            all_strategies.add(opponent)
-    
-    strategies = sorted(list(all_strategies))
-    n = len(strategies)
-    
-    # Create matrix
-    win_rate_matrix = np.zeros((n, n))
-    win_matrix = np.zeros((n, n))
-    loss_matrix = np.zeros((n, n))
+    win_matrix, loss_matrix = matchup_arrays(matchups, strategies)
+    np.fill_diagonal(win_matrix, 0)
+    np.fill_diagonal(loss_matrix, 0)
     
-    for i, strategy1 in enumerate(strategies):
-        for j, strategy2 in enumerate(strategies):
-            if strategy1 == strategy2:
-                win_rate_matrix[i][j] = 0.5  # Self vs self
-            elif strategy1 in matchups and strategy2 in matchups[strategy1]:
-                matchup = matchups[strategy1][strategy2]
-                wins = matchup.get('wins', 0)
-                losses = matchup.get('losses', 0)
-                total = wins + losses
-                
-                win_matrix[i][j] = wins
-                loss_matrix[i][j] = losses
-                
-                if total > 0:
-                    win_rate_matrix[i][j] = wins / total
-                else:
-                    win_rate_matrix[i][j] = 0
-            else:
-                win_rate_matrix[i][j] = 0
+    total = win_matrix + loss_matrix
+    win_rate_matrix = np.divide(win_matrix, total, out=np.zeros_like(total), where=total > 0)
+    np.fill_diagonal(win_rate_matrix, 0.5)  # Self vs self
     
     # Create readable labels
     labels = [get_short_name(s, name_map) for s in strategies]
     
     return win_rate_matrix, win_matrix, loss_matrix, labels, strategies
 
+@profiled()
 def plot_win_rate_heatmap(win_rate_matrix, labels, output_file='strategy_matrix_heatmap.png'):
     """Create a heatmap showing win rates between strategies"""
     plt.figure(figsize=(12, 10))
@@ -153,11 +164,14 @@ def plot_win_rate_heatmap(win_rate_matrix, labels, output_file='strategy_matrix_
     plt.yticks(rotation=0)
     
     plt.tight_layout()
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
-    plt.show()
+    with span('savefig'):
+        save_figure(output_file)
+    with span('show'):
+        plt.show()
     
     print(f"✅ Win rate heatmap saved as: {output_file}")
 
+@profiled()
 def plot_win_loss_matrix(win_matrix, loss_matrix, labels, output_file='strategy_matrix_counts.png'):
     """Create a matrix showing actual win-loss counts"""
     plt.figure(figsize=(14, 10))
@@ -210,11 +224,14 @@ def plot_win_loss_matrix(win_matrix, loss_matrix, labels, output_file='strategy_
     cbar.set_label('Win Rate', fontsize=12)
     
     plt.tight_layout()
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
-    plt.show()
+    with span('savefig'):
+        save_figure(output_file)
+    with span('show'):
+        plt.show()
     
     print(f"✅ Win-loss matrix saved as: {output_file}")
 
+@profiled()
 def plot_dominance_scores(matchups, output_file='strategy_dominance.png'):
     """Create a bar chart showing overall dominance scores"""
     name_map = create_strategy_name_mapping()
@@ -273,11 +290,14 @@ def plot_dominance_scores(matchups, output_file='strategy_dominance.png'):
     plt.grid(axis='y', alpha=0.3)
     
     plt.tight_layout()
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
-    plt.show()
+    with span('savefig'):
+        save_figure(output_file)
+    with span('show'):
+        plt.show()
     
     print(f"✅ Dominance chart saved as: {output_file}")
 
+@profiled()
 def plot_network_graph(win_rate_matrix, labels, strategies, output_file='strategy_network.png'):
     """Create a network graph showing strategic relationships"""
     plt.figure(figsize=(14, 10))
@@ -302,7 +322,7 @@ def plot_network_graph(win_rate_matrix, labels, strategies, output_file='strateg
     
     # Draw nodes
     node_sizes = []
-    for label in labels:
+    for label in G.nodes():  # Duplicate short labels (e.g. several 'Hybrid') share one node
         # Size based on number of outgoing strong relationships
         out_degree = len([edge for edge in G.edges() if edge[0] == label])
         node_sizes.append(1000 + out_degree * 500)
@@ -334,18 +354,150 @@ def plot_network_graph(win_rate_matrix, labels, strategies, output_file='strateg
              bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
     
     plt.tight_layout()
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
-    plt.show()
+    with span('savefig'):
+        save_figure(output_file)
+    with span('show'):
+        plt.show()
     
     print(f"✅ Network graph saved as: {output_file}")
 
+def normal_sf(z):
+    """Upper-tail standard normal probability (Abramowitz-Stegun 7.1.26, |error| < 1.5e-7)"""
+    x = np.abs(z) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * x)
+    erfc = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429)))) * np.exp(-x * x)
+    return np.where(z >= 0, erfc / 2, 1 - erfc / 2)
+
+def benjamini_hochberg(p_values, alpha=0.05):
+    """Mask of discoveries at false discovery rate alpha among the finite p-values"""
+    flat = p_values.ravel()
+    tested = np.flatnonzero(np.isfinite(flat))
+    significant = np.zeros(flat.shape, dtype=bool)
+    if len(tested):
+        order = tested[np.argsort(flat[tested])]
+        passed = flat[order] <= alpha * np.arange(1, len(order) + 1) / len(order)
+        if passed.any():
+            significant[order[:np.flatnonzero(passed)[-1] + 1]] = True
+    return significant.reshape(p_values.shape)
+
+def matchup_diff(before, after, alpha=0.05):
+    """Per-cell win-rate change between two matchup sources on one aligned strategy index.
+
+    Cells are compared with a pooled two-proportion z-test and flagged significant under
+    Benjamini-Hochberg FDR control across all cells tested.
+    """
+    strategies = matchup_strategies(before, after)
+    wins_a, losses_a = matchup_arrays(before, strategies)
+    wins_b, losses_b = matchup_arrays(after, strategies)
+    games_a, games_b = wins_a + losses_a, wins_b + losses_b
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rate_a = wins_a / games_a
+        rate_b = wins_b / games_b
+        pooled = (wins_a + wins_b) / (games_a + games_b)
+        z = (rate_b - rate_a) / np.sqrt(pooled * (1 - pooled) * (1 / games_a + 1 / games_b))
+    # Cells missing from either side, or with every game won (or lost) in both, aren't tested
+    testable = (games_a > 0) & (games_b > 0)
+    z = np.where(testable & np.isfinite(z), z, np.where(testable, 0.0, np.nan))
+    p_values = np.where(np.isnan(z), np.nan, 2 * normal_sf(np.abs(np.nan_to_num(z))))
+
+    return {
+        'strategies': strategies,
+        'rate_before': rate_a,
+        'rate_after': rate_b,
+        'delta': np.where(testable, rate_b - rate_a, np.nan),
+        'games_before': games_a,
+        'games_after': games_b,
+        'z': z,
+        'p_value': p_values,
+        'significant': benjamini_hochberg(p_values, alpha)
+    }
+
+def plot_matchup_diff(diff, output_file, title='Win Rate Change'):
+    """Delta heatmap (row vs column); significant cells are outlined and starred"""
+    # Strategies with nothing comparable on either axis only add gray rows
+    tested = np.isfinite(diff['delta'])
+    keep = np.flatnonzero(tested.any(axis=0) | tested.any(axis=1))
+    strategies = [diff['strategies'][i] for i in keep]
+    delta = diff['delta'][np.ix_(keep, keep)]
+    significant = diff['significant'][np.ix_(keep, keep)]
+
+    name_map = create_strategy_name_mapping()
+    labels = [get_short_name(s, name_map) for s in strategies]
+    if len(set(labels)) < len(labels):
+        labels = strategies  # evolved strategies share short names; their ids stay distinct
+    n = len(labels)
+    annotate = n <= 25
+
+    plt.figure(figsize=(max(8, 0.45 * n + 4), max(7, 0.4 * n + 3)))
+    annotations = np.where(significant, np.char.add(np.char.mod('%+.2f', np.nan_to_num(delta)), '*'),
+                           np.char.mod('%+.2f', np.nan_to_num(delta)))
+    ax = sns.heatmap(delta, mask=np.isnan(delta), xticklabels=labels, yticklabels=labels,
+                     annot=annotations if annotate else False, fmt='', annot_kws={'fontsize': 7},
+                     cmap='RdYlGn', center=0, vmin=-1, vmax=1, square=True,
+                     cbar_kws={'label': 'Win rate change (after - before)'})
+    ax.set_facecolor('#dddddd')  # cells without games on both sides
+    for i, j in zip(*np.nonzero(significant)):
+        ax.add_patch(Rectangle((j, i), 1, 1, fill=False, edgecolor='black', lw=1.5))
+
+    plt.title(f'{title}\n(* = significant at 5% FDR, gray = not played in both)', fontsize=14, fontweight='bold')
+    plt.xlabel('Opponent Strategy', fontsize=12)
+    plt.ylabel('Strategy', fontsize=12)
+    plt.xticks(rotation=45, ha='right')
+    plt.yticks(rotation=0)
+    plt.tight_layout()
+    save_figure(output_file)
+    plt.close()
+    return output_file
+
+def print_matchup_diff(diff, top=5):
+    """Print the strongest significant win-rate changes from a matchup diff"""
+    tested = np.isfinite(diff['delta'])
+    print(f"📊 {tested.sum()} cells compared, {diff['significant'].sum()} significant changes")
+    order = np.argsort(np.where(diff['significant'], diff['p_value'], np.inf), axis=None)[:top]
+    for i, j in zip(*np.unravel_index(order, diff['delta'].shape)):
+        if not diff['significant'][i, j]:
+            break
+        print(f"   {diff['strategies'][i]} vs {diff['strategies'][j]}: "
+              f"{diff['rate_before'][i, j]:.0%} → {diff['rate_after'][i, j]:.0%} "
+              f"(n={int(diff['games_before'][i, j])}/{int(diff['games_after'][i, j])}, p={diff['p_value'][i, j]:.3g})")
+
+@profiled('strategy_matrix_diff')
+def diff_main(files):
+    """Diff each (before, after) pair of files; a file used in several pairs is loaded once"""
+    if len(files) < 2 or len(files) % 2:
+        print("❌ --diff needs pairs of files: before.json after.json [before2.json after2.json ...]")
+        return False
+    loaded = {}
+    outputs = []
+    for before_file, after_file in zip(files[::2], files[1::2]):
+        with span('load'):
+            for path in (before_file, after_file):
+                if path not in loaded:
+                    loaded[path] = load_strategy_matchups(path)
+        if not loaded[before_file] or not loaded[after_file]:
+            print(f"❌ Skipping {before_file} vs {after_file}: no matchup data")
+            continue
+        stem_a, stem_b = (os.path.splitext(os.path.basename(p))[0] for p in (before_file, after_file))
+        print(f"\n🔀 {stem_a} → {stem_b}")
+        with span('diff'):
+            diff = matchup_diff(loaded[before_file], loaded[after_file])
+        print_matchup_diff(diff)
+        with span('plot'):
+            outputs.append(plot_matchup_diff(diff, f'strategy_matrix_diff_{stem_a}_vs_{stem_b}.png',
+                                             f'Win Rate Change: {stem_a} → {stem_b}'))
+        print(f"✅ Diff heatmap saved as: {outputs[-1]}")
+    return bool(outputs)
+
+@profiled('strategy_matrix')
 def main():
     """Main function to create all visualizations"""
     print("🎨 Strategy Relationship Matrix Visualizer")
     print("==========================================")
     
     # Load data
-    matchups = load_strategy_matchups()
+    with span('load'):
+        matchups = load_strategy_matchups()
     if not matchups:
         print("❌ No strategy matchup data found!")
         return
@@ -353,7 +505,8 @@ def main():
     print(f"📊 Found matchup data for {len(matchups)} strategies")
     
     # Create win rate matrix
-    win_rate_matrix, win_matrix, loss_matrix, labels, strategies = create_win_rate_matrix(matchups)
+    with span('win_rate_matrix'):
+        win_rate_matrix, win_matrix, loss_matrix, labels, strategies = create_win_rate_matrix(matchups)
     
     if len(labels) == 0:
         print("❌ No valid matchup data to visualize!")
@@ -381,4 +534,12 @@ def main():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    apply_quality_flag()
+    apply_memory_flag()
+    if '--diff' in sys.argv:
+        files = sys.argv[sys.argv.index('--diff') + 1:]
+        ok = diff_main(files)
+        report_memory()
+        sys.exit(0 if ok else 1)
+    main()
+    report_memory() 
\ No newline at end of file